@@ -1,22 +1,24 @@
-import os, sys
+import os, sys, time
+_startup_started = time.perf_counter()
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 from fastapi import FastAPI, Query, Path, BackgroundTasks, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
-from models import TripRequest, FormattedResponse, TripGroup, TravelSegment, TripVariation, SaveTripRequest
+from models import (TripRequest, FormattedResponse, TripGroup, TravelSegment, TripVariation, SaveTripRequest,
+                    TravelMatrixRequest)
 from data.synonyms import AIRPORT_CITIES, league_priority
-from config import (GAMES_FILE, TRAIN_TIMES_FILE, CORS_ORIGINS, 
-                    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, SUPABASE_ANON_KEY,
-                    JWT_SECRET, validate_config)
+from config import (GAMES_FILE, GAMES_WATCH_INTERVAL, CORS_ORIGINS, 
+                    SUPABASE_ANON_KEY,
+                    JWT_SECRET, TRAVEL_MATRIX_MAX_STATIONS, GAMES_RANGE_MAX_DAYS, validate_config)
 import functools
 import traceback
 import asyncio
 import logging
 from concurrent.futures import TimeoutError
 import jwt
-from database import db_service, get_user_role, log_trip_request, log_user_activity
+from database import db_service, get_supabase_admin, get_user_role, log_trip_request, log_user_activity
 from fastapi import Request
 
 # Configure logging
@@ -28,14 +30,15 @@ logging.basicConfig(
 logger = logging.getLogger("trip-planner")
 
 # Import from utils and common
-from utils import (load_games, load_train_times, calculate_total_travel_time, 
-                  identify_similar_trips, get_travel_minutes_utils, 
+from utils import (calculate_total_travel_time, 
+                  identify_similar_trips, get_travel_minutes_utils, cached_travel_minutes, is_must_team_match, parse_match_label, 
                   parse_date_string, plan_trip_with_cancellation, enhance_trip_planning_for_any_start)
-from common import (is_request_cancelled, register_request, cleanup_request, cleanup_old_requests, active_requests)
-
-# Initialize Supabase client for admin operations
-from supabase import create_client
-supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+from common import (is_request_cancelled, register_request, cleanup_request, cleanup_old_requests, active_requests,
+                    team_key)
+from travel_graph import (TravelTimeMatrix, iter_connections, count_connections, neighbors_within,
+                          resolve_station, station_names, travel_sub_matrix)
+from data_store import (current_store, get_store, refresh_store, reload_schedule, roll_over_daily, watch_games_file,
+                        versioned_lru_cache)
 
 # Initialize FastAPI with metadata
 app = FastAPI(
@@ -144,9 +147,49 @@ class TripRequestLoggingMiddleware(BaseHTTPMiddleware):
 # Add the middleware to your FastAPI app (add this line AFTER the CORS middleware):
 app.add_middleware(TripRequestLoggingMiddleware)
 
-# Load data using config paths
-train_times = load_train_times(TRAIN_TIMES_FILE)
-games, tbd_games = load_games(GAMES_FILE)
+# Nothing heavy happens at import: the data store (memory-mapped artifact when
+# compiled, CSVs otherwise) and the Supabase client are loaded by warm_up() after
+# startup. Endpoints capture require_store() once per request (503 until then).
+_import_seconds = time.perf_counter() - _startup_started
+
+# Readiness of the optional subsystems; /health answers before they are ready
+readiness = {"data": False, "database": False}
+
+def warm_up():
+    """Load the data store and the Supabase client, then log the startup breakdown."""
+    try:
+        store = get_store()
+    except Exception as e:
+        logger.error(f"❌ Failed to load data: {e}")
+        return
+    readiness["data"] = True
+    logger.info(f"📊 Loaded {len(store.games)} games and {len(store.tbd_games)} TBD games")
+    logger.info(f"🚆 Loaded {count_connections(store.train_times)} train connections")
+    
+    client_started = time.perf_counter()
+    try:
+        get_supabase_admin()
+    except Exception as e:
+        logger.error(f"❌ Failed to create Supabase client: {e}")
+        return
+    client_seconds = time.perf_counter() - client_started
+    readiness["database"] = True
+    
+    logger.info(
+        f"⏱️ Startup: import {_import_seconds:.2f}s | parse {store.timings.get('parse', 0):.2f}s | "
+        f"index build {store.timings.get('index build', 0):.2f}s | client init {client_seconds:.2f}s"
+    )
+
+def require_store():
+    """
+    The live store for a request handler. Never waits for the first load (that would
+    block the event loop or tie up the threadpool /health needs); 503 until it is ready.
+    """
+    store = current_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Data is still loading, please retry shortly.",
+                            headers={"Retry-After": "5"})
+    return store
 
 # ────────────────────────────────
 # 🔐 Authentication Functions
@@ -638,21 +681,49 @@ def home():
         "docs": "/docs"
     }
 
+def cache_stats(store) -> Dict:
+    """Hit/miss/eviction counters and sizes of the travel lookup caches."""
+    stats = {"travel_time": cached_travel_minutes.cache_info()}
+    if store is not None and isinstance(store.train_times, TravelTimeMatrix):
+        stats["travel_time"]["uncached"] = "matrix mode: lookups are a single array read, no cache"
+    if store is not None and hasattr(store.train_times, "cache_info"):
+        stats["shortest_path_rows"] = store.train_times.cache_info()  # sparse graph mode
+    if store is not None:
+        stats["reachable_games"] = store.game_index.reachable_info()
+    return stats
+
 @app.get("/health", 
          summary="Health check",
          description="Simple endpoint to verify API is operational",
          tags=["System"])
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (never waits for data to load)."""
+    store = current_store()
     return {
         "status": "ok",
         "timestamp": datetime.now().isoformat(),
-        "games_loaded": len(games),
-        "tbd_games_loaded": len(tbd_games),
+        "ready": all(readiness.values()),
+        "subsystems": readiness,
+        "games_loaded": len(store.games) if store else 0,
+        "tbd_games_loaded": len(store.tbd_games) if store else 0,
+        "dataset": store.dataset_info if store else None,
+        "caches": cache_stats(store),
         "authentication": "Supabase",
         "environment": "production"
     }
 
+@app.get("/ready",
+         summary="Readiness check",
+         description="Returns 503 until data and the database client are loaded",
+         tags=["System"])
+def readiness_check():
+    """Readiness endpoint for load balancers."""
+    ready = all(readiness.values())
+    return JSONResponse(
+        content={"ready": ready, "subsystems": readiness},
+        status_code=200 if ready else 503
+    )
+
 # ────────────────────────────────
 # 🛠️ Cancellation Endpoints
 # ────────────────────────────────
@@ -716,13 +787,16 @@ def register_new_request(user = Depends(verify_supabase_token)):
 # 🛠️ Helper Functions
 # ────────────────────────────────
 
-# Store the background task reference
+# Store the background task references
 cleanup_task_ref = None
+games_watch_task_ref = None
+rollover_task_ref = None
+warm_up_task_ref = None
 
 @app.on_event("startup")
 async def setup_cleanup():
     """Set up periodic cleanup task on startup."""
-    global cleanup_task_ref
+    global cleanup_task_ref, games_watch_task_ref, rollover_task_ref, warm_up_task_ref
     
     # Validate configuration on startup
     try:
@@ -738,16 +812,24 @@ async def setup_cleanup():
             cleanup_old_requests()
             
     logger.info("🚀 BundesTrip API starting in production mode")
-    logger.info(f"📊 Loaded {len(games)} games and {len(tbd_games)} TBD games")
-    logger.info(f"🚆 Loaded {len(train_times)} train connections")
     logger.info("🔐 Supabase authentication enabled")
     
+    # Load data and the database client off the event loop; /health serves meanwhile
+    warm_up_task_ref = asyncio.create_task(asyncio.to_thread(warm_up))
+    
     cleanup_task_ref = asyncio.create_task(cleanup_task())
+    
+    # Move yesterday's games into the past partition every midnight
+    rollover_task_ref = asyncio.create_task(roll_over_daily())
+    
+    # Optionally pick up schedule edits without an admin refresh
+    if GAMES_WATCH_INTERVAL > 0:
+        games_watch_task_ref = asyncio.create_task(watch_games_file(GAMES_FILE, GAMES_WATCH_INTERVAL))
 
 @app.on_event("shutdown")
 async def cleanup_on_shutdown():
     """Cancel background tasks on shutdown."""
-    global cleanup_task_ref
+    global cleanup_task_ref, games_watch_task_ref, rollover_task_ref
     
     if cleanup_task_ref and not cleanup_task_ref.done():
         logger.info("Cancelling periodic cleanup task")
@@ -757,15 +839,22 @@ async def cleanup_on_shutdown():
         except asyncio.CancelledError:
             logger.info("Periodic cleanup task cancelled successfully")
     
+    if games_watch_task_ref and not games_watch_task_ref.done():
+        games_watch_task_ref.cancel()
+        try:
+            await games_watch_task_ref
+        except asyncio.CancelledError:
+            logger.info("Games file watcher cancelled successfully")
+    
+    if rollover_task_ref and not rollover_task_ref.done():
+        rollover_task_ref.cancel()
+        try:
+            await rollover_task_ref
+        except asyncio.CancelledError:
+            logger.info("Daily rollover task cancelled successfully")
+    
     logger.info("🛑 BundesTrip API shutting down")
 
-def has_special_suffix(location_name: str) -> bool:
-    """Check if location has a special suffix that shouldn't have hbf appended"""
-    special_suffixes = ["mitte", "bahnhof"]
-    location_lower = location_name.lower()
-    return any(suffix in location_lower for suffix in special_suffixes)
-
-
 def get_date_sortkey(day_item: Dict) -> str:
     """Generate a sortable key for dates in format 'DD Month'"""
     day_str = day_item.get("day", "Unknown")
@@ -844,7 +933,8 @@ def process_travel_segments(
     variant_detail: TripVariation,
     start_location: str,
     match_by_day: Dict[str, str],
-    hotel_by_day: Dict[str, str]
+    hotel_by_day: Dict[str, str],
+    train_times: Dict
 ) -> List[str]:
     """
     Process and generate travel segments for an itinerary, correctly handling hotel changes
@@ -978,9 +1068,9 @@ def process_hotel_information(sorted_days: List[Dict]) -> List[str]:
         
     return hotel_info
 
-@functools.lru_cache(maxsize=2048)
-def get_airport_distances(location, is_start=True):
-    """Cache airport distances calculation"""
+@versioned_lru_cache(maxsize=2048)
+def get_airport_distances(train_times, location, is_start=True):
+    """Cache airport distances calculation (keyed by data version)"""
     distances = []
     for airport in AIRPORT_CITIES:
         if airport.lower() == location.lower():
@@ -991,7 +1081,7 @@ def get_airport_distances(location, is_start=True):
             continue
         
         city_pair = (location, airport) if is_start else (airport, location)
-        travel_minutes = train_times.get(city_pair, None)
+        travel_minutes = get_travel_minutes_utils(train_times, *city_pair)
         travel_time = format_travel_time(travel_minutes)
             
         distances.append({
@@ -1003,7 +1093,31 @@ def get_airport_distances(location, is_start=True):
     distances.sort(key=lambda x: get_minutes(x["travel_time"]))
     return distances
 
-def process_trip_variant(variant: Dict, actual_start_location: str) -> TripVariation:
+def day_game_info(game, tbd: bool = False) -> Dict:
+    """One game as listed by /games-by-date and /games"""
+    return {
+        "match": f"{game.home_team} vs {game.away_team}",
+        "time": "TBD" if tbd else game.time,
+        "location": game.hbf_location,
+        "display_location": game.hbf_location.replace(" hbf", ""),
+        "league": game.league
+    }
+
+def _day_window(target_date, league=None):
+    return target_date, target_date
+
+@versioned_lru_cache(maxsize=1024, date_window=_day_window)
+def get_day_games(store, target_date, league=None) -> tuple:
+    """Games on one date (regular, then TBD), optionally for one league (keyed by data version)"""
+    day_games = []
+    for tbd in (False, True):
+        for game in store.schedule_index.on(target_date, tbd=tbd):
+            if not league or game.league == league:
+                day_games.append(day_game_info(game, tbd))
+    
+    return tuple(day_games)
+
+def process_trip_variant(variant: Dict, actual_start_location: str, train_times: Dict) -> TripVariation:
     """Optimized process_trip_variant function"""
     total_travel_time = calculate_total_travel_time(variant, train_times, actual_start_location)
 
@@ -1027,12 +1141,10 @@ def process_trip_variant(variant: Dict, actual_start_location: str) -> TripVaria
         for match in day.get("matches", []):
             num_games += 1
             
-            # Extract team names from match string (format: "Team1 vs Team2 (time)")
+            # Team names from the match label (format: "Team1 vs Team2 (time)"), parsed once per label
             if "match" in match:
-                match_parts = match["match"].split(" vs ")
-                if len(match_parts) == 2:
-                    home_team = match_parts[0].strip()
-                    away_team = match_parts[1].split(" (")[0].strip()
+                home_team, away_team, _ = parse_match_label(match["match"])
+                if home_team and away_team:
                     teams.add(home_team)
                     teams.add(away_team)
     
@@ -1060,8 +1172,8 @@ def process_trip_variant(variant: Dict, actual_start_location: str) -> TripVaria
     
     # Calculate airport distances
     airport_distances = {
-        "start": get_airport_distances(actual_start_location, is_start=True),
-        "end": get_airport_distances(true_end_location, is_start=False)
+        "start": get_airport_distances(train_times, actual_start_location, True),
+        "end": get_airport_distances(train_times, true_end_location, False)
     }
     
     # Convert sets to sorted lists for consistent output
@@ -1124,7 +1236,8 @@ def process_trip_variant(variant: Dict, actual_start_location: str) -> TripVaria
         ),
         actual_start_location, 
         match_by_day, 
-        hotel_by_day
+        hotel_by_day,
+        train_times
     )
     
     # Convert text segments to TravelSegment objects
@@ -1466,6 +1579,7 @@ async def get_trip(request: TripRequest,
                    background_tasks: BackgroundTasks,
                    user = Depends(verify_supabase_token)):
     """Plan a trip with authentication required."""
+    store = require_store()
     
     # Log the request
     log_user_request(user, "/plan-trip", {
@@ -1507,10 +1621,33 @@ async def get_trip(request: TripRequest,
                 status_code=400
             )
         
+        travel_engine = (request.travel_engine or "fastest").lower()
+        if travel_engine not in ("fastest", "timetable"):
+            cleanup_request(request_id)
+            logger.warning(f"Request {request_id} rejected: Unknown travel engine {request.travel_engine}")
+            return JSONResponse(
+                content={"error": "travel_engine must be 'fastest' or 'timetable'"},
+                status_code=400
+            )
+        if travel_engine == "timetable" and store.timetable is None:
+            cleanup_request(request_id)
+            logger.warning(f"Request {request_id} rejected: No timetable loaded")
+            return JSONResponse(
+                content={"error": "The timetable travel engine is not available on this server"},
+                status_code=400
+            )
+        
         # Log request parameters
         logger.info(f"Request {request_id} parameters: start={request.start_location}, "
                    f"duration={request.trip_duration}, max_travel={request.max_travel_time}, "
-                   f"user={user['email']}. one_city_only={request.one_city_only}")
+                   f"user={user['email']}. one_city_only={request.one_city_only}, engine={travel_engine}")
+        
+        # Only the hot (upcoming) partition unless the requested start date reaches into the past
+        try:
+            requested_start = datetime.strptime(request.start_date, "%d %B %Y").date() if request.start_date else None
+        except ValueError:
+            requested_start = None
+        candidate_games, candidate_tbd_games = store.games_since(requested_start)
         
         # Filter games by preferred leagues
         if request.preferred_leagues:
@@ -1518,8 +1655,8 @@ async def get_trip(request: TripRequest,
             preferred_lower = {league.lower() for league in request.preferred_leagues}
             
             # Use list comprehensions for more efficient filtering
-            regular_games_filtered = [g for g in games if hasattr(g, 'league') and g.league.lower() in preferred_lower]
-            tbd_games_filtered = [g for g in tbd_games if hasattr(g, 'league') and g.league.lower() in preferred_lower]
+            regular_games_filtered = [g for g in candidate_games if hasattr(g, 'league') and g.league.lower() in preferred_lower]
+            tbd_games_filtered = [g for g in candidate_tbd_games if hasattr(g, 'league') and g.league.lower() in preferred_lower]
             
             # Check if no games match the preferred leagues
             if not regular_games_filtered and not tbd_games_filtered:
@@ -1536,25 +1673,23 @@ async def get_trip(request: TripRequest,
             filtered_tbd_games = tbd_games_filtered
             logger.info(f"Request {request_id} filtered to {len(filtered_games)} games in leagues: {request.preferred_leagues}")
         else:
-            filtered_games = games
-            filtered_tbd_games = tbd_games
+            filtered_games = candidate_games
+            filtered_tbd_games = candidate_tbd_games
             logger.info(f"Request {request_id} using all {len(filtered_games)} games")
         
         # Check if must_teams exist in the dataset
         if request.must_teams:
-            must_teams_lower = {team.lower() for team in request.must_teams}
+            must_team_keys = {team_key(team) for team in request.must_teams}
             team_found = False
             
             for game in filtered_games:
-                if (hasattr(game, 'home_team') and game.home_team.lower() in must_teams_lower) or \
-                   (hasattr(game, 'away_team') and game.away_team.lower() in must_teams_lower):
+                if team_key(game.home_team) in must_team_keys or team_key(game.away_team) in must_team_keys:
                     team_found = True
                     break
                     
             if not team_found:
                 for game in filtered_tbd_games:
-                    if (hasattr(game, 'home_team') and game.home_team.lower() in must_teams_lower) or \
-                       (hasattr(game, 'away_team') and game.away_team.lower() in must_teams_lower):
+                    if team_key(game.home_team) in must_team_keys or team_key(game.away_team) in must_team_keys:
                         team_found = True
                         break
             
@@ -1582,14 +1717,15 @@ async def get_trip(request: TripRequest,
                 trip_duration=request.trip_duration,
                 max_travel_time=request.max_travel_time,
                 games=filtered_games,
-                train_times=train_times,
+                train_times=store.train_times,
                 tbd_games=None,  # Set to None to ignore TBD games in trip planning
                 preferred_leagues=request.preferred_leagues,
                 start_date=request.start_date,
                 must_teams=request.must_teams,
                 min_games=min_games,
-                one_city_only=request.one_city_only
-
+                one_city_only=request.one_city_only,
+                timetable=store.timetable if travel_engine == "timetable" else None,
+                game_index=store.game_index
             )
         else:
             logger.info(f"Request {request_id} using specific start location: {request.start_location}")
@@ -1599,14 +1735,15 @@ async def get_trip(request: TripRequest,
                 trip_duration=request.trip_duration,
                 max_travel_time=request.max_travel_time,
                 games=filtered_games,
-                train_times=train_times,
+                train_times=store.train_times,
                 tbd_games=None,  # Set to None to ignore TBD games in trip planning
                 preferred_leagues=request.preferred_leagues,
                 start_date=request.start_date,
                 must_teams=request.must_teams,
                 min_games=min_games,
-                one_city_only=request.one_city_only
-
+                one_city_only=request.one_city_only,
+                timetable=store.timetable if travel_engine == "timetable" else None,
+                game_index=store.game_index
             )
         
         # Check if the request was cancelled
@@ -1726,7 +1863,7 @@ async def get_trip(request: TripRequest,
             formatted_trips,
             key=lambda t: (
                 -sum(len(day.get("matches", [])) for day in t["Itinerary"]), 
-                calculate_total_travel_time(t)
+                calculate_total_travel_time(t, store.train_times)
             )
         )
         
@@ -1778,7 +1915,7 @@ async def get_trip(request: TripRequest,
                             break
                             
                 # Process variant details
-                variation_details.append(process_trip_variant(variant, actual_start_location))
+                variation_details.append(process_trip_variant(variant, actual_start_location, store.train_times))
             
             # Add complete group
             structured_groups.append(TripGroup(
@@ -1809,8 +1946,8 @@ async def get_trip(request: TripRequest,
             # Calculate end date
             end_date_obj = start_date_obj + timedelta(days=request.trip_duration)
             
-            # Convert must_teams to lowercase set for efficient lookups
-            must_teams_lower = {team.lower() for team in request.must_teams} if request.must_teams else None
+            # Same normalized matching as the planner's contains_must_team flag
+            must_teams_set = set(request.must_teams) if request.must_teams else None
             
             # Process TBD games
             for tbd_game in filtered_tbd_games:
@@ -1822,14 +1959,10 @@ async def get_trip(request: TripRequest,
                 # Check if game is within trip period
                 if start_date_obj.date() <= game_date < end_date_obj.date():
                     # Check if a must_team is present
-                    has_must_team = False
-                    if must_teams_lower and hasattr(tbd_game, 'home_team') and hasattr(tbd_game, 'away_team'):
-                        home_team_lower = tbd_game.home_team.lower()
-                        away_team_lower = tbd_game.away_team.lower()
-                        for must_team in must_teams_lower:
-                            if must_team in home_team_lower or must_team in away_team_lower:
-                                has_must_team = True
-                                break
+                    has_must_team = bool(must_teams_set) and (
+                        is_must_team_match(tbd_game.home_team, must_teams_set) or
+                        is_must_team_match(tbd_game.away_team, must_teams_set)
+                    )
                     
                     tbd_games_in_period.append({
                         "match": f"{tbd_game.home_team} vs {tbd_game.away_team}",
@@ -1893,14 +2026,9 @@ async def get_trip(request: TripRequest,
          tags=["Reference Data"])
 def get_leagues():
     """Get available leagues - no authentication required."""
+    store = require_store()
     try:
-        leagues = set()
-        for game in games:  
-            if hasattr(game, 'league'):
-                leagues.add(game.league)
-        
-        sorted_leagues = sorted(list(leagues), 
-                               key=lambda x: league_priority.get(x, 999))
+        sorted_leagues = sorted(store.schedule_index.league_names.values(), key=lambda x: league_priority.get(x, 999))
         
         return {"leagues": sorted_leagues}
     except Exception as e:
@@ -1916,19 +2044,13 @@ def get_leagues():
          tags=["Reference Data"])
 def get_teams(league: Optional[str] = Query(None, description="Filter teams by league")):
     """Get all available teams, optionally filtered by league."""
-    teams = set()
-    
-    for game in games:
-        if league and hasattr(game, 'league') and game.league != league:
-            continue
-            
-        if hasattr(game, 'home_team'):
-            teams.add(game.home_team)
-        if hasattr(game, 'away_team'):
-            teams.add(game.away_team)
+    store = require_store()
     
     # Sort teams alphabetically
-    sorted_teams = sorted(list(teams))
+    if league:
+        sorted_teams = list(store.schedule_index.teams_by_league.get(league, ()))
+    else:
+        sorted_teams = sorted(store.schedule_index.team_names.values())
     
     return {"teams": sorted_teams}
 
@@ -1939,12 +2061,9 @@ def get_teams(league: Optional[str] = Query(None, description="Filter teams by l
          tags=["Reference Data"])
 def get_cities():
     """Get all available cities for the start location selection."""
-    # Extract unique cities from train_times keys
-    cities = set()
-    
-    for key_pair in train_times.keys():
-        cities.add(key_pair[0])
-        cities.add(key_pair[1])
+    store = require_store()
+    # Every station in the travel graph
+    cities = set(station_names(store.train_times))
     
     # Add "Any" as first option
     cities_list = ["Any"] + sorted([city for city in cities if city != "Any"])
@@ -1968,79 +2087,28 @@ def get_available_dates(
     team: Optional[str] = Query(None, description="Filter dates by team")
 ):
     """Get all future dates with available matches for the date picker."""
+    store = require_store()
     date_matches = {}
     today = datetime.now().date()
     
-    # Process regular games
-    for game in games:
-        if not hasattr(game, 'date'):
-            continue
-            
-        game_date = game.date.date()
-        
-        # Skip dates that have passed
-        if game_date < today:
-            continue
-            
-        # Apply league filter if specified
-        if league and hasattr(game, 'league') and game.league != league:
-            continue
-            
-        # Apply team filter if specified
-        if team:
-            team_lower = team.lower()
-            if not ((hasattr(game, 'home_team') and game.home_team.lower() == team_lower) or
-                   (hasattr(game, 'away_team') and game.away_team.lower() == team_lower)):
+    # Regular games, then TBD games, from today on (narrowed by the team or league index)
+    for tbd in (False, True):
+        for game in store.schedule_index.select(tbd=tbd, league=league, team=team, since=today):
+            # The league filter is an exact match
+            if league and game.league != league:
                 continue
-        
-        # Format date as string
-        date_str = game_date.strftime("%Y-%m-%d")
-        
-        if date_str not in date_matches:
-            date_matches[date_str] = {
-                "date": game_date.strftime("%d %B"),
-                "count": 0,
-                "leagues": set()
-            }
             
-        date_matches[date_str]["count"] += 1
-        if hasattr(game, 'league'):
-            date_matches[date_str]["leagues"].add(game.league)
-    
-    # Process TBD games
-    for game in tbd_games:
-        if not hasattr(game, 'date'):
-            continue
-            
-        game_date = game.date.date()
-        
-        # Skip dates that have passed
-        if game_date < today:
-            continue
-            
-        # Apply league filter if specified
-        if league and hasattr(game, 'league') and game.league != league:
-            continue
-            
-        # Apply team filter if specified
-        if team:
-            team_lower = team.lower()
-            if not ((hasattr(game, 'home_team') and game.home_team.lower() == team_lower) or
-                   (hasattr(game, 'away_team') and game.away_team.lower() == team_lower)):
-                continue
-        
-        # Format date as string
-        date_str = game_date.strftime("%Y-%m-%d")
-        
-        if date_str not in date_matches:
-            date_matches[date_str] = {
-                "date": game_date.strftime("%d %B"),
-                "count": 0,
-                "leagues": set()
-            }
+            game_date = game.date.date()
+            date_str = game_date.strftime("%Y-%m-%d")
             
-        date_matches[date_str]["count"] += 1
-        if hasattr(game, 'league'):
+            if date_str not in date_matches:
+                date_matches[date_str] = {
+                    "date": game_date.strftime("%d %B"),
+                    "count": 0,
+                    "leagues": set()
+                }
+                
+            date_matches[date_str]["count"] += 1
             date_matches[date_str]["leagues"].add(game.league)
     
     # Convert sets to lists for JSON serialization
@@ -2070,18 +2138,15 @@ def get_city_connections(
     max_time: int = Query(240, description="Maximum travel time in minutes")
 ):
     """Get cities reachable within specified time from a given city."""
+    store = require_store()
     if city.lower() == "any":
         return JSONResponse(
             content={"error": "Cannot get connections for 'Any'. Please specify a city."},
             status_code=400
         )
             
-    # Find exact match for city (case insensitive)
-    city_match = None
-    for city_key in set(c for pair in train_times.keys() for c in pair):
-        if city_key.lower() == city.lower():
-            city_match = city_key
-            break
+    # Canonical station for this spelling (case, umlauts and "hbf" don't matter)
+    city_match = resolve_station(store.train_times, city)
     
     if not city_match:
         return JSONResponse(
@@ -2089,21 +2154,16 @@ def get_city_connections(
             status_code=404
         )
     
-    connections = []
-    
-    # Find all reachable cities
-    for city_pair, travel_time in train_times.items():
-        if city_pair[0] == city_match and travel_time <= max_time:
-            dest_city = city_pair[1]
-            connections.append({
-                "city": dest_city,
-                "display_name": dest_city.replace(" hbf", ""),
-                "travel_time": travel_time,
-                "travel_time_formatted": f"{travel_time // 60}h {travel_time % 60}m"
-            })
-    
-    # Sort by travel time
-    connections.sort(key=lambda x: x["travel_time"])
+    # Reachable cities, already sorted by travel time
+    connections = [
+        {
+            "city": dest_city,
+            "display_name": dest_city.replace(" hbf", ""),
+            "travel_time": travel_time,
+            "travel_time_formatted": f"{travel_time // 60}h {travel_time % 60}m"
+        }
+        for dest_city, travel_time in neighbors_within(store.train_times, city_match, max_time)
+    ]
     
     return {
         "source_city": city_match,
@@ -2112,6 +2172,35 @@ def get_city_connections(
         "count": len(connections)
     }
 
+@app.post("/travel-matrix",
+          summary="Get travel times between a list of stations",
+          description="Returns the travel-time sub-matrix for the given stations in one call (null where unknown)",
+          tags=["Travel Data"])
+def get_travel_matrix(request: TravelMatrixRequest):
+    """Travel times between every pair of the requested stations, served from the station graph."""
+    store = require_store()
+    if not request.stations:
+        return JSONResponse(
+            content={"error": "Please provide at least one station."},
+            status_code=400
+        )
+    if len(request.stations) > TRAVEL_MATRIX_MAX_STATIONS:
+        return JSONResponse(
+            content={"error": f"At most {TRAVEL_MATRIX_MAX_STATIONS} stations per request."},
+            status_code=400
+        )
+
+    # Rows follow the order of `stations`; minutes[i][j] is the travel time from stations[i] to stations[j]
+    stations, unresolved, minutes = travel_sub_matrix(store.train_times, request.stations, request.max_time)
+
+    return {
+        "stations": stations,
+        "display_names": [station.replace(" hbf", "") for station in stations],
+        "minutes": minutes,
+        "unresolved": unresolved,
+        "count": len(stations)
+    }
+
 @app.get("/team-schedule/{team}",
          summary="Get a team's complete schedule",
          description="Returns the future schedule for a specific team",
@@ -2120,22 +2209,12 @@ def get_team_schedule(
     team: str = Path(..., description="The team name")
 ):
     """Get future games schedule for a specific team."""
+    store = require_store()
     team_lower = team.lower()
     today = datetime.now().date()
     
     # Find matching team with correct capitalization
-    team_name = None
-    all_teams = set()
-    for game in games:
-        if hasattr(game, 'home_team'):
-            all_teams.add(game.home_team)
-        if hasattr(game, 'away_team'):
-            all_teams.add(game.away_team)
-    
-    for t in all_teams:
-        if t.lower() == team_lower:
-            team_name = t
-            break
+    team_name = store.schedule_index.team_names.get(team_lower)
     
     if not team_name:
         return JSONResponse(
@@ -2145,57 +2224,29 @@ def get_team_schedule(
     
     # Find all future matches for this team
     upcoming_matches = []
-    for game in games:
-        if not (hasattr(game, 'date') and hasattr(game, 'home_team') and hasattr(game, 'away_team')):
-            continue
-            
-        game_date = game.date.date()
-        
-        # Skip dates that have passed
-        if game_date < today:
-            continue
-            
-        is_home = hasattr(game, 'home_team') and game.home_team.lower() == team_lower
-        is_away = hasattr(game, 'away_team') and game.away_team.lower() == team_lower
-        
-        if not (is_home or is_away):
-            continue
-            
+    for game in store.schedule_index.select(team=team_lower, since=today):
+        is_home = game.home_team.lower() == team_lower
         upcoming_matches.append({
-            "date": game_date.strftime("%d %B %Y"),
+            "date": game.date.strftime("%d %B %Y"),
             "time": game.time,
             "opponent": game.away_team if is_home else game.home_team,
             "is_home": is_home,
-            "league": game.league if hasattr(game, 'league') else "Unknown",
-            "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-            "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown"
+            "league": game.league,
+            "location": game.hbf_location,
+            "display_location": game.hbf_location.replace(" hbf", "")
         })
     
     # Also add future TBD games
     tbd_matches = []
-    for game in tbd_games:
-        if not (hasattr(game, 'date') and hasattr(game, 'home_team') and hasattr(game, 'away_team')):
-            continue
-            
-        game_date = game.date.date()
-        
-        # Skip dates that have passed
-        if game_date < today:
-            continue
-            
-        is_home = hasattr(game, 'home_team') and game.home_team.lower() == team_lower
-        is_away = hasattr(game, 'away_team') and game.away_team.lower() == team_lower
-        
-        if not (is_home or is_away):
-            continue
-            
+    for game in store.schedule_index.select(tbd=True, team=team_lower, since=today):
+        is_home = game.home_team.lower() == team_lower
         tbd_matches.append({
-            "date": game_date.strftime("%d %B %Y"),
+            "date": game.date.strftime("%d %B %Y"),
             "opponent": game.away_team if is_home else game.home_team,
             "is_home": is_home,
-            "league": game.league if hasattr(game, 'league') else "Unknown",
-            "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-            "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown"
+            "league": game.league,
+            "location": game.hbf_location,
+            "display_location": game.hbf_location.replace(" hbf", "")
         })
     
     return {
@@ -2210,12 +2261,17 @@ def get_team_schedule(
          description="Simple endpoint to verify API is operational",
          tags=["System"])
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (never waits for data to load)."""
+    store = current_store()
     return {
         "status": "ok",
         "timestamp": datetime.now().isoformat(),
-        "games_loaded": len(games),
-        "tbd_games_loaded": len(tbd_games)
+        "ready": all(readiness.values()),
+        "subsystems": readiness,
+        "games_loaded": len(store.games) if store else 0,
+        "tbd_games_loaded": len(store.tbd_games) if store else 0,
+        "dataset": store.dataset_info if store else None,
+        "caches": cache_stats(store)
     }
 
 
@@ -2225,53 +2281,19 @@ def health_check():
          tags=["Search"])
 def search(
     q: str = Query(..., description="Search query (min 2 characters)"),
-    types: List[str] = Query(["teams", "cities", "leagues"], description="Types of entities to search")
+    types: List[str] = Query(["teams", "cities", "leagues"], description="Types of entities to search"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results per type")
 ):
-    """Search across teams, cities, and leagues."""
+    """Search across teams, cities, and leagues (ranked, umlauts and accents folded)."""
+    store = require_store()
     if len(q) < 2:
         return JSONResponse(
             content={"error": "Search query must be at least 2 characters"},
             status_code=400
         )
-            
-    q_lower = q.lower()
-    results = {
-        "teams": [],
-        "cities": [],
-        "leagues": []
-    }
     
-    # Search teams
-    if "teams" in types:
-        all_teams = set()
-        for game in games:
-            if hasattr(game, 'home_team'):
-                all_teams.add(game.home_team)
-            if hasattr(game, 'away_team'):
-                all_teams.add(game.away_team)
-        
-        matching_teams = [team for team in all_teams if q_lower in team.lower()]
-        results["teams"] = sorted(matching_teams)
-    
-    # Search cities
-    if "cities" in types:
-        all_cities = set()
-        for city_pair in train_times.keys():
-            all_cities.add(city_pair[0].replace(" hbf", ""))
-            all_cities.add(city_pair[1].replace(" hbf", ""))
-        
-        matching_cities = [city for city in all_cities if q_lower in city.lower()]
-        results["cities"] = sorted(matching_cities)
-    
-    # Search leagues
-    if "leagues" in types:
-        all_leagues = set()
-        for game in games:
-            if hasattr(game, 'league'):
-                all_leagues.add(game.league)
-        
-        matching_leagues = [league for league in all_leagues if q_lower in league.lower()]
-        results["leagues"] = sorted(matching_leagues, key=lambda x: league_priority.get(x, 999))
+    # Prebuilt per data version: an n-gram lookup, not a scan over every game and station
+    results = store.search_index.search(q, types, limit)
     
     return {
         "query": q,
@@ -2289,6 +2311,7 @@ def get_game_details(
     include_past: bool = Query(False, description="Include games from past dates")
 ):
     """Get detailed game information for a specific date and league."""
+    store = require_store()
     try:
         target_date = datetime.strptime(date, "%Y-%m-%d").date()
         today = datetime.now().date()
@@ -2305,38 +2328,8 @@ def get_game_details(
                 "message": "This date has passed. Set include_past=true to see historical games."
             }
             
-        # Filter games by league and date
-        day_games = []
-        
-        # Process regular games
-        for game in games:
-            if not (hasattr(game, 'date') and hasattr(game, 'league')):
-                continue
-                
-            game_date = game.date.date()
-            if game_date == target_date and game.league == league:
-                day_games.append({
-                    "match": f"{game.home_team} vs {game.away_team}",
-                    "time": game.time if hasattr(game, 'time') else "TBD",
-                    "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-                    "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown",
-                    "league": game.league
-                })
-        
-        # Process TBD games
-        for game in tbd_games:
-            if not (hasattr(game, 'date') and hasattr(game, 'league')):
-                continue
-                
-            game_date = game.date.date()
-            if game_date == target_date and game.league == league:
-                day_games.append({
-                    "match": f"{game.home_team} vs {game.away_team}",
-                    "time": "TBD",
-                    "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-                    "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown",
-                    "league": game.league
-                })
+        # Filter games by league and date (cached per day, survives unrelated schedule reloads)
+        day_games = list(get_day_games(store, target_date, league))
         
         return {
             "league": league,
@@ -2360,19 +2353,11 @@ def get_league_schedule(
     league: str = Path(..., description="The league name")
 ):
     """Get future games schedule for a specific league."""
+    store = require_store()
     today = datetime.now().date()
     
     # Find matching league with correct capitalization
-    league_name = None
-    all_leagues = set()
-    for game in games:
-        if hasattr(game, 'league'):
-            all_leagues.add(game.league)
-    
-    for l in all_leagues:
-        if l.lower() == league.lower():
-            league_name = l
-            break
+    league_name = store.schedule_index.league_names.get(league.lower())
     
     if not league_name:
         return JSONResponse(
@@ -2380,56 +2365,25 @@ def get_league_schedule(
             status_code=404
         )
     
-    # Group games by date
+    # Group games by date: regular games, then TBD games
     dates_with_games = {}
-    
-    # Process regular games
-    for game in games:
-        if not (hasattr(game, 'date') and hasattr(game, 'league') and game.league == league_name):
-            continue
-            
-        game_date = game.date.date()
-        
-        # Skip dates that have passed
-        if game_date < today:
-            continue
-            
-        date_str = game_date.strftime("%Y-%m-%d")
-        if date_str not in dates_with_games:
-            dates_with_games[date_str] = {
-                "date": game_date.strftime("%d %B %Y"),
-                "games": []
-            }
-        
-        dates_with_games[date_str]["games"].append({
-            "match": f"{game.home_team} vs {game.away_team}",
-            "time": game.time if hasattr(game, 'time') else "TBD",
-            "location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown"
-        })
-    
-    # Process TBD games
-    for game in tbd_games:
-        if not (hasattr(game, 'date') and hasattr(game, 'league') and game.league == league_name):
-            continue
-            
-        game_date = game.date.date()
-        
-        # Skip dates that have passed
-        if game_date < today:
-            continue
+    for tbd in (False, True):
+        for game in store.schedule_index.select(tbd=tbd, league=league_name, since=today):
+            if game.league != league_name:
+                continue
+                
+            date_str = game.date.strftime("%Y-%m-%d")
+            if date_str not in dates_with_games:
+                dates_with_games[date_str] = {
+                    "date": game.date.strftime("%d %B %Y"),
+                    "games": []
+                }
             
-        date_str = game_date.strftime("%Y-%m-%d")
-        if date_str not in dates_with_games:
-            dates_with_games[date_str] = {
-                "date": game_date.strftime("%d %B %Y"),
-                "games": []
-            }
-        
-        dates_with_games[date_str]["games"].append({
-            "match": f"{game.home_team} vs {game.away_team}",
-            "time": "TBD",
-            "location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown"
-        })
+            dates_with_games[date_str]["games"].append({
+                "match": f"{game.home_team} vs {game.away_team}",
+                "time": "TBD" if tbd else game.time,
+                "location": game.hbf_location.replace(" hbf", "")
+            })
     
     # Sort dates and games
     sorted_dates = sorted(dates_with_games.keys())
@@ -2456,18 +2410,15 @@ def get_league_schedule(
          tags=["Travel Data"])
 def get_airport_information(city: Optional[str] = Query(None, description="Filter for connections to a specific city")):
     """Get airport information and their connections to cities."""    
+    store = require_store()
     airports = []
     for airport in AIRPORT_CITIES:
         airport_clean = airport.replace(" hbf", "")
         
         # If city filter is provided, check connections
         if city:
-            # Find exact match for city
-            city_match = None
-            for city_key in set(c for pair in train_times.keys() for c in pair):
-                if city_key.lower() == city.lower():
-                    city_match = city_key
-                    break
+            # Canonical station for this spelling
+            city_match = resolve_station(store.train_times, city)
             
             if not city_match:
                 return JSONResponse(
@@ -2476,8 +2427,8 @@ def get_airport_information(city: Optional[str] = Query(None, description="Filte
                 )
             
             # Check if there's a direct connection
-            travel_minutes = train_times.get((city_match, airport), None)
-            if travel_minutes is None:
+            travel_minutes = get_travel_minutes_utils(store.train_times, city_match, airport)
+            if travel_minutes is None or city_match == airport:
                 continue
                 
             travel_time = format_travel_time(travel_minutes)
@@ -2492,24 +2443,21 @@ def get_airport_information(city: Optional[str] = Query(None, description="Filte
                 }]
             })
         else:
-            # Get all connections for this airport
-            connections = []
-            for city_pair, travel_time in train_times.items():
-                if city_pair[0] == airport:
-                    dest_city = city_pair[1]
-                    connections.append({
-                        "city": dest_city,
-                        "display_name": dest_city.replace(" hbf", ""),
-                        "travel_time": travel_time,
-                        "travel_time_formatted": format_travel_time(travel_time)
-                    })
-            
-            # Sort connections by travel time
-            connections.sort(key=lambda x: x["travel_time"])
+            # Nearest connections for this airport, already sorted by travel time
+            nearest = neighbors_within(store.train_times, airport, float("inf"))[:20]  # Limit to top 20 connections to avoid huge response
+            connections = [
+                {
+                    "city": dest_city,
+                    "display_name": dest_city.replace(" hbf", ""),
+                    "travel_time": travel_time,
+                    "travel_time_formatted": format_travel_time(travel_time)
+                }
+                for dest_city, travel_time in nearest
+            ]
             
             airports.append({
                 "airport": airport_clean,
-                "connections": connections[:20]  # Limit to top 20 connections to avoid huge response
+                "connections": connections
             })
     
     return {
@@ -2524,21 +2472,23 @@ def get_airport_information(city: Optional[str] = Query(None, description="Filte
          tags=["Travel Data"])
 def get_travel_stats():
     """Get statistics about travel times between cities."""
-    if not train_times:
+    store = require_store()
+    if not store.train_times:
         return JSONResponse(
             content={"error": "No travel data available"},
             status_code=500
         )
     
-    # Calculate statistics
-    travel_times = list(train_times.values())
+    # Calculate statistics over real connections (not the same-city 0-minute entries)
+    connections = list(iter_connections(store.train_times))
+    travel_times = [minutes for _, minutes in connections]
     avg_travel_time = sum(travel_times) / len(travel_times) if travel_times else 0
     max_travel_time = max(travel_times) if travel_times else 0
     min_travel_time = min(travel_times) if travel_times else 0
     
     # Get most connected cities
     city_connections = {}
-    for city_pair in train_times.keys():
+    for city_pair, _ in connections:
         city1, city2 = city_pair
         
         if city1 not in city_connections:
@@ -2558,18 +2508,19 @@ def get_travel_stats():
     
     # Get fastest and slowest connections
     fastest = sorted(
-        [(pair, time) for pair, time in train_times.items()],
+        connections,
         key=lambda x: x[1]
     )[:5]  # Top 5 fastest
     
     slowest = sorted(
-        [(pair, time) for pair, time in train_times.items()],
+        connections,
         key=lambda x: x[1],
         reverse=True
     )[:5]  # Top 5 slowest
     
     return {
-        "total_connections": len(train_times),
+        "total_connections": len(connections),
+        "derived_connections": store.counts()["derived_connections"],  # filled in with transfers, not in the CSV
         "average_travel_time": {
             "minutes": round(avg_travel_time),
             "formatted": format_travel_time(round(avg_travel_time))
@@ -2624,6 +2575,7 @@ def get_games_by_date(
     include_past: bool = Query(False, description="Include games from past dates")
 ):
     """Get all games scheduled for a specific date."""
+    store = require_store()
     try:
         target_date = datetime.strptime(date, "%Y-%m-%d").date()
         today = datetime.now().date()
@@ -2640,46 +2592,8 @@ def get_games_by_date(
                 "message": "This date has passed. Set include_past=true to see historical games."
             }
             
-        # Filter games by date
-        day_games = []
-        
-        # Process regular games
-        for game in games:
-            if not hasattr(game, 'date'):
-                continue
-                
-            game_date = game.date.date()
-            if game_date == target_date:
-                # Apply league filter if specified
-                if league and hasattr(game, 'league') and game.league != league:
-                    continue
-                    
-                day_games.append({
-                    "match": f"{game.home_team} vs {game.away_team}",
-                    "time": game.time if hasattr(game, 'time') else "TBD",
-                    "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-                    "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown",
-                    "league": game.league if hasattr(game, 'league') else "Unknown"
-                })
-        
-        # Process TBD games
-        for game in tbd_games:
-            if not hasattr(game, 'date'):
-                continue
-                
-            game_date = game.date.date()
-            if game_date == target_date:
-                # Apply league filter if specified
-                if league and hasattr(game, 'league') and game.league != league:
-                    continue
-                    
-                day_games.append({
-                    "match": f"{game.home_team} vs {game.away_team}",
-                    "time": "TBD",
-                    "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-                    "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown",
-                    "league": game.league if hasattr(game, 'league') else "Unknown"
-                })
+        # Filter games by date (cached per day, survives unrelated schedule reloads)
+        day_games = list(get_day_games(store, target_date, league))
         
         # Group by league
         by_league = {}
@@ -2703,17 +2617,88 @@ def get_games_by_date(
             status_code=400
         )  
     
+@app.get("/games",
+         summary="Get all games in a date range",
+         description="Returns the games from one date to another, grouped by date and league (one request for a month view)",
+         tags=["Game Data"])
+def get_games_in_range(
+    date_from: str = Query(..., alias="from", description="First date in YYYY-MM-DD format"),
+    date_to: str = Query(..., alias="to", description="Last date in YYYY-MM-DD format (inclusive)"),
+    league: Optional[str] = Query(None, description="Filter by league"),
+    include_past: bool = Query(False, description="Include games from past dates")
+):
+    """Get games for a range of dates, each date shaped like /games-by-date."""
+    store = require_store()
+    try:
+        first = datetime.strptime(date_from, "%Y-%m-%d").date()
+        last = datetime.strptime(date_to, "%Y-%m-%d").date()
+    except ValueError:
+        return JSONResponse(
+            content={"error": "Invalid date format. Please use YYYY-MM-DD."},
+            status_code=400
+        )
+    if last < first:
+        return JSONResponse(
+            content={"error": "'to' must not be before 'from'."},
+            status_code=400
+        )
+    if (last - first).days >= GAMES_RANGE_MAX_DAYS:
+        return JSONResponse(
+            content={"error": f"At most {GAMES_RANGE_MAX_DAYS} days per request."},
+            status_code=400
+        )
+    
+    # Past dates are left out unless asked for, as in /games-by-date
+    today = datetime.now().date()
+    if not include_past:
+        first = max(first, today)
+    
+    # Two bisects on the date-sorted index; regular games before TBD games within a date
+    dates = {}
+    for tbd in (False, True):
+        for game in store.schedule_index.between(first, last, tbd=tbd, league=league):
+            if league and game.league != league:
+                continue
+            date_str = game.date.strftime("%Y-%m-%d")
+            if date_str not in dates:
+                dates[date_str] = {
+                    "date": date_str,
+                    "display_date": game.date.strftime("%d %B %Y"),
+                    "games_by_league": {}
+                }
+            dates[date_str]["games_by_league"].setdefault(game.league, []).append(day_game_info(game, tbd))
+    
+    days = []
+    for date_str in sorted(dates):
+        day = dates[date_str]
+        day["total_games"] = sum(len(games) for games in day["games_by_league"].values())
+        day["leagues"] = list(day["games_by_league"].keys())
+        day["is_past_date"] = date_str < today.isoformat()
+        days.append(day)
+    
+    return {
+        "from": date_from,
+        "to": date_to,
+        "dates": days,
+        "total_dates": len(days),
+        "total_games": sum(day["total_games"] for day in days)
+    }
+
 @app.post("/admin/refresh-data",
          summary="Refresh game and travel data",
          description="Reloads game schedules and train times from data files",
          tags=["Administration"])
-async def refresh_data(admin_user = Depends(verify_admin_user)):
+async def refresh_data(
+    incremental: bool = Query(False, description="Only re-read the games file and apply the fixture changes"),
+    admin_user = Depends(verify_admin_user)
+):
     """Refresh all data from source files - admin only."""
     
-    log_user_request(admin_user, "/admin/refresh-data")
+    log_user_request(admin_user, "/admin/refresh-data", {"incremental": incremental})
     
     try:
-        global train_times, games, tbd_games
+        # Waits for (or retries) the first load in a worker thread, never on the event loop
+        store = await asyncio.to_thread(get_store)
         
         # Log admin action start
         await db_service.log_admin_action(
@@ -2723,33 +2708,25 @@ async def refresh_data(admin_user = Depends(verify_admin_user)):
                 'admin_email': admin_user['email'],
                 'endpoint': '/admin/refresh-data',
                 'previous_counts': {
-                    'games': len(games),
-                    'tbd_games': len(tbd_games),
-                    'train_connections': len(train_times)
+                    'games': len(store.games),
+                    'tbd_games': len(store.tbd_games),
+                    'train_connections': count_connections(store.train_times)
                 }
             }
         )
         
-        # Reload data
-        new_train_times = load_train_times(TRAIN_TIMES_FILE)
-        new_games, new_tbd_games = load_games(GAMES_FILE)
-        
-        # Update global variables
-        old_counts = {
-            'games': len(games),
-            'tbd_games': len(tbd_games),
-            'train_connections': len(train_times)
-        }
+        # The rebuild runs in a worker thread, so the event loop keeps serving requests from the old store
+        if incremental:
+            # Diff the games file against the live store; only the changed dates lose cached results
+            old_store, store, schedule_diff = await asyncio.to_thread(reload_schedule, GAMES_FILE)
+        else:
+            # Build a complete new store (re-opening the artifact in case it was recompiled)
+            # and swap it in atomically; in-flight requests finish on the old one
+            old_store, store = await asyncio.to_thread(refresh_store, reopen=True)
+            schedule_diff = None
         
-        train_times = new_train_times
-        games = new_games
-        tbd_games = new_tbd_games
-        
-        new_counts = {
-            'games': len(games),
-            'tbd_games': len(tbd_games),
-            'train_connections': len(train_times)
-        }
+        old_counts = old_store.counts()
+        new_counts = store.counts()
         
         # Log successful admin action
         await db_service.log_admin_action(
@@ -2759,6 +2736,7 @@ async def refresh_data(admin_user = Depends(verify_admin_user)):
                 'admin_email': admin_user['email'],
                 'old_counts': old_counts,
                 'new_counts': new_counts,
+                'incremental': incremental,
                 'changes': {
                     'games_change': new_counts['games'] - old_counts['games'],
                     'tbd_games_change': new_counts['tbd_games'] - old_counts['tbd_games'],
@@ -2772,15 +2750,18 @@ async def refresh_data(admin_user = Depends(verify_admin_user)):
         return {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
-            "games_loaded": len(games),
-            "tbd_games_loaded": len(tbd_games),
-            "train_connections_loaded": len(train_times),
+            "games_loaded": len(store.games),
+            "tbd_games_loaded": len(store.tbd_games),
+            "train_connections_loaded": count_connections(store.train_times),
+            "dataset": store.dataset_info,
+            "unresolved_stations": store.dataset_info.get("unresolved_stations", []),
             "refreshed_by": admin_user['email'],
             "changes": {
                 "games_change": new_counts['games'] - old_counts['games'],
                 "tbd_games_change": new_counts['tbd_games'] - old_counts['tbd_games'],
                 "train_connections_change": new_counts['train_connections'] - old_counts['train_connections']
-            }
+            },
+            "schedule_diff": schedule_diff.summary() if schedule_diff is not None else None
         }
     except Exception as e:
         # Log failed admin action
@@ -2921,39 +2902,20 @@ def get_tbd_games(
     team: Optional[str] = Query(None, description="Filter by team")
 ):
     """Get all future games without confirmed times."""
+    store = require_store()
     try:
         filtered_games = []
         today = datetime.now().date()
         
-        for game in tbd_games:
-            if not hasattr(game, 'date'):
-                continue
-                
-            game_date = game.date.date()
-            
-            # Skip dates that have passed
-            if game_date < today:
-                continue
-                
-            # Apply league filter if specified
-            if league and hasattr(game, 'league') and game.league.lower() != league.lower():
-                continue
-                
-            # Apply team filter if specified
-            if team and not ((hasattr(game, 'home_team') and game.home_team.lower() == team.lower()) or 
-                           (hasattr(game, 'away_team') and game.away_team.lower() == team.lower())):
-                continue
-                
+        for game in store.schedule_index.select(tbd=True, league=league, team=team, since=today):
             # Format the game for response
-            game_info = {
+            filtered_games.append({
                 "match": f"{game.home_team} vs {game.away_team}",
-                "date": game_date.strftime("%d %B %Y"),
-                "league": game.league if hasattr(game, 'league') else "Unknown",
-                "location": game.hbf_location if hasattr(game, 'hbf_location') else "Unknown",
-                "display_location": game.hbf_location.replace(" hbf", "") if hasattr(game, 'hbf_location') else "Unknown"
-            }
-            
-            filtered_games.append(game_info)
+                "date": game.date.strftime("%d %B %Y"),
+                "league": game.league,
+                "location": game.hbf_location,
+                "display_location": game.hbf_location.replace(" hbf", "")
+            })
             
         # Sort by date
         sorted_games = sorted(filtered_games, key=lambda x: x["date"])
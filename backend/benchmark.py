@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Local Benchmarks for BundesTrip Backend Internals
+Run from the backend directory, e.g. `python benchmark.py loading`
+"""
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def generate_games_csv(path, rows):
+    """Write a synthetic games file with the same columns as allgames.txt"""
+    from data.synonyms import bundesliga_1_stadiums, bundesliga_2_stadiums, third_liga_stadiums
+
+    leagues = [
+        ("Bundesliga", [t["team"] for t in bundesliga_1_stadiums]),
+        ("2. Bundesliga", [t["team"] for t in bundesliga_2_stadiums]),
+        ("3. Liga", [t["team"] for t in third_liga_stadiums]),
+    ]
+    first_day = datetime(2025, 8, 1)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("League, Date, Time, Home Team, Away Team, Location\n")
+        for _ in range(rows):
+            league, teams = random.choice(leagues)
+            home, away = random.sample(teams, 2)
+            day = first_day + timedelta(days=random.randint(0, 300))
+            kickoff = random.choice(["15:30", "18:30", "20:30", "TBD"])
+            f.write(f"{league}, {day.day} {day.strftime('%B %Y')}, {kickoff}, {home}, {away},\n")
+
+def generate_train_times_csv(path, rows):
+    """Write a synthetic fastest_train_times.csv with roughly `rows` station pairs"""
+    stations = max(2, int((2 * rows) ** 0.5) + 1)
+    names = [f"Station {i} hbf" for i in range(stations)]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("From,To,Fastest Train Time\n")
+        written = 0
+        for i in range(stations):
+            for j in range(i + 1, stations):
+                if written >= rows:
+                    return
+                minutes = random.randint(20, 600)
+                f.write(f"{names[i]},{names[j]},{minutes // 60}h {minutes % 60}m\n")
+                written += 1
+
+def time_call(func, *args, repeat=3):
+    """Return the best wall time of `repeat` runs in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark_loading(sizes):
+    """Measure load_games / load_train_times against the number of CSV rows"""
+    from utils import load_games, load_train_times
+
+    print("📥 Data loading benchmark")
+    print(f"{'rows':>10} | {'load_games':>12} | {'load_train_times':>16}")
+    print("-" * 46)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            games_path = os.path.join(tmp, f"games_{rows}.txt")
+            times_path = os.path.join(tmp, f"times_{rows}.csv")
+            generate_games_csv(games_path, rows)
+            generate_train_times_csv(times_path, rows)
+
+            games_s = time_call(load_games, games_path)
+            times_s = time_call(load_train_times, times_path)
+            print(f"{rows:>10} | {games_s * 1000:>10.1f}ms | {times_s * 1000:>14.1f}ms")
+
+def read_memory_kb():
+    """Rss / Pss / private (USS) of the current process in kB, from /proc/self/smaps_rollup"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), private
+
+def touch_store(store):
+    """What a worker does to shared data while serving: read every game, look up travel times, collect"""
+    from utils import get_travel_minutes_utils
+    stations = [game.hbf_location for game in store.games[:200]]
+    for game in store.games + store.tbd_games:
+        game.league, game.date, game.hbf_location
+    for from_loc in stations[:20]:
+        for to_loc in stations:
+            get_travel_minutes_utils(store.train_times, from_loc, to_loc)
+    gc.collect()
+
+def benchmark_workers(counts, games_rows, train_rows):
+    """Per-worker memory when N forked workers share one preloaded store, with and without gc.freeze"""
+    import data_store
+
+    print("🧠 Forked worker memory benchmark (per worker, after touching the shared store)")
+    print(f"{'workers':>8} | {'gc.freeze':>9} | {'rss':>10} | {'pss':>10} | {'private':>10}")
+    print("-" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        games_path = os.path.join(tmp, "games.txt")
+        times_path = os.path.join(tmp, "times.csv")
+        generate_games_csv(games_path, games_rows)
+        generate_train_times_csv(times_path, train_rows)
+        store = data_store.build_store(games_file=games_path, train_times_file=times_path, artifact_file=None)
+        data_store.swap_store(store)
+
+        for freeze in (False, True):
+            if freeze:
+                data_store.freeze_for_fork()
+            for count in counts:
+                pipes, pids = [], []
+                for _ in range(count):
+                    read_fd, write_fd = os.pipe()
+                    pid = os.fork()
+                    if pid == 0:
+                        os.close(read_fd)
+                        touch_store(data_store.get_store())
+                        os.write(write_fd, " ".join(map(str, read_memory_kb())).encode())
+                        os._exit(0)
+                    os.close(write_fd)
+                    pipes.append(read_fd)
+                    pids.append(pid)
+
+                samples = []
+                for read_fd, pid in zip(pipes, pids):
+                    samples.append([int(v) for v in os.read(read_fd, 256).split()])
+                    os.close(read_fd)
+                    os.waitpid(pid, 0)
+
+                rss, pss, private = (sum(column) / len(samples) / 1024 for column in zip(*samples))
+                print(f"{count:>8} | {'on' if freeze else 'off':>9} | {rss:>8.1f}MB | {pss:>8.1f}MB | {private:>8.1f}MB")
+            if freeze:
+                gc.unfreeze()
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} for the top two import levels of `python -X importtime` output"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumul_us, name = line.split(":", 1)[1].split("|")
+        # Nested imports are indented two spaces per level under the module that triggered them
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            cumulative[name.strip()] = int(cumul_us)
+    return cumulative
+
+def benchmark_coldstart(module, runs, top):
+    """Import `module` in fresh interpreters and report wall time and per-module import time"""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    walls, samples = [], []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=backend_dir, capture_output=True, text=True
+        )
+        walls.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            print(result.stderr.strip().splitlines()[-1])
+            return
+        samples.append(parse_importtime(result.stderr))
+
+    modules = set().union(*samples)
+    median_us = {name: statistics.median(s.get(name, 0) for s in samples) for name in modules}
+
+    print(f"🥶 Cold start: `import {module}` in a fresh interpreter ({runs} runs)")
+    print(f"   wall time (incl. interpreter start): median {statistics.median(walls) * 1000:.0f}ms")
+    print(f"{'module':>28} | {'cumulative':>10}")
+    print("-" * 42)
+    for name, us in sorted(median_us.items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:>28} | {us / 1000:>8.1f}ms")
+
+def benchmark_lookups(train_rows, lookups):
+    """Travel-time lookups and memory: train_times dict of name pairs vs. the interned station matrix"""
+    from utils import load_train_times, add_missing_same_city_travel_times
+    from travel_graph import TravelTimeMatrix, stations_within
+
+    print("🚆 Travel-time lookup benchmark")
+    with tempfile.TemporaryDirectory() as tmp:
+        times_path = os.path.join(tmp, "times.csv")
+        generate_train_times_csv(times_path, train_rows)
+        train_times = add_missing_same_city_travel_times(load_train_times(times_path))
+    matrix = TravelTimeMatrix.from_dict(train_times)
+
+    stations = matrix.stations
+    pairs = [(random.choice(stations), random.choice(stations)) for _ in range(lookups)]
+    targets = list(stations[:5])
+
+    def dict_lookups():
+        for a, b in pairs:
+            train_times.get((a, b), train_times.get((b, a), float("inf")))
+
+    def matrix_lookups():
+        for a, b in pairs:
+            matrix.minutes_between(a, b)
+
+    dict_bytes = sys.getsizeof(train_times) + sum(sys.getsizeof(k) for k in train_times)
+    print(f"   {len(stations)} stations, {len(train_times)} pairs")
+    print(f"{'':>14} | {'lookup':>10} | {'within(5)':>10} | {'memory':>10}")
+    print("-" * 54)
+    print(f"{'dict':>14} | {time_call(dict_lookups) / lookups * 1e9:>8.0f}ns | "
+          f"{time_call(stations_within, train_times, targets, 240) * 1e6:>8.0f}µs | {dict_bytes / 1024:>8.0f}kB")
+    print(f"{'matrix':>14} | {time_call(matrix_lookups) / lookups * 1e9:>8.0f}ns | "
+          f"{time_call(stations_within, matrix, targets, 240) * 1e6:>8.0f}µs | {matrix.minutes.nbytes / 1024:>8.0f}kB")
+
+def benchmark_completion(station_counts, density, transfer_penalty):
+    """Build time of the all-pairs completion (missing pairs via transfers) vs. station count"""
+    import numpy as np
+    from travel_graph import UNKNOWN_MINUTES, complete_travel_times
+
+    print(f"🧮 Travel-time completion benchmark (density {density:.0%}, transfer penalty {transfer_penalty}m)")
+    print(f"{'stations':>10} | {'known pairs':>12} | {'derived':>10} | {'build':>10}")
+    print("-" * 52)
+
+    rng = np.random.default_rng(42)
+    for stations in station_counts:
+        minutes = rng.integers(20, 600, size=(stations, stations)).astype(np.uint16)
+        minutes = np.minimum(minutes, minutes.T)
+        known = np.triu(rng.random((stations, stations)) < density, 1)
+        known |= known.T
+        np.fill_diagonal(known, True)
+        np.fill_diagonal(minutes, 0)
+        minutes[~known] = UNKNOWN_MINUTES
+
+        build_s = time_call(complete_travel_times, minutes, transfer_penalty, repeat=1)
+        _, derived = complete_travel_times(minutes, transfer_penalty)
+        print(f"{stations:>10} | {int(known.sum()):>12} | {int(derived.sum()):>10} | {build_s * 1000:>8.1f}ms")
+
+def benchmark_sparse(station_counts, degree, lookups, transfer_penalty):
+    """Sparse graph: build, memory and on-demand shortest-path lookups vs. station count"""
+    from travel_graph import SparseTravelGraph
+
+    print(f"🕸️ Sparse travel graph benchmark (~{degree} direct connections per station)")
+    print(f"{'stations':>10} | {'build':>9} | {'edges':>8} | {'graph':>9} | {'dense':>9} | {'cold':>9} | {'cached':>9}")
+    print("-" * 82)
+
+    for stations in station_counts:
+        # Stations on a plane, each connected to a few random others; minutes ~ distance
+        points = [(random.random() * 800, random.random() * 800) for _ in range(stations)]
+        names = [f"Station {i}" for i in range(stations)]
+        train_times = {}
+        for i in range(stations):
+            for j in random.sample(range(stations), degree):
+                if i != j:
+                    minutes = int(((points[i][0] - points[j][0]) ** 2 + (points[i][1] - points[j][1]) ** 2) ** 0.5) + 10
+                    train_times[(names[i], names[j])] = train_times[(names[j], names[i])] = minutes
+
+        start = time.perf_counter()
+        graph = SparseTravelGraph.from_dict(train_times, transfer_penalty=transfer_penalty, cache_size=lookups)
+        build_s = time.perf_counter() - start
+        graph_bytes = sum(sys.getsizeof(edges) for edges in graph.adjacency)
+
+        sources = random.sample(names, min(lookups, stations))
+        targets = [random.choice(names) for _ in sources]
+        start = time.perf_counter()
+        for a, b in zip(sources, targets):
+            graph.minutes_between(a, b)
+        cold_s = (time.perf_counter() - start) / len(sources)
+        start = time.perf_counter()
+        for a, b in zip(sources, targets):
+            graph.minutes_between(a, b)
+        cached_s = (time.perf_counter() - start) / len(sources)
+
+        print(f"{stations:>10} | {build_s * 1000:>7.0f}ms | {len(graph):>8} | {graph_bytes / 2**20:>7.1f}MB | "
+              f"{stations * stations * 2 / 2**20:>7.1f}MB | {cold_s * 1000:>7.1f}ms | {cached_s * 1e6:>7.1f}µs")
+
+def generate_timetable_csv(path, stations, lines, stops, hourly_from=5, hourly_to=23):
+    """Write a synthetic timetable: `lines` train lines of `stops` stations, one train per hour each way"""
+    points = [(random.random() * 600, random.random() * 600) for _ in range(stations)]
+    names = [f"Station {i} hbf" for i in range(stations)]
+    rows = 0
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("From,To,Departure,Arrival,Train\n")
+        for line in range(lines):
+            route = random.sample(range(stations), min(stops, stations))
+            for direction, path_ids in (("a", route), ("b", route[::-1])):
+                for hour in range(hourly_from, hourly_to):
+                    clock = hour * 60 + random.randint(0, 59)
+                    for a, b in zip(path_ids, path_ids[1:]):
+                        ride = int(((points[a][0] - points[b][0]) ** 2 + (points[a][1] - points[b][1]) ** 2) ** 0.5) + 10
+                        f.write(f"{names[a]},{names[b]},{clock // 60 % 24:02d}:{clock % 60:02d},"
+                                f"{(clock + ride) // 60 % 24:02d}:{(clock + ride) % 60:02d},L{line}{direction}{hour}\n")
+                        clock += ride + 2
+                        rows += 1
+    return names, rows
+
+def benchmark_timetable(station_counts, lines, stops, lookups):
+    """Timetable engine: profile precompute and earliest-arrival queries vs. the fastest-time dict lookup"""
+    from timetable import TimetableEngine
+
+    print(f"🕐 Timetable engine benchmark ({lines} lines x {stops} stops, hourly both ways)")
+    print(f"{'stations':>10} | {'connections':>11} | {'profiles':>9} | {'memory':>9} | {'dict':>8} | {'timetable':>9}")
+    print("-" * 72)
+
+    for stations in station_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "timetable.csv")
+            names, _ = generate_timetable_csv(path, stations, lines, stops)
+            engine = TimetableEngine.from_csv(path)
+        build_s = engine.precompute()
+        profile_bytes = sum(departures.buffer_info()[1] * departures.itemsize * 2
+                            for profile in engine._profiles.values() for departures, _ in profile)
+
+        # The "fastest" baseline: one duration per station pair in a name-pair dict
+        fastest = {}
+        for departure, arrival, a, b, _ in engine.connections:
+            key = (engine.stations[a], engine.stations[b])
+            fastest[key] = min(fastest.get(key, arrival - departure), arrival - departure)
+
+        known = engine.stations
+        queries = [(random.choice(known), random.choice(known), random.randint(6 * 60, 22 * 60)) for _ in range(lookups)]
+
+        def dict_lookups():
+            for a, b, _ in queries:
+                fastest.get((a, b), fastest.get((b, a), float("inf")))
+
+        def timetable_lookups():
+            for a, b, t in queries:
+                engine.earliest_arrival(a, b, t)
+
+        print(f"{stations:>10} | {len(engine.connections):>11} | {build_s:>8.2f}s | {profile_bytes / 2**20:>7.1f}MB | "
+              f"{time_call(dict_lookups) / lookups * 1e9:>6.0f}ns | {time_call(timetable_lookups) / lookups * 1e6:>7.2f}µs")
+
+def main():
+    parser = argparse.ArgumentParser(description="BundesTrip backend benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    loading = sub.add_parser("loading", help="CSV ingestion time vs. row count")
+    loading.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 100000])
+
+    workers = sub.add_parser("workers", help="Per-worker memory with N forked workers sharing one store (Linux)")
+    workers.add_argument("--counts", type=int, nargs="+", default=[1, 4, 8])
+    workers.add_argument("--games-rows", type=int, default=50000)
+    workers.add_argument("--train-rows", type=int, default=20000)
+
+    coldstart = sub.add_parser("coldstart", help="Per-module import time of the app in fresh interpreters")
+    coldstart.add_argument("--module", default="app")
+    coldstart.add_argument("--runs", type=int, default=5)
+    coldstart.add_argument("--top", type=int, default=20)
+
+    lookups = sub.add_parser("lookups", help="Travel-time lookup cost and memory: name-pair dict vs. station matrix")
+    lookups.add_argument("--train-rows", type=int, default=20000)
+    lookups.add_argument("--lookups", type=int, default=200000)
+
+    completion = sub.add_parser("completion", help="All-pairs completion build time vs. station count")
+    completion.add_argument("--stations", type=int, nargs="+", default=[100, 250, 500, 1000])
+    completion.add_argument("--density", type=float, default=0.1, help="Share of station pairs listed in the CSV")
+    completion.add_argument("--transfer-penalty", type=int, default=20)
+
+    sparse = sub.add_parser("sparse", help="Sparse graph build, memory and Dijkstra lookups vs. station count")
+    sparse.add_argument("--stations", type=int, nargs="+", default=[1000, 5000, 10000])
+    sparse.add_argument("--degree", type=int, default=6)
+    sparse.add_argument("--lookups", type=int, default=200)
+    sparse.add_argument("--transfer-penalty", type=int, default=20)
+
+    timetable = sub.add_parser("timetable", help="Timetable profile precompute and earliest-arrival queries vs. dict lookup")
+    timetable.add_argument("--stations", type=int, nargs="+", default=[50, 100, 200])
+    timetable.add_argument("--lines", type=int, default=40)
+    timetable.add_argument("--stops", type=int, default=8)
+    timetable.add_argument("--lookups", type=int, default=200000)
+
+    args = parser.parse_args()
+    random.seed(42)
+
+    if args.command == "loading":
+        benchmark_loading(args.sizes)
+    elif args.command == "workers":
+        benchmark_workers(args.counts, args.games_rows, args.train_rows)
+    elif args.command == "coldstart":
+        benchmark_coldstart(args.module, args.runs, args.top)
+    elif args.command == "lookups":
+        benchmark_lookups(args.train_rows, args.lookups)
+    elif args.command == "completion":
+        benchmark_completion(args.stations, args.density, args.transfer_penalty)
+    elif args.command == "sparse":
+        benchmark_sparse(args.stations, args.degree, args.lookups, args.transfer_penalty)
+    elif args.command == "timetable":
+        benchmark_timetable(args.stations, args.lines, args.stops, args.lookups)
+
+if __name__ == "__main__":
+    main()
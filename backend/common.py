@@ -1,6 +1,10 @@
+import functools
+import re
+import unicodedata
 import uuid
 import logging
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 # Configure logging
 logger = logging.getLogger("trip-planner")
@@ -74,4 +78,52 @@ def get_processed_start_date(start_date=None):
         today = datetime.now()
         next_year = today.year + 1  # Use next year for default dates
         start_with_year = today.replace(year=next_year)
-        return start_with_year, today.strftime("%d %B")
\ No newline at end of file
+        return start_with_year, today.strftime("%d %B")
+
+# ────────────────────────────────
+# 🔤 Name keys (no data dependencies, so models can import them at load)
+# ────────────────────────────────
+
+# German umlauts are folded the way they are commonly transliterated
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# After transliteration "ä"/"ae"/"a" (and ö, ü) are one letter in lookup keys
+_UMLAUT_DIGRAPHS = re.compile(r"([aou])e")
+
+# Reserve-team spellings that all mean the club's second team
+RESERVE_SUFFIXES = ("ii", "2", "u23", "amateure")
+# Every suffix that marks a non-first team (youth teams are not interchangeable with II)
+NON_FIRST_TEAM_SUFFIXES = RESERVE_SUFFIXES + ("u21", "u19")
+
+def fold_name(name: str, transliterate: bool = True) -> str:
+    """Lowercase, transliterate umlauts (ü → ue, or just u), strip other accents and punctuation."""
+    folded = name.casefold()
+    if transliterate:
+        folded = folded.translate(_UMLAUTS)
+    folded = unicodedata.normalize("NFKD", folded)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", folded).strip()
+
+def split_suffix(key: str) -> Tuple[str, str]:
+    """Split a folded name into (base, team suffix); the suffix is "" for a first team."""
+    base, _, last = key.rpartition(" ")
+    if base and last in NON_FIRST_TEAM_SUFFIXES:
+        return base, "ii" if last in RESERVE_SUFFIXES else last
+    return key, ""
+
+@functools.lru_cache(maxsize=4096)
+def team_key(name: str, transliterate: bool = True) -> str:
+    """
+    Canonical lookup key: folded name with "II"/"U23"/"2"/"Amateure" written as "ii",
+    and "München", "Muenchen" and "Munchen" all written as "munchen".
+    """
+    base, suffix = split_suffix(fold_name(name, transliterate))
+    base = _UMLAUT_DIGRAPHS.sub(r"\1", base)
+    return f"{base} {suffix}" if suffix else base
+
+def clock_minutes(value: str) -> Optional[int]:
+    """"HH:MM" → minutes after midnight; None for TBD or anything unparsable."""
+    hours, sep, minutes = (value or "").strip().partition(":")
+    if not sep or not hours.isdigit() or not minutes[:2].isdigit():
+        return None
+    return int(hours) * 60 + int(minutes[:2])
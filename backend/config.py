@@ -23,6 +23,32 @@ if DEBUG:
 DATA_DIR = os.getenv("DATA_DIR", str(BASE_DIR / "data"))
 GAMES_FILE = os.getenv("GAMES_FILE", str(BASE_DIR / "data" / "allgames.txt"))
 TRAIN_TIMES_FILE = os.getenv("TRAIN_TIMES_FILE", str(BASE_DIR / "data" / "fastest_train_times.csv"))
+# Compiled binary artifact (python data_artifact.py compile); used instead of the CSVs when present
+DATA_ARTIFACT_FILE = os.getenv("DATA_ARTIFACT_FILE", str(BASE_DIR / "data" / "bundestrip.dat"))
+# Fill station pairs missing from TRAIN_TIMES_FILE with shortest paths over the known
+# connections, adding this many minutes per change of train
+COMPLETE_TRAIN_TIMES = os.getenv("COMPLETE_TRAIN_TIMES", "True").lower() == "true"
+TRANSFER_PENALTY_MINUTES = int(os.getenv("TRANSFER_PENALTY_MINUTES", "20"))
+# "matrix": every station pair in a dense table (artifact-backed); "sparse": direct connections
+# only, shortest paths computed on demand and cached per source station (large networks)
+TRAVEL_GRAPH_MODE = os.getenv("TRAVEL_GRAPH_MODE", "matrix").lower()
+SPARSE_GRAPH_CACHE_SOURCES = int(os.getenv("SPARSE_GRAPH_CACHE_SOURCES", "512"))
+# Entries in the travel-time lookup cache (get_travel_minutes_utils)
+TRAVEL_CACHE_SIZE = int(os.getenv("TRAVEL_CACHE_SIZE", "10000"))
+# (station, date) rows kept in the planner's reachable-games table per data version
+REACHABLE_TABLE_ROWS = int(os.getenv("REACHABLE_TABLE_ROWS", "50000"))
+# Largest station list accepted by POST /travel-matrix
+TRAVEL_MATRIX_MAX_STATIONS = int(os.getenv("TRAVEL_MATRIX_MAX_STATIONS", "500"))
+# Longest date range (in days) accepted by GET /games
+GAMES_RANGE_MAX_DAYS = int(os.getenv("GAMES_RANGE_MAX_DAYS", "366"))
+# Optional timetable (From,To,Departure,Arrival[,Train]) for the "timetable" travel engine
+TIMETABLE_FILE = os.getenv("TIMETABLE_FILE", str(BASE_DIR / "data" / "timetable.csv"))
+MIN_TRANSFER_MINUTES = int(os.getenv("MIN_TRANSFER_MINUTES", "5"))
+# Arrive at the stadium's station this long before kickoff; leave it this long after kickoff
+KICKOFF_BUFFER_MINUTES = int(os.getenv("KICKOFF_BUFFER_MINUTES", "45"))
+MATCH_DURATION_MINUTES = int(os.getenv("MATCH_DURATION_MINUTES", "150"))
+# Poll GAMES_FILE every N seconds and apply schedule changes incrementally (0 disables)
+GAMES_WATCH_INTERVAL = float(os.getenv("GAMES_WATCH_INTERVAL", "0"))
 
 # Debug: Print what we're loading
 if DEBUG:
@@ -84,8 +110,8 @@ def validate_config():
     if DEBUG:
         logger.debug("✅ Configuration validation passed")
 
-# Run validation on import
-validate_config()
+# Validation runs in the app's startup hook (not on import) so tools and
+# benchmarks can import config without the Supabase secrets
 
 # Default cities
 DEFAULT_CITIES = os.getenv("DEFAULT_CITIES", "")
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Compiled binary data artifact for game schedules and travel times.
+
+`python data_artifact.py compile` parses GAMES_FILE and TRAIN_TIMES_FILE once and
+writes a single versioned file holding interned station names, a uint16 travel
+time matrix and columnar game arrays. At startup the file is memory-mapped, so
+every uvicorn worker shares the same pages instead of re-parsing the CSVs into
+its own dict of string tuples.
+
+Layout: magic | format version | header length | JSON header | 64-byte aligned arrays
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from models import Game
+from travel_graph import SparseTravelGraph, TravelTimeMatrix
+
+logger = logging.getLogger("trip-planner")
+
+ARTIFACT_MAGIC = b"BTRIPDAT"
+ARTIFACT_FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+def source_checksum(*paths: str) -> str:
+    """SHA-256 over the raw bytes of the given source files, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def describe_csv_dataset(games_file: str, train_times_file: str) -> Dict:
+    """Dataset description for /health when data was parsed straight from the CSVs."""
+    checksum = source_checksum(games_file, train_times_file)
+    return {
+        "source": "csv",
+        "version": checksum[:12],
+        "source_checksum": checksum,
+    }
+
+def _content_checksum(tables: Dict, arrays: Dict[str, np.ndarray]) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps(tables, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    for name in sorted(arrays):
+        digest.update(name.encode("utf-8"))
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()
+
+# ────────────────────────────────
+# 🛠️ Compile
+# ────────────────────────────────
+
+def compile_artifact(games: List[Game], tbd_games: List[Game], train_times: Dict,
+                     output_path: str, source_files: Tuple[str, ...] = (),
+                     transfer_penalty: Optional[int] = None) -> Dict:
+    """
+    Write games, TBD games and travel times into a single binary artifact; with a
+    transfer_penalty, missing station pairs are completed first.
+    """
+    if isinstance(train_times, TravelTimeMatrix):
+        matrix = train_times
+    else:
+        matrix = TravelTimeMatrix.from_dict(train_times, transfer_penalty=transfer_penalty)
+    all_games = list(games) + list(tbd_games)
+
+    leagues = sorted({g.league for g in all_games})
+    teams = sorted({g.home_team for g in all_games} | {g.away_team for g in all_games})
+    locations = sorted({g.hbf_location for g in all_games})
+    times = sorted({g.time for g in all_games if g.time is not None})
+
+    league_ids = {name: i for i, name in enumerate(leagues)}
+    team_ids = {name: i for i, name in enumerate(teams)}
+    location_ids = {name: i for i, name in enumerate(locations)}
+    # Index 0 is reserved for a missing kickoff time
+    time_ids = {name: i + 1 for i, name in enumerate(times)}
+
+    arrays = {
+        "travel_minutes": np.ascontiguousarray(matrix.minutes, dtype=np.uint16),
+        "game_league": np.array([league_ids[g.league] for g in all_games], dtype=np.uint32),
+        "game_date": np.array([g.date.toordinal() for g in all_games], dtype=np.int32),
+        "game_seconds": np.array([g.date.hour * 3600 + g.date.minute * 60 + g.date.second for g in all_games], dtype=np.int32),
+        "game_time": np.array([time_ids.get(g.time, 0) for g in all_games], dtype=np.uint32),
+        "game_home": np.array([team_ids[g.home_team] for g in all_games], dtype=np.uint32),
+        "game_away": np.array([team_ids[g.away_team] for g in all_games], dtype=np.uint32),
+        "game_location": np.array([location_ids[g.hbf_location] for g in all_games], dtype=np.uint32),
+        "game_is_tbd": np.array([0] * len(games) + [1] * len(tbd_games), dtype=np.uint8),
+    }
+    if matrix.derived is not None:
+        arrays["travel_derived"] = np.ascontiguousarray(matrix.derived, dtype=np.uint8)
+    tables = {
+        "stations": list(matrix.stations),
+        "leagues": leagues,
+        "teams": teams,
+        "locations": locations,
+        "times": times,
+    }
+
+    checksum = _content_checksum(tables, arrays)
+    array_specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        array_specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+
+    header = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": checksum[:12],
+        "checksum": checksum,
+        "source_checksum": source_checksum(*source_files) if source_files else None,
+        "built_at": datetime.now().isoformat(),
+        "transfer_penalty": transfer_penalty if matrix.derived is not None else None,
+        "counts": {
+            "games": len(games),
+            "tbd_games": len(tbd_games),
+            "stations": len(matrix.stations),
+            "train_connections": len(matrix),
+            "derived_connections": matrix.derived_count,
+        },
+        "tables": tables,
+        "arrays": array_specs,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(ARTIFACT_MAGIC, ARTIFACT_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + array_specs[name]["offset"])
+            f.write(array.tobytes())
+    # Atomic replace so running workers never map a half-written file
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"📦 Compiled data artifact {output_path} (version {header['version']})")
+    return header
+
+def compile_from_files(games_file: str, train_times_file: str, output_path: str,
+                       transfer_penalty: Optional[int] = None) -> Dict:
+    """Parse the CSV sources and compile them into an artifact."""
+    from utils import load_games, load_train_times, add_missing_same_city_travel_times
+
+    train_times = add_missing_same_city_travel_times(load_train_times(train_times_file))
+    games, tbd_games = load_games(games_file)
+    return compile_artifact(games, tbd_games, train_times, output_path,
+                            source_files=(games_file, train_times_file), transfer_penalty=transfer_penalty)
+
+# ────────────────────────────────
+# 🛠️ Load
+# ────────────────────────────────
+
+class DataArtifact:
+    """A memory-mapped, read-only view over a compiled data artifact."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, format_version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != ARTIFACT_MAGIC:
+                raise ValueError(f"{path} is not a BundesTrip data artifact")
+            if format_version != ARTIFACT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported artifact format {format_version} (expected {ARTIFACT_FORMAT_VERSION})")
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data_start = _align(_PREFIX.size + header_len)
+        self.arrays = {}
+        for name, spec in self.header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            self.arrays[name] = np.frombuffer(
+                self._mmap, dtype=dtype, count=count, offset=data_start + spec["offset"]
+            ).reshape(spec["shape"])
+
+        self.tables = self.header["tables"]
+        derived = self.arrays.get("travel_derived")
+        self.train_times = TravelTimeMatrix(
+            self.tables["stations"], self.arrays["travel_minutes"],
+            derived.view(np.bool_) if derived is not None else None
+        )
+
+    @property
+    def version(self) -> str:
+        return self.header["version"]
+
+    def verify(self) -> bool:
+        """Recompute the content checksum (touches every page)."""
+        return _content_checksum(self.tables, self.arrays) == self.header["checksum"]
+
+    def load_games(self) -> Tuple[List[Game], List[Game]]:
+        """Materialize Game objects from the columnar arrays, preserving file order."""
+        leagues = self.tables["leagues"]
+        teams = self.tables["teams"]
+        locations = self.tables["locations"]
+        times = [None] + self.tables["times"]
+        a = self.arrays
+
+        games = []
+        tbd_games = []
+        rows = zip(
+            a["game_league"].tolist(), a["game_date"].tolist(), a["game_seconds"].tolist(),
+            a["game_time"].tolist(), a["game_home"].tolist(), a["game_away"].tolist(),
+            a["game_location"].tolist(), a["game_is_tbd"].tolist(),
+        )
+        date_cache = {}
+        for league, ordinal, seconds, time_id, home, away, location, is_tbd in rows:
+            game_date = date_cache.get((ordinal, seconds))
+            if game_date is None:
+                game_date = date_cache[(ordinal, seconds)] = datetime.fromordinal(ordinal) + timedelta(seconds=seconds)
+            game = Game.model_construct(
+                league=leagues[league],
+                date=game_date,
+                time=times[time_id],
+                home_team=teams[home],
+                away_team=teams[away],
+                hbf_location=locations[location]
+            )
+            (tbd_games if is_tbd else games).append(game)
+        return games, tbd_games
+
+    def info(self) -> Dict:
+        """Dataset description for /health."""
+        return {
+            "source": "artifact",
+            "path": self.path,
+            "format_version": self.header["format_version"],
+            "version": self.header["version"],
+            "checksum": self.header["checksum"],
+            "source_checksum": self.header.get("source_checksum"),
+            "built_at": self.header["built_at"],
+            "transfer_penalty": self.header.get("transfer_penalty"),
+            "counts": self.header["counts"],
+        }
+
+def _stale_reason(path: str, header: Dict, source_files: Tuple[str, ...]) -> Optional[str]:
+    """Why the artifact no longer reflects the CSV sources, or None if it still does."""
+    if not source_files or not all(os.path.exists(source) for source in source_files):
+        return None  # nothing to compare against: the artifact is the data
+    artifact_mtime = os.path.getmtime(path)
+    newer = [source for source in source_files if os.path.getmtime(source) > artifact_mtime]
+    if newer:
+        return f"{', '.join(newer)} newer than the artifact"
+    if header.get("source_checksum") != source_checksum(*source_files):
+        return "source checksum differs from the one it was compiled from"
+    return None
+
+@functools.lru_cache(maxsize=None)
+def open_data_artifact(path: str, source_files: Tuple[str, ...] = ()) -> Optional[DataArtifact]:
+    """
+    Open (once per process) the artifact at `path`. Returns None if there isn't one,
+    or if the source CSVs changed since it was compiled, so they are parsed instead.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        artifact = DataArtifact(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ Could not open data artifact {path}: {e}")
+        return None
+    stale = _stale_reason(path, artifact.header, source_files)
+    if stale:
+        logger.warning(f"⚠️ Ignoring stale data artifact {path} ({stale}) - loading the CSV files; "
+                       f"run `python data_artifact.py compile` to rebuild it")
+        return None
+    logger.info(f"📦 Memory-mapped data artifact {path} (version {artifact.version})")
+    return artifact
+
+def load_dataset(games_file: str, train_times_file: str, artifact_file: Optional[str] = None,
+                 reopen: bool = False, transfer_penalty: Optional[int] = None,
+                 graph_mode: str = "matrix", sparse_cache_size: int = 512):
+    """
+    Load (train_times, games, tbd_games, dataset_info), preferring the compiled
+    artifact while it matches the CSV files and parsing the CSVs otherwise. With a
+    transfer_penalty the travel graph is completed (the artifact was completed when compiled).
+
+    graph_mode "sparse" keeps only the direct connections of the CSV and computes
+    shortest paths on demand; the artifact's dense matrix is not used then.
+    """
+    if graph_mode == "sparse":
+        from utils import load_games, load_train_times
+        logger.info("🕸️ Sparse travel graph: shortest paths computed on demand")
+        train_times = SparseTravelGraph.from_dict(
+            load_train_times(train_times_file), transfer_penalty=transfer_penalty, cache_size=sparse_cache_size
+        )
+        games, tbd_games = load_games(games_file)
+        return train_times, games, tbd_games, {
+            **describe_csv_dataset(games_file, train_times_file), "graph": "sparse"
+        }
+
+    if reopen:
+        open_data_artifact.cache_clear()
+    artifact = open_data_artifact(artifact_file, (games_file, train_times_file)) if artifact_file else None
+    if artifact:
+        if artifact.header.get("transfer_penalty") != transfer_penalty:
+            logger.warning(f"⚠️ Data artifact was compiled with transfer penalty "
+                           f"{artifact.header.get('transfer_penalty')}, config asks for {transfer_penalty} - recompile it")
+        games, tbd_games = artifact.load_games()
+        return artifact.train_times, games, tbd_games, artifact.info()
+
+    from utils import load_games, load_train_times, add_missing_same_city_travel_times
+    # Same graph as the artifact (and the planner expects): with same-city 0-minute entries,
+    # interned into the station matrix so both paths serve the same ID-based lookups
+    train_times = TravelTimeMatrix.from_dict(
+        add_missing_same_city_travel_times(load_train_times(train_times_file)),
+        transfer_penalty=transfer_penalty
+    )
+    games, tbd_games = load_games(games_file)
+    return train_times, games, tbd_games, describe_csv_dataset(games_file, train_times_file)
+
+def main():
+    from config import (GAMES_FILE, TRAIN_TIMES_FILE, DATA_ARTIFACT_FILE,
+                        COMPLETE_TRAIN_TIMES, TRANSFER_PENALTY_MINUTES)
+
+    parser = argparse.ArgumentParser(description="Compile or inspect the BundesTrip data artifact")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compile_cmd = sub.add_parser("compile", help="Compile the CSV sources into a binary artifact")
+    compile_cmd.add_argument("--games", default=GAMES_FILE)
+    compile_cmd.add_argument("--train-times", default=TRAIN_TIMES_FILE)
+    compile_cmd.add_argument("--output", default=DATA_ARTIFACT_FILE)
+    compile_cmd.add_argument("--transfer-penalty", type=int, default=TRANSFER_PENALTY_MINUTES,
+                             help="Minutes per change of train when completing missing pairs")
+    compile_cmd.add_argument("--no-complete", dest="complete", action="store_false", default=COMPLETE_TRAIN_TIMES,
+                             help="Keep only the connections listed in the CSV")
+
+    info_cmd = sub.add_parser("info", help="Print the artifact header and verify its checksum")
+    info_cmd.add_argument("--path", default=DATA_ARTIFACT_FILE)
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        header = compile_from_files(args.games, args.train_times, args.output,
+                                    transfer_penalty=args.transfer_penalty if args.complete else None)
+        print(f"✅ Wrote {args.output}")
+        print(f"   version {header['version']} | {json.dumps(header['counts'])}")
+    elif args.command == "info":
+        artifact = DataArtifact(args.path)
+        print(json.dumps(artifact.info(), indent=2, ensure_ascii=False))
+        print("✅ Checksum OK" if artifact.verify() else "❌ Checksum mismatch")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,653 @@
+"""
+Versioned, immutable snapshot of all loaded data.
+
+Every request captures one DataStore via get_store() and uses only that
+snapshot, so a concurrent /admin/refresh-data can never hand it a mix of old
+and new games or travel times. Refresh builds a complete new store off to the
+side and swaps the module reference in one assignment (read-copy-update);
+in-flight requests keep the old store alive until they finish.
+
+Games are also partitioned by date: upcoming_games / upcoming_tbd_games (hot)
+hold fixtures from hot_from onwards and are all the future-only endpoints and
+the planner scan; past_games / past_tbd_games (cold) are only touched by
+include_past paths. roll_over() moves games across the boundary each day
+without reloading anything.
+
+Caches that depend on the data are keyed by the store version, either through
+versioned_lru_cache or by the version tag carried on store.train_times.
+
+reload_schedule() is the incremental variant: it diffs a re-read games file
+against the live store by (league, date, home, away), reuses every unchanged
+Game and the travel times as they are, and only date-scoped cache entries that
+overlap the changed dates are invalidated.
+"""
+
+import asyncio
+import bisect
+import functools
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from config import (GAMES_FILE, TRAIN_TIMES_FILE, DATA_ARTIFACT_FILE,
+                    COMPLETE_TRAIN_TIMES, TRANSFER_PENALTY_MINUTES,
+                    TRAVEL_GRAPH_MODE, SPARSE_GRAPH_CACHE_SOURCES,
+                    TIMETABLE_FILE, MIN_TRANSFER_MINUTES, REACHABLE_TABLE_ROWS)
+from models import Game
+from search_index import build_search_index
+from travel_graph import StationGraph, TrainTimes, count_connections, minutes_to_stations
+
+logger = logging.getLogger("trip-planner")
+
+def schedule_key(game: Game) -> Tuple[str, date, str, str]:
+    """Identity of a fixture across reloads; kickoff time and location may change."""
+    return (game.league, game.date.date(), game.home_team, game.away_team)
+
+class ScheduleDiff:
+    """Fixtures inserted, removed or changed between two versions of the games file."""
+
+    def __init__(self, inserted: List[Game], removed: List[Game], changed: List[Tuple[Game, Game]]):
+        self.inserted = inserted
+        self.removed = removed
+        self.changed = changed  # (old, new) pairs
+        self.dates: FrozenSet[date] = frozenset(
+            [g.date.date() for g in inserted]
+            + [g.date.date() for g in removed]
+            + [g.date.date() for pair in changed for g in pair]
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.removed or self.changed)
+
+    def overlaps(self, first: date, last: date) -> bool:
+        return any(first <= d <= last for d in self.dates)
+
+    def summary(self) -> Dict:
+        return {
+            "inserted": len(self.inserted),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "dates": sorted(d.isoformat() for d in self.dates),
+        }
+
+def partition_by_date(games: Iterable[Game], hot_from: date) -> Tuple[Tuple[Game, ...], Tuple[Game, ...]]:
+    """Split games into (hot, cold): on/after hot_from and before it, keeping their order."""
+    hot, cold = [], []
+    for game in games:
+        (hot if game.date.date() >= hot_from else cold).append(game)
+    return tuple(hot), tuple(cold)
+
+class GameDayIndex:
+    """
+    Games bucketed by date ordinal, and by lowercased league within a date, so a
+    day's fixtures are one dict lookup instead of a scan over every game.
+    Buckets keep the order of the games they were built from.
+
+    With train_times it also holds the (station, date) → reachable fixtures table:
+    each row lists that day's games sorted by travel minutes from the station, so
+    any max_travel_time is a bisect and a prefix. Rows are built on first use and
+    belong to this index, i.e. to one data version; carry_over() hands the rows of
+    unchanged dates to the next version when the travel times stay the same.
+    """
+
+    def __init__(self, games: Iterable[Game], train_times=None, max_rows: int = REACHABLE_TABLE_ROWS):
+        by_day: Dict[int, List[Game]] = {}
+        by_league: Dict[int, Dict[str, List[Game]]] = {}
+        for game in games:
+            day = game.date.toordinal()
+            by_day.setdefault(day, []).append(game)
+            by_league.setdefault(day, {}).setdefault(game.league.lower(), []).append(game)
+        self.by_day: Dict[int, Tuple[Game, ...]] = {day: tuple(day_games) for day, day_games in by_day.items()}
+        self.by_league: Dict[int, Dict[str, Tuple[Game, ...]]] = {
+            day: {league: tuple(league_games) for league, league_games in leagues.items()}
+            for day, leagues in by_league.items()
+        }
+        self.train_times = train_times
+        self.max_rows = max_rows
+        self._reachable: "OrderedDict[Tuple[str, int], Tuple[List[int], Tuple[int, ...]]]" = OrderedDict()
+        self._reachable_lock = threading.Lock()
+
+    def on(self, day, leagues: Optional[Set[str]] = None) -> Tuple[Game, ...]:
+        """Games on a date (date or datetime), optionally only these lowercased leagues."""
+        ordinal = day.toordinal()
+        if not leagues:
+            return self.by_day.get(ordinal, ())
+        if len(leagues) == 1:
+            return self.by_league.get(ordinal, {}).get(next(iter(leagues)), ())
+        return tuple(game for game in self.by_day.get(ordinal, ()) if game.league.lower() in leagues)
+
+    def _reachable_row(self, location: str, ordinal: int) -> Tuple[List[int], Tuple[int, ...]]:
+        """(sorted minutes, positions in the day bucket) of the day's games with a known travel time."""
+        key = (location, ordinal)
+        row = self._reachable.get(key)
+        if row is not None:
+            return row
+
+        day_games = self.by_day.get(ordinal, ())
+        minutes = minutes_to_stations(self.train_times, location, [game.hbf_location for game in day_games])
+        location_lower = location.lower()
+        known = sorted(
+            (0 if travel is None else travel, position)
+            for position, (game, travel) in enumerate(zip(day_games, minutes))
+            if travel is not None or game.hbf_location.lower() == location_lower
+        )
+        row = ([travel for travel, _ in known], tuple(position for _, position in known))
+
+        with self._reachable_lock:
+            self._reachable[key] = row
+            if len(self._reachable) > self.max_rows:
+                self._reachable.popitem(last=False)
+        return row
+
+    def reachable_from(self, location: str, day, max_minutes: int,
+                       leagues: Optional[Set[str]] = None) -> List[Tuple[Game, int]]:
+        """(game, travel minutes) for games on `day` within max_minutes of location, in schedule order."""
+        ordinal = day.toordinal()
+        day_games = self.by_day.get(ordinal)
+        if not day_games:
+            return []
+        minutes, positions = self._reachable_row(location, ordinal)
+        count = bisect.bisect_right(minutes, max_minutes)
+        reachable = sorted(zip(positions[:count], minutes[:count]))
+        if leagues:
+            return [(day_games[p], travel) for p, travel in reachable if day_games[p].league.lower() in leagues]
+        return [(day_games[p], travel) for p, travel in reachable]
+
+    def reachable_info(self) -> Dict[str, int]:
+        return {"rows": len(self._reachable), "max_rows": self.max_rows}
+
+    def carry_over(self, old: "GameDayIndex", changed_dates: Iterable[date] = ()) -> int:
+        """
+        Reuse the old index's reachable rows for dates whose games did not change,
+        as long as both share the same travel times; returns the rows carried over.
+        """
+        if old is None or old.train_times is not self.train_times:
+            return 0
+        changed = {day.toordinal() for day in changed_dates}
+        with old._reachable_lock:
+            rows = list(old._reachable.items())
+        carried = 0
+        with self._reachable_lock:
+            for (location, ordinal), row in rows:
+                # Positions index the day bucket, so the bucket must be the same games in the same order
+                if ordinal in changed or self.by_day.get(ordinal) != old.by_day.get(ordinal):
+                    continue
+                self._reachable[(location, ordinal)] = row
+                carried += 1
+            while len(self._reachable) > self.max_rows:
+                self._reachable.popitem(last=False)
+        return carried
+
+    def __len__(self) -> int:
+        return len(self.by_day)
+
+Postings = Tuple[List[int], Tuple[Game, ...]]  # (date ordinals, games), both ascending by date
+_NO_POSTINGS: Postings = ([], ())
+
+def _postings(games: List[Game]) -> Postings:
+    return [game.date.toordinal() for game in games], tuple(games)
+
+class _SchedulePostings:
+    """League, team and date posting lists over one list of fixtures (regular or TBD)."""
+
+    def __init__(self, games: Iterable[Game]):
+        ordered = sorted(games, key=lambda game: game.date.toordinal())  # stable: schedule order within a day
+        by_league: Dict[str, List[Game]] = {}
+        by_team: Dict[str, List[Game]] = {}
+        by_day: Dict[int, List[Game]] = {}
+        for game in ordered:
+            by_league.setdefault(game.league.lower(), []).append(game)
+            for team in {game.home_team.lower(), game.away_team.lower()}:
+                by_team.setdefault(team, []).append(game)
+            by_day.setdefault(game.date.toordinal(), []).append(game)
+        self.all = _postings(ordered)
+        self.by_league = {league: _postings(league_games) for league, league_games in by_league.items()}
+        self.by_team = {team: _postings(team_games) for team, team_games in by_team.items()}
+        self.by_day = {day: tuple(day_games) for day, day_games in by_day.items()}
+
+class ScheduleIndex:
+    """
+    Inverted indexes behind the reference endpoints: league → games, team → games
+    and date → games, kept separately for regular and TBD fixtures. Every posting
+    list is sorted by date next to its date ordinals, so "from today on" is one
+    bisect instead of a scan over the whole schedule.
+
+    Keys are lowercased; endpoints that match a league exactly filter the (already
+    narrowed) result themselves.
+    """
+
+    def __init__(self, games: Iterable[Game], tbd_games: Iterable[Game]):
+        games = tuple(games)
+        self.regular = _SchedulePostings(games)
+        self.tbd = _SchedulePostings(tbd_games)
+
+        # Canonical spelling per lowercased name, and the teams of each league (regular games only)
+        self.team_names: Dict[str, str] = {}
+        self.league_names: Dict[str, str] = {}
+        teams_by_league: Dict[str, Set[str]] = {}
+        for game in games:
+            self.league_names.setdefault(game.league.lower(), game.league)
+            for team in (game.home_team, game.away_team):
+                self.team_names.setdefault(team.lower(), team)
+                teams_by_league.setdefault(game.league, set()).add(team)
+        self.teams_by_league: Dict[str, Tuple[str, ...]] = {
+            league: tuple(sorted(teams)) for league, teams in teams_by_league.items()
+        }
+
+    def select(self, tbd: bool = False, league: Optional[str] = None, team: Optional[str] = None,
+               since: Optional[date] = None) -> Tuple[Game, ...]:
+        """Games of a league and/or team (case-insensitive) from `since` on, sorted by date."""
+        postings = self.tbd if tbd else self.regular
+        if team:
+            ordinals, games = postings.by_team.get(team.lower(), _NO_POSTINGS)
+        elif league:
+            ordinals, games = postings.by_league.get(league.lower(), _NO_POSTINGS)
+        else:
+            ordinals, games = postings.all
+        start = bisect.bisect_left(ordinals, since.toordinal()) if since else 0
+        selected = games[start:]
+        if team and league:
+            league_lower = league.lower()
+            selected = tuple(game for game in selected if game.league.lower() == league_lower)
+        return selected
+
+    def on(self, day, tbd: bool = False) -> Tuple[Game, ...]:
+        """Games on a date (date or datetime), in schedule order."""
+        return (self.tbd if tbd else self.regular).by_day.get(day.toordinal(), ())
+
+    def between(self, first: date, last: date, tbd: bool = False,
+                league: Optional[str] = None) -> Tuple[Game, ...]:
+        """Games from first to last (inclusive), optionally of one league (case-insensitive), sorted by date."""
+        postings = self.tbd if tbd else self.regular
+        ordinals, games = postings.by_league.get(league.lower(), _NO_POSTINGS) if league else postings.all
+        start = bisect.bisect_left(ordinals, first.toordinal())
+        return games[start:bisect.bisect_right(ordinals, last.toordinal(), start)]
+
+class DataStore:
+    """One immutable version of games, TBD games and travel times."""
+
+    def __init__(self, version: int, train_times, games: List[Game], tbd_games: List[Game],
+                 dataset_info: Optional[Dict] = None, schedule_diff: Optional[ScheduleDiff] = None,
+                 hot_from: Optional[date] = None, partitions: Optional[Tuple[tuple, tuple, tuple, tuple]] = None,
+                 timetable=None):
+        self.version = version
+        # Travel times already tagged by an earlier store are shared as-is (schedule-only reload)
+        self.train_times = train_times if getattr(train_times, "version", 0) else tag_train_times(train_times, version)
+        self.games = tuple(games)
+        self.tbd_games = tuple(tbd_games)
+        self.hot_from = hot_from or date.today()
+        if partitions is None:
+            partitions = partition_by_date(self.games, self.hot_from) + partition_by_date(self.tbd_games, self.hot_from)
+        self.upcoming_games, self.past_games, self.upcoming_tbd_games, self.past_tbd_games = partitions
+        # The planner only schedules games with a kickoff time
+        self.game_index = GameDayIndex(self.games, self.train_times)
+        self.schedule_index = ScheduleIndex(self.games, self.tbd_games)
+        self.search_index = build_search_index(self.schedule_index.team_names.values(),
+                                               self.schedule_index.league_names.values(), self.train_times)
+        self.dataset_info = {**(dataset_info or {}), "store_version": version}
+        self.dataset_info["unresolved_stations"] = self.resolve_station_spellings()
+        self.schedule_diff = schedule_diff  # None for a full reload
+        self.timetable = timetable  # optional TimetableEngine, shared across schedule-only reloads
+        self.timings: Dict[str, float] = {}
+        self.loaded_at = datetime.now()
+
+    def resolve_station_spellings(self) -> List[str]:
+        """
+        Resolve every station spelling from the games and AIRPORT_CITIES to a station ID
+        now, so travel lookups never probe variants; returns the names that match none.
+        """
+        if not isinstance(self.train_times, StationGraph):
+            return []
+        from data.synonyms import AIRPORT_CITIES
+
+        spellings = {game.hbf_location for game in self.games + self.tbd_games}
+        spellings.discard("Unknown")  # teams without a stadium entry, not a station spelling
+        unresolved = self.train_times.resolve_spellings(spellings | set(AIRPORT_CITIES))
+        if unresolved:
+            logger.warning(f"⚠️ {len(unresolved)} station names have no travel times: {', '.join(unresolved[:10])}")
+        return unresolved
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "games": len(self.games),
+            "tbd_games": len(self.tbd_games),
+            "train_connections": count_connections(self.train_times),
+            "derived_connections": getattr(self.train_times, "derived_count", 0),
+        }
+
+    def games_since(self, start: Optional[date]) -> Tuple[Tuple[Game, ...], Tuple[Game, ...]]:
+        """(games, tbd_games) to scan for fixtures from start on: the hot partition unless start is before it."""
+        if start is not None and start < self.hot_from:
+            return self.games, self.tbd_games
+        return self.upcoming_games, self.upcoming_tbd_games
+
+    def rolled_over(self, version: int, today: date) -> "DataStore":
+        """Same data with games before today moved from the hot into the cold partition."""
+        moved_games, kept_games = [], []
+        for game in self.upcoming_games:
+            (kept_games if game.date.date() >= today else moved_games).append(game)
+        moved_tbd, kept_tbd = [], []
+        for game in self.upcoming_tbd_games:
+            (kept_tbd if game.date.date() >= today else moved_tbd).append(game)
+
+        partitions = (tuple(kept_games), self.past_games + tuple(moved_games),
+                      tuple(kept_tbd), self.past_tbd_games + tuple(moved_tbd))
+        dataset_info = {k: v for k, v in self.dataset_info.items() if k != "store_version"}
+        # An empty diff: no fixture changed, so every date-scoped cache entry carries over
+        new_store = DataStore(version, self.train_times, self.games, self.tbd_games, dataset_info,
+                              schedule_diff=ScheduleDiff([], [], []), hot_from=today, partitions=partitions,
+                              timetable=self.timetable)
+        new_store.game_index.carry_over(self.game_index)
+        return new_store
+
+def diff_schedules(old_store: "DataStore", games: List[Game], tbd_games: List[Game]) -> ScheduleDiff:
+    """Compare freshly parsed games against a store, keyed by schedule_key."""
+    def by_key(*game_lists: Iterable[Game]) -> Dict:
+        grouped = {}
+        for game_list in game_lists:
+            for game in game_list:
+                grouped.setdefault(schedule_key(game), []).append(game)
+        return grouped
+
+    old_by_key = by_key(old_store.games, old_store.tbd_games)
+    new_by_key = by_key(games, tbd_games)
+
+    inserted, removed, changed = [], [], []
+    for key, new_games in new_by_key.items():
+        old_games = old_by_key.get(key)
+        if old_games is None:
+            inserted.extend(new_games)
+        elif old_games != new_games:
+            changed.extend(zip(old_games, new_games))
+            # Duplicate fixtures that appeared or disappeared
+            inserted.extend(new_games[len(old_games):])
+            removed.extend(old_games[len(new_games):])
+    for key, old_games in old_by_key.items():
+        if key not in new_by_key:
+            removed.extend(old_games)
+
+    return ScheduleDiff(inserted, removed, changed)
+
+def apply_schedule_diff(old_store: "DataStore", version: int, games: List[Game], tbd_games: List[Game],
+                        diff: ScheduleDiff, games_file: Optional[str] = None) -> "DataStore":
+    """
+    New store in the order of the new file, reusing the old Game instance for every
+    fixture the diff did not touch and sharing the old travel times.
+    """
+    from data_artifact import source_checksum
+
+    # Games are frozen and compare by value, so an equal old instance is the unchanged fixture
+    unchanged = {}
+    for game in old_store.games + old_store.tbd_games:
+        unchanged.setdefault(game, game)
+
+    def reuse(game_list: List[Game]) -> List[Game]:
+        return [unchanged.get(game, game) for game in game_list]
+
+    # The schedule now comes from the games file; only the travel times are still as loaded
+    described = ("store_version", "source", "version", "checksum", "source_checksum", "counts")
+    dataset_info = {k: v for k, v in old_store.dataset_info.items() if k not in described}
+    checksum = source_checksum(games_file) if games_file and os.path.exists(games_file) else None
+    dataset_info.update({
+        "source": "csv",
+        "travel_times_source": old_store.dataset_info.get("source"),
+        "version": checksum[:12] if checksum else None,
+        "source_checksum": checksum,
+        "counts": {**old_store.dataset_info.get("counts", {}), "games": len(games), "tbd_games": len(tbd_games)},
+        "schedule_reloaded_at": datetime.now().isoformat(),
+        "schedule_diff": diff.summary(),
+    })
+    new_store = DataStore(version, old_store.train_times, reuse(games), reuse(tbd_games),
+                          dataset_info, schedule_diff=diff, timetable=old_store.timetable)
+    carried = new_store.game_index.carry_over(old_store.game_index, diff.dates)
+    logger.debug(f"Carried over {carried} reachable-games rows outside the changed dates")
+    return new_store
+
+def tag_train_times(train_times, version: int):
+    """Return a private copy/view of train_times carrying the data version."""
+    if isinstance(train_times, StationGraph):
+        # Shares the (possibly memory-mapped) matrix or sparse graph and its indexes, only the view is new
+        tagged = train_times.view()
+    else:
+        tagged = TrainTimes(train_times)
+    tagged.version = version
+    return tagged
+
+# ────────────────────────────────
+# 🔄 Current store and atomic swap
+# ────────────────────────────────
+
+_current_store: Optional[DataStore] = None
+_last_version = 0
+_refresh_lock = threading.Lock()
+_swap_listeners: List[Callable[[DataStore, Optional[DataStore]], None]] = []
+
+def build_store(games_file: str = GAMES_FILE, train_times_file: str = TRAIN_TIMES_FILE,
+                artifact_file: Optional[str] = DATA_ARTIFACT_FILE, reopen: bool = False) -> DataStore:
+    """Load a complete new store with the next version number (not yet live)."""
+    global _last_version
+    from data_artifact import load_dataset
+    from timetable import load_timetable
+
+    started = time.perf_counter()
+    train_times, games, tbd_games, dataset_info = load_dataset(
+        games_file, train_times_file, artifact_file, reopen=reopen,
+        transfer_penalty=TRANSFER_PENALTY_MINUTES if COMPLETE_TRAIN_TIMES else None,
+        graph_mode=TRAVEL_GRAPH_MODE, sparse_cache_size=SPARSE_GRAPH_CACHE_SOURCES
+    )
+    parsed = time.perf_counter()
+    timetable = load_timetable(TIMETABLE_FILE, MIN_TRANSFER_MINUTES)
+    if timetable is not None:
+        dataset_info["timetable"] = timetable.info()
+    timetabled = time.perf_counter()
+
+    _last_version += 1
+    store = DataStore(_last_version, train_times, games, tbd_games, dataset_info, timetable=timetable)
+    store.timings = {"parse": parsed - started, "timetable": timetabled - parsed,
+                     "index build": time.perf_counter() - timetabled}
+    return store
+
+def swap_store(new_store: DataStore) -> Optional[DataStore]:
+    """Publish new_store as the current snapshot and return the previous one."""
+    global _current_store
+    old_store = _current_store
+    if old_store is not None and new_store.version <= old_store.version:
+        raise ValueError(f"Store version {new_store.version} is not newer than live version {old_store.version}")
+
+    _current_store = new_store  # single reference assignment: readers see old or new, never a mix
+
+    for listener in _swap_listeners:
+        try:
+            listener(new_store, old_store)
+        except Exception as e:
+            logger.error(f"Store swap listener {listener.__name__} failed: {e}")
+
+    logger.info(f"🔄 Data store v{new_store.version} is live ({new_store.counts()})")
+    return old_store
+
+def refresh_store(**build_kwargs) -> Tuple[Optional[DataStore], DataStore]:
+    """Build and swap in a new store; concurrent refreshes are serialized."""
+    with _refresh_lock:
+        new_store = build_store(**build_kwargs)
+        old_store = swap_store(new_store)
+    return old_store, new_store
+
+def reload_schedule(games_file: str = GAMES_FILE) -> Tuple[Optional[DataStore], DataStore, Optional[ScheduleDiff]]:
+    """
+    Re-read only the games file and swap in a store with just the differences
+    applied. Returns (old, new, diff); new is old when nothing changed.
+    """
+    global _last_version
+    from utils import load_games
+
+    with _refresh_lock:
+        old_store = _current_store
+        if old_store is None:
+            new_store = build_store(games_file=games_file)
+            swap_store(new_store)
+            return None, new_store, None
+
+        games, tbd_games = load_games(games_file)
+        diff = diff_schedules(old_store, games, tbd_games)
+        if not diff:
+            logger.info("📅 Schedule reload: no fixture changes")
+            return old_store, old_store, diff
+
+        _last_version += 1
+        new_store = apply_schedule_diff(old_store, _last_version, games, tbd_games, diff, games_file)
+        logger.info(f"📅 Schedule reload: {diff.summary()}")
+        swap_store(new_store)
+    return old_store, new_store, diff
+
+def roll_over(today: Optional[date] = None) -> Optional[DataStore]:
+    """Swap in a store whose hot partition starts today; None if it already does."""
+    global _last_version
+    today = today or date.today()
+
+    with _refresh_lock:
+        old_store = _current_store
+        if old_store is None or old_store.hot_from >= today:
+            return None
+        _last_version += 1
+        new_store = old_store.rolled_over(_last_version, today)
+        logger.info(f"🌙 Rolled {len(old_store.upcoming_games) - len(new_store.upcoming_games)} games "
+                    f"and {len(old_store.upcoming_tbd_games) - len(new_store.upcoming_tbd_games)} TBD games into the past partition")
+        swap_store(new_store)
+    return new_store
+
+async def roll_over_daily():
+    """Run roll_over() just after every midnight."""
+    while True:
+        now = datetime.now()
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        await asyncio.sleep((next_midnight - now).total_seconds() + 1)
+        try:
+            roll_over()
+        except Exception as e:
+            logger.error(f"Daily partition rollover failed: {e}")
+
+async def watch_games_file(path: str = GAMES_FILE, interval: float = 30.0):
+    """Poll the games file mtime and run reload_schedule() whenever it changes."""
+    def mtime():
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    last_seen = mtime()
+    logger.info(f"👀 Watching {path} every {interval:g}s for schedule changes")
+    while True:
+        await asyncio.sleep(interval)
+        current = mtime()
+        if current is None or current == last_seen:
+            continue
+        last_seen = current
+        try:
+            await asyncio.to_thread(reload_schedule, path)
+        except Exception as e:
+            logger.error(f"Automatic schedule reload failed: {e}")
+
+def current_store() -> Optional[DataStore]:
+    """The live store, or None while the first one is still loading (never blocks)."""
+    return _current_store
+
+def get_store() -> DataStore:
+    """Capture the current snapshot (loading it on first use)."""
+    store = _current_store
+    if store is None:
+        with _refresh_lock:
+            if _current_store is None:
+                swap_store(build_store())
+            store = _current_store
+    return store
+
+def freeze_for_fork() -> DataStore:
+    """
+    Load the store in the parent process and move everything allocated so far
+    into the GC's permanent generation. Forked workers then never write to
+    those objects' GC headers, so their pages stay shared copy-on-write.
+    """
+    store = get_store()
+    gc.collect()
+    gc.freeze()
+    logger.info(f"🧊 Froze {gc.get_freeze_count()} objects before forking workers")
+    return store
+
+def on_store_swap(listener: Callable[[DataStore, Optional[DataStore]], None]):
+    """Register a callback run after every swap (e.g. to clear derived caches)."""
+    _swap_listeners.append(listener)
+    return listener
+
+# ────────────────────────────────
+# 🗃️ Version-keyed caching
+# ────────────────────────────────
+
+def versioned_lru_cache(maxsize: int = 2048, date_window: Optional[Callable[..., Optional[Tuple[date, date]]]] = None):
+    """
+    LRU cache for functions whose first argument carries a `version` attribute
+    (a DataStore or a tagged train_times). The version replaces the argument in
+    the cache key, so results computed against one data version are never served
+    for another, and entries for superseded versions are dropped on swap.
+
+    date_window(*args) gives the (first, last) dates a result depends on. After a
+    schedule-only reload, entries outside the changed dates are carried over to
+    the new version instead of being dropped, and entries inside them are dropped
+    even when keyed by the (unchanged) travel times.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        keyed_by_store = [True]  # False when the first argument is a tagged train_times
+
+        @functools.wraps(func)
+        def wrapper(data, *args):
+            keyed_by_store[0] = isinstance(data, DataStore)
+            key = (data.version,) + args
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+
+            result = func(data, *args)
+
+            with lock:
+                cache[key] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        def discard_before(version: int):
+            with lock:
+                for key in [k for k in cache if k[0] < version]:
+                    del cache[key]
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        def on_swap(new_store: DataStore, old_store: Optional[DataStore]):
+            live = new_store.version if keyed_by_store[0] else new_store.train_times.version
+            diff = new_store.schedule_diff
+            with lock:
+                for key in list(cache):
+                    window = date_window(*key[1:]) if diff is not None and date_window else None
+                    in_changed_window = window is not None and diff.overlaps(*window)
+                    if key[0] == live:
+                        if in_changed_window:
+                            del cache[key]
+                    elif (keyed_by_store[0] and window is not None and not in_changed_window
+                          and old_store is not None and key[0] == old_store.version):
+                        cache[(new_store.version,) + key[1:]] = cache.pop(key)
+                    else:
+                        del cache[key]
+
+        wrapper.discard_before = discard_before
+        wrapper.cache_clear = cache_clear
+        on_store_swap(on_swap)
+        return wrapper
+
+    return decorator
@@ -1,4 +1,3 @@
-from supabase import create_client
 from config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
 import logging
 from typing import Dict, List, Optional, Any
@@ -7,12 +6,22 @@ import json
 
 logger = logging.getLogger(__name__)
 
-# Initialize Supabase admin client (service role for backend operations)
-supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+# Supabase admin client (service role for backend operations); the only client
+# in the backend. Created on first use so importing the app stays cheap.
+_supabase_admin = None
+
+def get_supabase_admin():
+    """Return the shared Supabase admin client, creating it on first call."""
+    global _supabase_admin
+    if _supabase_admin is None:
+        from supabase import create_client
+        _supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return _supabase_admin
 
 class DatabaseService:
-    def __init__(self):
-        self.client = supabase_admin
+    @property
+    def client(self):
+        return get_supabase_admin()
 
     # ──────────────────────────────────
     # 👤 User Management
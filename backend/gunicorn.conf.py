@@ -0,0 +1,25 @@
+"""
+Gunicorn settings for the multi-worker deployment (Procfile: gunicorn app:app -c gunicorn.conf.py)
+
+The app is imported once in the master (preload_app), which loads the data
+store and its derived indexes, freezes them out of the cyclic GC and only then
+forks the workers. Workers share those pages copy-on-write instead of each
+parsing and holding its own copy.
+
+Each worker owns its store after the fork, so /admin/refresh-data only reaches
+the worker that served it; set GAMES_WATCH_INTERVAL to let every worker pick up
+schedule changes, or restart to apply a full refresh everywhere.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported, before any fork
+    from data_store import freeze_for_fork
+    freeze_for_fork()
@@ -1,8 +1,12 @@
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from common import team_key, split_suffix, clock_minutes
 
 class Game(BaseModel):
+    # Games are shared by every request through the data store, so keep them immutable
+    model_config = ConfigDict(frozen=True)
+
     league: str
     date: datetime
     time: Optional[str]
@@ -10,6 +14,28 @@ class Game(BaseModel):
     away_team: str
     hbf_location: str
 
+    # Derived once per game when it is loaded (model_construct runs model_post_init too);
+    # internal to the planner, so left out of dumps and reprs
+    match_label: str = Field("", exclude=True, repr=False)  # "Home vs Away (15:30)"
+    home_key: str = Field("", exclude=True, repr=False)  # team_key(home_team)
+    away_key: str = Field("", exclude=True, repr=False)
+    home_base: str = Field("", exclude=True, repr=False)  # home_key without a reserve/youth suffix
+    away_base: str = Field("", exclude=True, repr=False)
+    kickoff_minutes: Optional[int] = Field(None, exclude=True, repr=False)  # None for TBD
+
+    def model_post_init(self, __context: Any) -> None:
+        home_key, away_key = team_key(self.home_team), team_key(self.away_team)
+        derived = {
+            "match_label": f"{self.home_team} vs {self.away_team} ({self.time})",
+            "home_key": home_key,
+            "away_key": away_key,
+            "home_base": split_suffix(home_key)[0],
+            "away_base": split_suffix(away_key)[0],
+            "kickoff_minutes": clock_minutes(self.time) if isinstance(self.time, str) else None,
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)  # frozen model: set once, here
+
 class TravelRoute(BaseModel):
     from_hbf: str
     to_hbf: str
@@ -83,7 +109,12 @@ class TripRequest(BaseModel):
     min_games: Optional[int] = 2
     request_id: Optional[str] = None
     one_city_only: Optional[bool] = False  # <-- Add this line
+    travel_engine: Optional[str] = "fastest"  # "fastest" (pair matrix) or "timetable" (departure times)
     
+class TravelMatrixRequest(BaseModel):
+    stations: List[str] = Field(..., description="Station names in any supported spelling")
+    max_time: Optional[int] = Field(None, description="Report travel times above this many minutes as null")
+
 class SaveTripRequest(BaseModel):
     trip_data: Dict[Any, Any] = Field(..., description="Complete trip data from search results")
     original_request: Dict[Any, Any] = Field(..., description="Original search parameters")
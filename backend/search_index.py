@@ -0,0 +1,130 @@
+"""
+Autocomplete index over team, city and league names for /search.
+
+Names are folded with fold_name both ways an umlaut is commonly typed
+("München" → "muenchen" and "munchen"); case, accents and punctuation don't
+matter. Every folded spelling is cut into bigrams and trigrams, so a query
+only verifies the names that share all of its n-grams instead of
+substring-testing every name.
+
+Results are ranked: exact name, name prefix, word prefix, anywhere in the
+name. A query with no such match for a type falls back to the names sharing
+most of its trigrams, which catches typos like "dortmnud".
+
+One index is built per DataStore, i.e. rebuilt on every data refresh.
+"""
+
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from data.synonyms import league_priority
+from common import fold_name
+from travel_graph import station_names
+
+SEARCH_TYPES = ("teams", "cities", "leagues")
+
+# Rank of a match; lower is better
+EXACT, NAME_PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+def _grams(text: str, size: int) -> FrozenSet[str]:
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+def _spelling_grams(spellings: Tuple[str, ...]) -> FrozenSet[str]:
+    return frozenset().union(*(_grams(spelling, 2) | _grams(spelling, 3) for spelling in spellings))
+
+def _spellings(text: str) -> Tuple[str, ...]:
+    """Folded spellings of a name or query: umlauts transliterated (ue) and stripped (u)."""
+    return tuple(spelling for spelling in dict.fromkeys((fold_name(text), fold_name(text, transliterate=False)))
+                 if spelling)
+
+def _match_rank(query: str, spelling: str) -> Optional[int]:
+    if spelling == query:
+        return EXACT
+    if spelling.startswith(query):
+        return NAME_PREFIX
+    if f" {query}" in spelling:
+        return WORD_PREFIX
+    if query in spelling:
+        return SUBSTRING
+    return None
+
+class SearchIndex:
+    """Folded spellings and n-gram postings for every searchable name."""
+
+    def __init__(self, entries: Dict[str, Iterable[str]]):
+        # entries: search type → names, in the order equally ranked results are listed
+        self.types: List[str] = []
+        self.names: List[str] = []
+        self.spellings: List[Tuple[str, ...]] = []
+        postings: Dict[str, set] = {}
+        for kind, names in entries.items():
+            for name in dict.fromkeys(names):
+                spellings = _spellings(name)
+                grams = _spelling_grams(spellings)
+                if not grams:
+                    continue
+                entry = len(self.names)
+                self.types.append(kind)
+                self.names.append(name)
+                self.spellings.append(spellings)
+                for gram in grams:
+                    postings.setdefault(gram, set()).add(entry)
+        self.postings: Dict[str, FrozenSet[int]] = {gram: frozenset(ids) for gram, ids in postings.items()}
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        """Entries that contain every n-gram of the folded query (a superset of the substring matches)."""
+        if len(query) < 2:
+            return range(len(self.names))
+        grams = _grams(query, 3 if len(query) >= 3 else 2)
+        lists = sorted((self.postings.get(gram, frozenset()) for gram in grams), key=len)
+        return lists[0].intersection(*lists[1:])
+
+    def _fuzzy(self, query: str) -> Dict[int, int]:
+        """entry → trigrams shared with the query, for entries sharing at least half of them (and two)."""
+        grams = _grams(query, 3)
+        shared = Counter(entry for gram in grams for entry in self.postings.get(gram, ()))
+        needed = max(2, (len(grams) + 1) // 2)
+        return {entry: count for entry, count in shared.items() if count >= needed}
+
+    def search(self, query: str, types: Iterable[str] = SEARCH_TYPES, limit: int = 20) -> Dict[str, List[str]]:
+        """Ranked names per requested type (at most `limit` each)."""
+        wanted = set(types)
+        ranked: Dict[str, List[Tuple[int, int, int]]] = {kind: [] for kind in SEARCH_TYPES}
+
+        queries = _spellings(query)
+        best: Dict[int, int] = {}
+        for folded in queries:
+            for entry in self._candidates(folded):
+                if self.types[entry] not in wanted:
+                    continue
+                for spelling in self.spellings[entry]:
+                    rank = _match_rank(folded, spelling)
+                    if rank is not None and rank < best.get(entry, FUZZY):
+                        best[entry] = rank
+        for entry, rank in best.items():
+            ranked[self.types[entry]].append((rank, 0, entry))
+
+        # Nothing contains the query: names that share most of its trigrams (typos)
+        for kind in wanted & set(SEARCH_TYPES):
+            if ranked[kind]:
+                continue
+            shared: Dict[int, int] = {}
+            for folded in queries:
+                if len(folded) >= 3:
+                    for entry, count in self._fuzzy(folded).items():
+                        if self.types[entry] == kind:
+                            shared[entry] = max(count, shared.get(entry, 0))
+            ranked[kind] = [(FUZZY, -count, entry) for entry, count in shared.items()]
+
+        return {kind: [self.names[entry] for _, _, entry in sorted(matches)[:limit]]
+                for kind, matches in ranked.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+def build_search_index(team_names: Iterable[str], league_names: Iterable[str], train_times) -> SearchIndex:
+    """Teams and cities alphabetically, leagues by league priority (the order /search lists ties in)."""
+    return SearchIndex({
+        "teams": sorted(team_names),
+        "cities": sorted({city.replace(" hbf", "") for city in station_names(train_times)}),
+        "leagues": sorted(league_names, key=lambda league: (league_priority.get(league, 999), league)),
+    })
@@ -0,0 +1,32 @@
+"""
+Normalized team name → station index, built once from data.synonyms.
+
+Team names reach us from the games file, the frontend and must_teams in
+slightly different spellings ("Bayern München II", "bayern muenchen u23",
+"FC Bayern Munchen Amateure"...). team_key() folds those into one lookup key,
+so resolving a team to its station is a dict lookup instead of a scan over
+every stadium list. The name keys themselves live in common.py, which has no
+data dependencies.
+"""
+
+from typing import Dict
+from common import fold_name, split_suffix, team_key  # team_index.team_key etc. still work
+from data.synonyms import bundesliga_1_stadiums, bundesliga_2_stadiums, third_liga_stadiums
+
+def build_team_stations() -> Dict[str, str]:
+    """
+    team_key → station name, also under the "München" → "munchen" spelling.
+    The first list wins on collisions, as the old linear scan did.
+    """
+    stations = {}
+    for team in bundesliga_1_stadiums + bundesliga_2_stadiums + third_liga_stadiums:
+        stations.setdefault(team_key(team["team"]), team["hbf"]["name"])
+    for team in bundesliga_1_stadiums + bundesliga_2_stadiums + third_liga_stadiums:
+        stations.setdefault(team_key(team["team"], transliterate=False), team["hbf"]["name"])
+    return stations
+
+TEAM_STATIONS = build_team_stations()
+
+def station_for_team(team_name: str, default: str = "Unknown") -> str:
+    """Station (Hauptbahnhof) for a team name in any supported spelling."""
+    return TEAM_STATIONS.get(team_key(team_name), default)
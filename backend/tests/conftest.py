@@ -0,0 +1,54 @@
+"""
+Small fixture dataset for the planner and data store tests: seven stations on a
+grid (travel minutes are Manhattan distances, so every direct connection is
+also the shortest path) and a few days of fixtures between them.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import pytest
+from models import Game
+
+# Station → (x, y); one grid step is MINUTES_PER_STEP minutes by train
+STATION_GRID = {
+    "Berlin hbf": (0, 0),
+    "Leipzig hbf": (1, 0),
+    "Dresden hbf": (2, 0),
+    "Hannover hbf": (0, 1),
+    "Kassel hbf": (1, 1),
+    "Frankfurt hbf": (1, 2),
+    "Stuttgart hbf": (2, 2),
+}
+MINUTES_PER_STEP = 70
+
+FIRST_DAY = datetime(2030, 3, 1)
+START_DATE = FIRST_DAY.strftime("%d %B %Y")
+
+# (day offset, kickoff, home team, away team, station)
+FIXTURES = [
+    (0, "15:30", "Hertha BSC", "Hamburger SV", "Berlin hbf"),
+    (0, "18:30", "RB Leipzig", "VfL Bochum", "Leipzig hbf"),
+    (1, "13:00", "Dynamo Dresden", "Hertha BSC II", "Dresden hbf"),
+    (1, "15:30", "Hannover 96", "Eintracht Frankfurt", "Hannover hbf"),
+    (2, "19:00", "KSV Hessen Kassel", "RB Leipzig II", "Kassel hbf"),
+    (2, "20:30", "Eintracht Frankfurt", "VfB Stuttgart", "Frankfurt hbf"),
+    (3, "15:30", "VfB Stuttgart", "Dynamo Dresden", "Stuttgart hbf"),
+    (3, "17:30", "Hertha BSC", "Hannover 96", "Berlin hbf"),
+]
+
+def grid_minutes(from_loc: str, to_loc: str) -> int:
+    (x1, y1), (x2, y2) = STATION_GRID[from_loc], STATION_GRID[to_loc]
+    return MINUTES_PER_STEP * (abs(x1 - x2) + abs(y1 - y2))
+
+def make_game(day: int, kickoff: str, home: str, away: str, station: str, league: str = "Bundesliga") -> Game:
+    return Game(league=league, date=FIRST_DAY + timedelta(days=day), time=kickoff,
+                home_team=home, away_team=away, hbf_location=station)
+
+@pytest.fixture
+def train_times() -> Dict[Tuple[str, str], int]:
+    """Every station pair in both directions, plus the same-city 0-minute entries the CSV has."""
+    return {(a, b): grid_minutes(a, b) for a in STATION_GRID for b in STATION_GRID}
+
+@pytest.fixture
+def games() -> List[Game]:
+    return [make_game(*fixture) for fixture in FIXTURES]
@@ -0,0 +1,69 @@
+import pytest
+from conftest import FIRST_DAY, make_game
+from data_store import DataStore, apply_schedule_diff, diff_schedules
+
+HOT_FROM = FIRST_DAY.date()
+
+@pytest.fixture
+def store(train_times, games):
+    tbd_games = [make_game(5, None, "Hannover 96", "Hamburger SV", "Hannover hbf")]
+    return DataStore(1, train_times, games, tbd_games, hot_from=HOT_FROM)
+
+def edited_schedule(games):
+    """The fixture schedule with a kickoff moved, a venue changed, one game dropped and one added."""
+    edited = list(games)
+    edited[1] = make_game(0, "20:30", "RB Leipzig", "VfL Bochum", "Leipzig hbf")
+    edited[4] = make_game(2, "19:00", "KSV Hessen Kassel", "RB Leipzig II", "Frankfurt hbf")
+    del edited[6]
+    edited.append(make_game(4, "15:30", "Hamburger SV", "Hertha BSC", "Berlin hbf"))
+    tbd_games = [make_game(5, "18:30", "Hannover 96", "Hamburger SV", "Hannover hbf")]
+    return edited, tbd_games
+
+def reachable(store, locations=("Berlin hbf", "Kassel hbf", "Stuttgart hbf"), limit=210):
+    return {
+        (location, day): [(game, minutes) for game, minutes in store.game_index.reachable_from(location, day, limit)]
+        for location in locations for day in sorted({g.date for g in store.games})
+    }
+
+def test_unchanged_schedule_has_empty_diff(store):
+    diff = diff_schedules(store, list(store.games), list(store.tbd_games))
+    assert not diff
+    assert diff.summary() == {"inserted": 0, "removed": 0, "changed": 0, "dates": []}
+
+def test_diff_reports_inserted_removed_and_changed(store, games):
+    new_games, new_tbd = edited_schedule(games)
+    diff = diff_schedules(store, new_games, new_tbd)
+
+    summary = diff.summary()
+    assert (summary["inserted"], summary["removed"], summary["changed"]) == (1, 1, 3)
+    assert [g.date.day for g in diff.inserted] == [5]
+    assert diff.removed == [games[6]]
+    assert diff.overlaps(FIRST_DAY.date(), FIRST_DAY.date())
+
+def test_applied_diff_equals_fresh_store(store, games, train_times):
+    reachable(store)  # warm the old store's reachable rows so some are carried over
+    new_games, new_tbd = edited_schedule(games)
+    diff = diff_schedules(store, new_games, new_tbd)
+    applied = apply_schedule_diff(store, 2, new_games, new_tbd, diff)
+    fresh = DataStore(2, train_times, new_games, new_tbd, hot_from=HOT_FROM)
+
+    assert applied.games == fresh.games and applied.tbd_games == fresh.tbd_games
+    assert applied.train_times is store.train_times
+    assert applied.schedule_diff is diff
+    # Fixtures the diff did not touch are the old instances
+    untouched = [game for game in games if game in new_games]
+    assert all(any(game is old for old in store.games) for game in applied.games if game in untouched)
+    assert reachable(applied) == reachable(fresh)
+    for day in {g.date for g in new_games}:
+        assert applied.schedule_index.on(day) == fresh.schedule_index.on(day)
+
+def test_schedule_diff_round_trips(store, games):
+    new_games, new_tbd = edited_schedule(games)
+    forward = apply_schedule_diff(store, 2, new_games, new_tbd, diff_schedules(store, new_games, new_tbd))
+
+    back_diff = diff_schedules(forward, list(store.games), list(store.tbd_games))
+    back = apply_schedule_diff(forward, 3, list(store.games), list(store.tbd_games), back_diff)
+
+    assert back.games == store.games and back.tbd_games == store.tbd_games
+    assert not diff_schedules(back, list(store.games), list(store.tbd_games))
+    assert reachable(back) == reachable(store)
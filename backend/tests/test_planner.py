@@ -0,0 +1,74 @@
+import pytest
+from conftest import START_DATE
+from travel_graph import SparseTravelGraph, TravelTimeMatrix
+from utils import is_must_team_match, parse_match_label, plan_trip
+
+def run(train_times, games, **params):
+    params = {"start_location": "Berlin hbf", "trip_duration": 4, "max_travel_time": 180, **params}
+    return plan_trip(games=games, train_times=train_times, start_date=START_DATE, **params)
+
+def without_must_flags(trips):
+    """Trips with contains_must_team dropped (only set when must_teams are given)."""
+    return [
+        [{**day, "matches": [{k: v for k, v in m.items() if k != "contains_must_team"} for m in day["matches"]]}
+         if "matches" in day else day for day in trip]
+        for trip in trips
+    ]
+
+def covers(trip, must_teams) -> bool:
+    """Reference must-team filter: every required team plays in one of the trip's matches."""
+    labels = [m["match"] for day in trip for m in day.get("matches", [])]
+    return all(
+        any(is_must_team_match(team, {must}) for label in labels for team in parse_match_label(label)[:2])
+        for must in must_teams
+    )
+
+@pytest.mark.parametrize("must_teams", [
+    ["Hertha BSC"],
+    ["hertha bsc ii"],
+    ["RB Leipzig", "VfB Stuttgart"],
+    ["Eintracht Frankfurt", "Dynamo Dresden", "Hannover 96"],
+    ["Nonexistent FC"],
+])
+def test_must_team_pruning_matches_filtering_after_search(train_times, games, must_teams):
+    pruned = run(train_times, games, must_teams=must_teams, min_games=1)
+    unpruned = run(train_times, games, min_games=1)
+
+    expected = [trip for trip in unpruned.get("trips", []) if covers(trip, must_teams)]
+    assert without_must_flags(pruned.get("trips", [])) == without_must_flags(expected)
+    assert bool(pruned.get("no_trips_available")) == (not expected)
+
+def test_must_team_matches_are_flagged(train_times, games):
+    trips = run(train_times, games, must_teams=["VfB Stuttgart"])["trips"]
+    assert trips
+    for trip in trips:
+        flags = [m["contains_must_team"] for day in trip for m in day.get("matches", [])]
+        assert any(flags)
+
+def test_hotel_locations_are_sorted(train_times, games):
+    trips = run(train_times, games, max_travel_time=240)["trips"]
+    stats = [item for trip in trips for item in trip if "hotel_locations" in item]
+    assert stats
+    for item in stats:
+        assert item["hotel_locations"] == sorted(set(item["hotel_locations"]))
+        assert item["unique_hotels"] == len(item["hotel_locations"])
+
+def test_trips_respect_max_travel_time(train_times, games):
+    trips = run(train_times, games, max_travel_time=140)["trips"]
+    assert trips
+    for trip in trips:
+        for day in trip:
+            for match in day.get("matches", []):
+                assert train_times[(match["travel_from"], match["location"])] <= 140
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"max_travel_time": 240, "must_teams": ["Hertha BSC"]},
+    {"start_location": "Kassel hbf", "trip_duration": 3},
+])
+def test_sparse_graph_plans_like_matrix_on_complete_graph(train_times, games, params):
+    matrix = TravelTimeMatrix.from_dict(train_times, transfer_penalty=20)
+    sparse = SparseTravelGraph.from_dict(train_times, transfer_penalty=20)
+
+    assert run(sparse, games, **params) == run(matrix, games, **params)
+    assert run(train_times, games, **params) == run(matrix, games, **params)
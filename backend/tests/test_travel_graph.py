@@ -0,0 +1,82 @@
+import itertools
+import numpy as np
+import pytest
+from travel_graph import (UNKNOWN_MINUTES, SparseTravelGraph, TravelTimeMatrix, complete_travel_times,
+                          neighbors_within, stations_within)
+
+def random_minutes(seed: int, size: int = 6, known: float = 0.4) -> np.ndarray:
+    """A random one-way travel time matrix with most pairs unknown."""
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(10, 300, size=(size, size)).astype(np.uint16)
+    minutes[rng.random((size, size)) > known] = UNKNOWN_MINUTES
+    np.fill_diagonal(minutes, UNKNOWN_MINUTES)
+    return minutes
+
+def brute_force(minutes: np.ndarray, penalty: int):
+    """Cheapest path over every simple path: legs either way, one penalty per change of train."""
+    size = len(minutes)
+    either_way = np.where(minutes != UNKNOWN_MINUTES, minutes, minutes.T).astype(int)
+    expected = either_way.copy()
+    derived = np.zeros_like(minutes, dtype=bool)
+    for a, b in itertools.permutations(range(size), 2):
+        if either_way[a, b] != UNKNOWN_MINUTES:
+            continue
+        best = None
+        others = [c for c in range(size) if c not in (a, b)]
+        for length in range(1, len(others) + 1):
+            for via in itertools.permutations(others, length):
+                path = (a, *via, b)
+                legs = [either_way[x, y] for x, y in zip(path, path[1:])]
+                if UNKNOWN_MINUTES in legs:
+                    continue
+                cost = sum(legs) + penalty * (len(legs) - 1)
+                best = cost if best is None else min(best, cost)
+        if best is not None:
+            expected[a, b] = min(best, UNKNOWN_MINUTES - 1)
+            derived[a, b] = True
+    return expected, derived
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("penalty", [0, 20])
+def test_floyd_warshall_matches_brute_force(seed, penalty):
+    minutes = random_minutes(seed)
+    completed, derived = complete_travel_times(minutes, penalty)
+    expected, expected_derived = brute_force(minutes, penalty)
+
+    assert np.array_equal(derived, expected_derived)
+    assert np.array_equal(completed.astype(int), expected)
+
+def test_completion_keeps_known_connections():
+    minutes = random_minutes(3)
+    completed, derived = complete_travel_times(minutes, 20)
+    known = minutes != UNKNOWN_MINUTES
+    assert np.array_equal(completed[known], minutes[known])
+    assert not derived[known].any()
+
+def test_sparse_graph_matches_matrix_on_complete_graph(train_times):
+    matrix = TravelTimeMatrix.from_dict(train_times, transfer_penalty=20)
+    sparse = SparseTravelGraph.from_dict(train_times, transfer_penalty=20)
+    stations = matrix.stations
+
+    assert sparse.stations == stations
+    for a, b in itertools.product(stations, repeat=2):
+        assert sparse.minutes_between(a, b) == matrix.minutes_between(a, b)
+    for station in stations:
+        for limit in (0, 70, 140, 300):
+            assert neighbors_within(sparse, station, limit) == neighbors_within(matrix, station, limit)
+    for group in (["Berlin hbf"], ["Leipzig hbf", "Frankfurt hbf"], list(stations)):
+        for limit in (70, 140, 210):
+            assert stations_within(sparse, group, limit) == stations_within(matrix, group, limit)
+
+def test_minutes_by_id_matches_minutes_between(train_times):
+    for graph in (TravelTimeMatrix.from_dict(train_times), SparseTravelGraph.from_dict(train_times)):
+        for a, b in itertools.product(graph.stations, repeat=2):
+            ids = graph.station_id(a), graph.station_id(b)
+            assert graph.minutes_by_id(*ids) == graph.minutes_between(a, b) == train_times[(a, b)]
+
+def test_station_spellings_resolve_to_one_id(train_times):
+    matrix = TravelTimeMatrix.from_dict(train_times)
+    berlin = matrix.station_id("Berlin hbf")
+    assert matrix.station_id("Berlin") == matrix.station_id("berlin Hauptbahnhof") == berlin
+    assert matrix.station_id("Atlantis") is None
+    assert matrix.minutes_between("Berlin", "Leipzig hbf") == train_times[("Berlin hbf", "Leipzig hbf")]
@@ -0,0 +1,204 @@
+"""
+Timetable-aware travel engine (connection scan).
+
+The fastest_train_times.csv matrix knows one "best" duration per station pair
+and nothing about when trains run, so a 20:30 kickoff 300 minutes from the
+hotel looks just as reachable back home as a 15:30 one. This engine answers
+departure-time-dependent questions from a local timetable file instead:
+
+    From,To,Departure,Arrival[,Train]
+    Berlin hbf,Hamburg hbf,06:04,07:52,ICE 1001
+
+Times are minutes of one service day; an arrival earlier than its departure
+runs past midnight. Rows with the same Train value are one vehicle, so staying
+seated needs no transfer time; every other change of train needs
+MIN_TRANSFER_MINUTES.
+
+For each target station a profile connection scan (one backwards pass over
+the connections sorted by departure) yields, per source station, the Pareto
+set of (departure, arrival) journeys. Profiles are built once per target and
+kept as sorted arrays, so a query is a dict lookup plus one bisect.
+"""
+
+import csv
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from common import clock_minutes
+from travel_graph import station_key
+
+logger = logging.getLogger("trip-planner")
+
+_INF = float("inf")
+
+class TimetableEngine:
+    """Earliest-arrival / latest-departure queries over one service day of connections."""
+
+    def __init__(self, stations: List[str], connections: List[Tuple[int, int, int, int, int]],
+                 min_transfer: int = 5):
+        # connections: (departure, arrival, from_id, to_id, train_id) with train_id 0 = unknown
+        self.stations = list(stations)
+        self.station_ids = {name: i for i, name in enumerate(self.stations)}
+        self.aliases: Dict[str, int] = {}
+        for i, name in enumerate(self.stations):
+            self.aliases.setdefault(station_key(name), i)
+        self.connections = sorted(connections)
+        self.min_transfer = min_transfer
+        self._profiles: Dict[int, Tuple[Tuple[array, array], ...]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path: str, min_transfer: int = 5) -> "TimetableEngine":
+        stations, station_ids, trains, connections = [], {}, {}, []
+
+        def intern(name: str) -> int:
+            if name not in station_ids:
+                station_ids[name] = len(stations)
+                stations.append(name)
+            return station_ids[name]
+
+        skipped = 0
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                departure, arrival = clock_minutes(row.get("Departure")), clock_minutes(row.get("Arrival"))
+                origin, destination = (row.get("From") or "").strip(), (row.get("To") or "").strip()
+                if departure is None or arrival is None or not origin or not destination or origin == destination:
+                    skipped += 1
+                    continue
+                if arrival < departure:
+                    arrival += 24 * 60
+                train = (row.get("Train") or "").strip()
+                train_id = trains.setdefault(train, len(trains) + 1) if train else 0
+                connections.append((departure, arrival, intern(origin), intern(destination), train_id))
+
+        if skipped:
+            logger.warning(f"⚠️ Skipped {skipped} unparsable timetable rows in {path}")
+        return cls(stations, connections, min_transfer)
+
+    def station_id(self, name: str) -> Optional[int]:
+        """Exact name first, then the canonical station key ("München Hbf" == "Munich hbf")."""
+        if not isinstance(name, str):
+            return None
+        found = self.station_ids.get(name)
+        return found if found is not None else self.aliases.get(station_key(name))
+
+    def covers(self, *names: str) -> bool:
+        """True if every station appears in the timetable."""
+        return all(self.station_id(name) is not None for name in names)
+
+    # ────────────────────────────────
+    # 🧮 Profiles
+    # ────────────────────────────────
+
+    def _build_profile(self, target: int) -> Tuple[Tuple[array, array], ...]:
+        """Profile connection scan towards `target`: per station, Pareto (departure, arrival) journeys."""
+        count = len(self.stations)
+        neg_departures: List[List[int]] = [[] for _ in range(count)]  # ascending, i.e. departures descending
+        arrivals: List[List[int]] = [[] for _ in range(count)]
+        train_best: Dict[int, float] = {}
+        transfer = self.min_transfer
+
+        for departure, arrival, origin, destination, train in reversed(self.connections):
+            if destination == target:
+                best = arrival
+            else:
+                # Earliest arrival when changing trains at `destination`
+                best = _INF
+                negs = neg_departures[destination]
+                if negs:
+                    i = bisect_right(negs, -arrival - transfer)
+                    if i:
+                        best = arrivals[destination][i - 1]
+            if train:
+                best = min(best, train_best.get(train, _INF))
+                train_best[train] = best
+            if best == _INF or origin == target:
+                continue
+            negs, arrs = neg_departures[origin], arrivals[origin]
+            if not arrs or best < arrs[-1]:
+                if negs and negs[-1] == -departure:
+                    arrs[-1] = best  # same departure, better arrival
+                else:
+                    negs.append(-departure)
+                    arrs.append(best)
+
+        return tuple(
+            (array("i", (-d for d in reversed(negs))), array("i", reversed(arrs)))
+            for negs, arrs in zip(neg_departures, arrivals)
+        )
+
+    def profile(self, target: int) -> Tuple[Tuple[array, array], ...]:
+        found = self._profiles.get(target)
+        if found is None:
+            with self._lock:
+                found = self._profiles.get(target)
+                if found is None:
+                    found = self._profiles[target] = self._build_profile(target)
+        return found
+
+    def precompute(self) -> float:
+        """Build every target profile up front; returns the build time in seconds."""
+        started = time.perf_counter()
+        for target in range(len(self.stations)):
+            self.profile(target)
+        return time.perf_counter() - started
+
+    # ────────────────────────────────
+    # 🔎 Queries
+    # ────────────────────────────────
+
+    def earliest_arrival(self, origin: str, destination: str, depart_after: int) -> Optional[int]:
+        """Earliest arrival (minutes of the service day) leaving origin at or after depart_after."""
+        a, b = self.station_id(origin), self.station_id(destination)
+        if a is None or b is None:
+            return None
+        if a == b:
+            return depart_after
+        departures, arrivals = self.profile(b)[a]
+        i = bisect_left(departures, depart_after)
+        return arrivals[i] if i < len(departures) else None
+
+    def latest_journey(self, origin: str, destination: str, arrive_by: int) -> Optional[Tuple[int, int]]:
+        """(departure, arrival) of the latest-leaving journey that arrives by arrive_by."""
+        a, b = self.station_id(origin), self.station_id(destination)
+        if a is None or b is None:
+            return None
+        if a == b:
+            return arrive_by, arrive_by
+        departures, arrivals = self.profile(b)[a]
+        i = bisect_right(arrivals, arrive_by)
+        return (departures[i - 1], arrivals[i - 1]) if i else None
+
+    def reaches_by(self, origin: str, destination: str, arrive_by: int, max_minutes: int) -> bool:
+        """Is there a journey arriving by arrive_by that takes at most max_minutes door to door?"""
+        journey = self.latest_journey(origin, destination, arrive_by)
+        return journey is not None and journey[1] - journey[0] <= max_minutes
+
+    def returns_after(self, origin: str, destination: str, depart_after: int, max_minutes: int) -> bool:
+        """Is there a journey leaving after depart_after that arrives within max_minutes (waiting included)?"""
+        arrival = self.earliest_arrival(origin, destination, depart_after)
+        return arrival is not None and arrival - depart_after <= max_minutes
+
+    def info(self) -> Dict:
+        return {
+            "stations": len(self.stations),
+            "connections": len(self.connections),
+            "profiles_built": len(self._profiles),
+            "min_transfer_minutes": self.min_transfer,
+        }
+
+def load_timetable(path: Optional[str], min_transfer: int = 5, precompute: bool = True) -> Optional[TimetableEngine]:
+    """Load the timetable engine if the file exists (the engine is optional)."""
+    if not path or not os.path.exists(path):
+        return None
+    started = time.perf_counter()
+    engine = TimetableEngine.from_csv(path, min_transfer)
+    logger.info(f"🚆 Loaded timetable: {len(engine.connections)} connections between {len(engine.stations)} stations")
+    if precompute:
+        logger.info(f"🚆 Precomputed {len(engine.stations)} timetable profiles in {engine.precompute():.2f}s")
+    logger.debug(f"Timetable ready in {time.perf_counter() - started:.2f}s")
+    return engine
@@ -0,0 +1,616 @@
+import abc
+import copy
+import heapq
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from common import fold_name
+
+# Sentinel stored in the matrix for station pairs without a known connection
+UNKNOWN_MINUTES = int(np.iinfo(np.uint16).max)
+
+# Reachability bitmasks are precomputed for every 15 minutes up to the largest
+# max_travel_time the trip form accepts
+REACH_BUCKET_MINUTES = 15
+REACH_MAX_MINUTES = 420
+
+# Trailing words that only say "main station": "Mainz", "Mainz hbf" and "Mainz Hauptbahnhof" are one station
+_MAIN_STATION_WORDS = ("hbf", "hauptbahnhof")
+
+def station_key(name: str) -> str:
+    """Canonical spelling key for a station: folded like team names, without a trailing "hbf"."""
+    base, _, last = fold_name(name).rpartition(" ")
+    return base if base and last in _MAIN_STATION_WORDS else fold_name(name)
+
+def complete_travel_times(minutes: np.ndarray, transfer_penalty: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fill unknown station pairs with the shortest path over known connections,
+    charging transfer_penalty minutes for every change of train (Floyd-Warshall).
+
+    Known entries are kept as they are. Returns (completed minutes, derived mask),
+    where derived marks the entries that were filled in.
+    """
+    unknown = minutes == UNKNOWN_MINUTES
+    either_way = np.where(unknown, minutes.T, minutes)
+    missing = either_way == UNKNOWN_MINUTES
+
+    # Each leg costs its minutes plus one penalty, so a path costs legs + (changes + 1) * penalty
+    no_path = np.iinfo(np.int64).max // 4
+    cost = np.where(missing, no_path, either_way.astype(np.int64) + transfer_penalty)
+    np.fill_diagonal(cost, 0)
+    for via in range(len(cost)):
+        np.minimum(cost, cost[:, via, None] + cost[None, via, :], out=cost)
+
+    derived = missing & (cost < no_path)
+    np.fill_diagonal(derived, False)
+    completed = either_way.copy()
+    completed[derived] = np.minimum(cost[derived] - transfer_penalty, UNKNOWN_MINUTES - 1)
+    return completed, derived
+
+def iter_connections(train_times):
+    """((from, to), minutes) for real connections, skipping the same-city 0-minute entries."""
+    for pair, minutes in train_times.items():
+        if pair[0] != pair[1]:
+            yield pair, minutes
+
+def count_connections(train_times) -> int:
+    """Number of real connections, i.e. len(train_times) without the same-city entries."""
+    if isinstance(train_times, TravelTimeMatrix):
+        return len(train_times) - int(np.count_nonzero(np.diagonal(train_times.minutes) != UNKNOWN_MINUTES))
+    return sum(1 for pair in train_times if pair[0] != pair[1])
+
+def either_way_minutes(train_times, from_loc: str, to_loc: str, default=float("inf")):
+    """Travel minutes in either direction, or default when neither is known."""
+    if isinstance(train_times, StationGraph):
+        minutes = train_times.minutes_between(from_loc, to_loc)
+        return default if minutes is None else minutes
+    return train_times.get((from_loc, to_loc), train_times.get((to_loc, from_loc), default))
+
+def stations_within(train_times, locations: Iterable[str], max_minutes: int) -> Set[str]:
+    """Stations within max_minutes (either direction) of every one of the given locations."""
+    locations = list(locations)
+    if isinstance(train_times, StationGraph):
+        return {train_times.stations[i] for i in train_times.ids_within(locations, max_minutes)}
+
+    return {
+        city for city in station_names(train_times)
+        if all(either_way_minutes(train_times, city, loc) <= max_minutes for loc in locations)
+    }
+
+def neighbors_within(train_times, location: str, max_minutes: int) -> List[Tuple[str, int]]:
+    """(station, minutes) reachable from location within max_minutes, nearest first, without location itself."""
+    if isinstance(train_times, StationGraph):
+        station_id = train_times.station_id(location)
+        if station_id is None:
+            return []
+        ids, minutes = train_times.neighbors_of(station_id, max_minutes)
+        stations = train_times.stations
+        return [(stations[i], m) for i, m in zip(ids.tolist(), minutes.tolist()) if i != station_id]
+
+    nearby = {}
+    for (from_loc, to_loc), minutes in iter_connections(train_times):
+        if minutes <= max_minutes and location in (from_loc, to_loc):
+            other = to_loc if from_loc == location else from_loc
+            nearby[other] = min(minutes, nearby.get(other, minutes))
+    return sorted(nearby.items(), key=lambda item: item[1])
+
+def minutes_to_stations(train_times, from_loc: str, to_locs: List[str]) -> List[Optional[int]]:
+    """Either-way minutes from one location to each of to_locs (None where unknown)."""
+    if isinstance(train_times, StationGraph):
+        return train_times.minutes_from(from_loc, to_locs)
+    return [either_way_minutes(train_times, from_loc, to_loc, None) for to_loc in to_locs]
+
+def travel_sub_matrix(train_times, locations: Iterable[str],
+                      max_minutes: Optional[int] = None) -> Tuple[List[str], List[str], List[List[Optional[int]]]]:
+    """
+    (stations, unresolved, rows): the canonical stations for `locations` (duplicates
+    and other spellings of the same station dropped), the names that match no station,
+    and rows[i][j] = either-way minutes between stations i and j (None if unknown or
+    beyond max_minutes).
+    """
+    stations, unresolved, station_ids, seen = [], [], [], set()
+    for name in locations:
+        if isinstance(train_times, StationGraph):
+            station_id = train_times.station_id(name)
+            station = None if station_id is None else train_times.stations[station_id]
+        else:
+            station = station_id = resolve_station(train_times, name)
+        if station is None:
+            unresolved.append(name)
+        elif station not in seen:
+            seen.add(station)
+            stations.append(station)
+            station_ids.append(station_id)
+
+    if isinstance(train_times, StationGraph):
+        block = train_times.sub_matrix(station_ids).astype(np.int32)
+        np.fill_diagonal(block, 0)
+        unknown = block == UNKNOWN_MINUTES
+        if max_minutes is not None:
+            unknown |= block > max_minutes
+        rows = [[None if is_unknown else value for value, is_unknown in zip(row, unknown_row)]
+                for row, unknown_row in zip(block.tolist(), unknown.tolist())]
+    else:
+        rows = []
+        for a in stations:
+            row = [0 if a == b else either_way_minutes(train_times, a, b, None) for b in stations]
+            rows.append([None if value is None or (max_minutes is not None and value > max_minutes) else value
+                         for value in row])
+    return stations, unresolved, rows
+
+def station_names(train_times) -> Tuple[str, ...]:
+    """Every station (city) in the travel graph."""
+    if isinstance(train_times, StationGraph):
+        return train_times.stations
+    return tuple(sorted({city for pair in train_times for city in pair}))
+
+def resolve_station(train_times, name: str) -> Optional[str]:
+    """Canonical station name for any spelling of it, None if no station matches."""
+    if isinstance(train_times, StationGraph):
+        station_id = train_times.station_id(name)
+        return None if station_id is None else train_times.stations[station_id]
+    return next((city for pair in train_times for city in pair if city.lower() == name.lower()), None)
+
+class TrainTimes(dict):
+    """The plain train_times dict, tagged with the data store version it belongs to."""
+    version = 0
+
+class StationGraph(Mapping):
+    """
+    Read-only (from, to) -> minutes mapping over interned stations.
+
+    Behaves like the train_times dict (get/keys/items/len) so endpoints can use it
+    unchanged, while the planner's hot loops resolve a name to its station ID once
+    and use minutes_between / minutes_from / neighbors_of / ids_within.
+    Every other spelling of a station ("Mainz", "mainz Hauptbahnhof", "Muenchen hbf")
+    resolves through station_key; resolve_spellings() does that once at load time.
+
+    TravelTimeMatrix holds every pair in a dense matrix; SparseTravelGraph keeps
+    only direct connections and computes shortest paths on demand.
+    """
+    version = 0
+
+    def __init__(self, stations: Iterable[str]):
+        self.stations = tuple(stations)
+        self.station_ids = {name: i for i, name in enumerate(self.stations)}
+        self._resolved: Dict[str, Optional[int]] = {}
+        self.aliases: Dict[str, int] = {}
+        for station_id, name in enumerate(self.stations):
+            key = station_key(name)
+            # On a collision ("Mainz" and "Mainz hbf" both listed) the main station wins
+            if key not in self.aliases or fold_name(name) != key:
+                self.aliases[key] = station_id
+
+    def view(self):
+        """Another view (e.g. for a new store version) sharing the graph and its indexes."""
+        return copy.copy(self)
+
+    def station_id(self, name: str) -> Optional[int]:
+        """Interned ID for any spelling of a station; spellings resolved at load are one dict probe."""
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        # Not cached: names from requests would grow the dict without bound
+        return self._lookup(name)
+
+    def _lookup(self, name: str) -> Optional[int]:
+        station_id = self.station_ids.get(name)
+        if station_id is None and isinstance(name, str):
+            station_id = self.aliases.get(station_key(name))
+        return station_id
+
+    def resolve_spellings(self, names: Iterable[str]) -> List[str]:
+        """
+        Resolve the data's spellings up front (cached on this view only, never at
+        request time) and return the ones that match no station.
+        """
+        resolved = {name: self._lookup(name) for name in names}
+        self._resolved = resolved
+        return sorted(name for name, station_id in resolved.items() if station_id is None)
+
+    @abc.abstractmethod
+    def _distance_row(self, station_id: int) -> np.ndarray:
+        """Minutes from station_id to every station (UNKNOWN_MINUTES where unreachable)."""
+
+    @abc.abstractmethod
+    def neighbors_of(self, station_id: int, max_minutes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, minutes) of stations within max_minutes of station_id, nearest first (itself included)."""
+
+    @abc.abstractmethod
+    def minutes_by_id(self, from_id: int, to_id: int) -> Optional[int]:
+        """Travel minutes between two station IDs in either direction, None if unknown."""
+
+    def minutes_between(self, from_loc: str, to_loc: str) -> Optional[int]:
+        """Travel minutes between two locations in either direction, None if unknown."""
+        from_id = self.station_id(from_loc)
+        to_id = self.station_id(to_loc)
+        if from_id is None or to_id is None:
+            return None
+        return self.minutes_by_id(from_id, to_id)
+
+    def minutes_from(self, from_loc: str, to_locs: List[str]) -> List[Optional[int]]:
+        """Minutes from one location to each of to_locs with one fancy-index read."""
+        from_id = self.station_id(from_loc)
+        if from_id is None:
+            return [None] * len(to_locs)
+        to_ids = [self.station_id(loc) for loc in to_locs]
+        known = [i for i in to_ids if i is not None]
+        values = iter(self._distance_row(from_id)[known].tolist()) if known else iter(())
+        result = []
+        for to_id in to_ids:
+            value = next(values) if to_id is not None else UNKNOWN_MINUTES
+            result.append(None if value == UNKNOWN_MINUTES else value)
+        return result
+
+    def sub_matrix(self, station_ids: List[int]) -> np.ndarray:
+        """Either-way minutes between every pair of station_ids, one distance row per source."""
+        if not station_ids:
+            return np.empty((0, 0), dtype=np.uint16)
+        return np.stack([self._distance_row(station_id)[station_ids] for station_id in station_ids])
+
+    def ids_within(self, locations: List[str], max_minutes: int) -> np.ndarray:
+        """IDs of stations within max_minutes of every location (empty if one is unknown)."""
+        if not locations:
+            return np.arange(len(self.stations))
+        station_ids = [self.station_id(location) for location in locations]
+        if None in station_ids:
+            return np.empty(0, dtype=np.intp)
+
+        # Start from the shortest neighbor list and check the other locations only for those
+        neighbor_lists = [self.neighbors_of(station_id, max_minutes)[0] for station_id in set(station_ids)]
+        neighbor_lists.sort(key=len)
+        candidates = neighbor_lists[0]
+        for other in neighbor_lists[1:]:
+            if not len(candidates):
+                break
+            candidates = candidates[np.isin(candidates, other)]
+        return candidates
+
+    def __getitem__(self, key) -> int:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+class TravelTimeMatrix(StationGraph):
+    """
+    Station graph backed by a dense matrix: one uint16 per station pair, which
+    may live in a memory-mapped data artifact shared between workers. A lookup
+    by station ID is a single array index.
+
+    "Within T minutes of X" queries use per-station neighbor lists sorted by minutes
+    (neighbor_ids / neighbor_minutes, built once per matrix): a bisect plus a slice.
+    "Within T of every one of these" is a bitwise AND of per-station reachability
+    masks (reach_masks[bucket][station], one bit per station, every 15 minutes).
+
+    `derived` (when the graph was completed) marks the pairs that are shortest
+    paths with transfers rather than direct connections from the CSV.
+    """
+    def __init__(self, stations: Iterable[str], minutes: np.ndarray, derived: Optional[np.ndarray] = None):
+        super().__init__(stations)
+        self.minutes = minutes
+        self.derived = derived
+        either_way = np.where(minutes != UNKNOWN_MINUTES, minutes, minutes.T)
+        self.neighbor_ids, self.neighbor_minutes = self._build_neighbors(either_way)
+        self.reach_masks = self._build_reach_masks(either_way)
+        self._size = None
+
+    @classmethod
+    def from_dict(cls, train_times: Dict[Tuple[str, str], int],
+                  transfer_penalty: Optional[int] = None) -> "TravelTimeMatrix":
+        """
+        Intern station names and build the matrix from a train_times dict; with a
+        transfer_penalty, missing pairs are completed (see complete_travel_times).
+        """
+        stations = sorted({city for pair in train_times for city in pair})
+        station_ids = {name: i for i, name in enumerate(stations)}
+        minutes = np.full((len(stations), len(stations)), UNKNOWN_MINUTES, dtype=np.uint16)
+
+        for (from_loc, to_loc), travel_minutes in train_times.items():
+            if not 0 <= travel_minutes < UNKNOWN_MINUTES:
+                raise ValueError(f"Travel time out of range for {from_loc} → {to_loc}: {travel_minutes}")
+            minutes[station_ids[from_loc], station_ids[to_loc]] = travel_minutes
+
+        # Keep the matrix symmetric: fill a missing direction from the known one
+        one_way = (minutes == UNKNOWN_MINUTES) & (minutes.T != UNKNOWN_MINUTES)
+        minutes[one_way] = minutes.T[one_way]
+
+        if transfer_penalty is None:
+            return cls(stations, minutes)
+        return cls(stations, *complete_travel_times(minutes, transfer_penalty))
+
+    @property
+    def derived_count(self) -> int:
+        """Number of (from, to) entries filled in by completion."""
+        return 0 if self.derived is None else int(np.count_nonzero(self.derived))
+
+    def is_derived(self, from_loc: str, to_loc: str) -> bool:
+        """True when the travel time between the two comes from completion, not the CSV."""
+        from_id = self.station_id(from_loc)
+        to_id = self.station_id(to_loc)
+        if self.derived is None or from_id is None or to_id is None:
+            return False
+        return bool(self.derived[from_id, to_id])
+
+    @staticmethod
+    def _build_neighbors(either_way: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Every station's neighbors (either direction) sorted by minutes; unknown pairs sort last."""
+        neighbor_ids = np.argsort(either_way, axis=1, kind="stable").astype(np.int32)
+        neighbor_minutes = np.take_along_axis(either_way, neighbor_ids, axis=1)
+        return neighbor_ids, neighbor_minutes
+
+    @staticmethod
+    def _build_reach_masks(either_way: np.ndarray) -> List[List[int]]:
+        """reach_masks[k][i]: bit j set when station j is within k * REACH_BUCKET_MINUTES of i."""
+        masks = []
+        for limit in range(0, REACH_MAX_MINUTES + 1, REACH_BUCKET_MINUTES):
+            bits = np.packbits(either_way <= limit, axis=1, bitorder="little")
+            masks.append([int.from_bytes(row.tobytes(), "little") for row in bits])
+        return masks
+
+    def _ids_from_mask(self, mask: int) -> np.ndarray:
+        packed = np.frombuffer(mask.to_bytes((len(self.stations) + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(packed, bitorder="little")[:len(self.stations)])
+
+    def reach_mask(self, station_ids: List[int], max_minutes: int) -> int:
+        """Bitmask of stations within max_minutes of every station in station_ids (max_minutes <= REACH_MAX_MINUTES)."""
+        bucket, remainder = divmod(int(max_minutes), REACH_BUCKET_MINUTES)
+        lower = self.reach_masks[bucket]
+        mask = -1
+        for station_id in station_ids:
+            mask &= lower[station_id]
+        if not remainder:
+            return mask
+
+        # Between two buckets: stations in the next bucket's AND but not this one's need a real check
+        upper = self.reach_masks[bucket + 1]
+        maybe = -1
+        for station_id in station_ids:
+            maybe &= upper[station_id]
+        maybe &= ~mask
+        if maybe:
+            candidates = self._ids_from_mask(maybe)
+            ok = np.ones(len(candidates), dtype=bool)
+            for station_id in station_ids:
+                ok &= self._distance_row(station_id)[candidates] <= max_minutes
+            for candidate in candidates[ok].tolist():
+                mask |= 1 << candidate
+        return mask
+
+    def neighbors_of(self, station_id: int, max_minutes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, minutes) of stations within max_minutes of station_id, nearest first (itself included)."""
+        limit = min(max_minutes, UNKNOWN_MINUTES - 1)
+        count = int(np.searchsorted(self.neighbor_minutes[station_id], limit, side="right"))
+        return self.neighbor_ids[station_id, :count], self.neighbor_minutes[station_id, :count]
+
+    def minutes_by_id(self, from_id: int, to_id: int) -> Optional[int]:
+        value = self.minutes.item(from_id, to_id)
+        if value == UNKNOWN_MINUTES:
+            # Artifacts compiled before the matrix was symmetric may hold one direction only
+            value = self.minutes.item(to_id, from_id)
+        return None if value == UNKNOWN_MINUTES else value
+
+    def _distance_row(self, station_id: int) -> np.ndarray:
+        row = self.minutes[station_id]
+        col = self.minutes[:, station_id]
+        return np.where(row != UNKNOWN_MINUTES, row, col)
+
+    def sub_matrix(self, station_ids: List[int]) -> np.ndarray:
+        """One fancy-index read of the block, unknown entries filled from the transpose."""
+        block = self.minutes[np.ix_(station_ids, station_ids)]
+        return np.where(block != UNKNOWN_MINUTES, block, block.T)
+
+    def ids_within(self, locations: List[str], max_minutes: int) -> np.ndarray:
+        station_ids = {self.station_id(location) for location in locations}
+        if locations and None not in station_ids and 0 <= max_minutes <= REACH_MAX_MINUTES:
+            return self._ids_from_mask(self.reach_mask(list(station_ids), max_minutes))
+        # Beyond the precomputed buckets: intersect the sorted neighbor lists
+        return super().ids_within(locations, max_minutes)
+
+    def get(self, key, default=None) -> Optional[int]:
+        from_id = self.station_ids.get(key[0])
+        to_id = self.station_ids.get(key[1])
+        if from_id is None or to_id is None:
+            return default
+        value = int(self.minutes[from_id, to_id])
+        return default if value == UNKNOWN_MINUTES else value
+
+    def __iter__(self):
+        from_ids, to_ids = np.nonzero(self.minutes != UNKNOWN_MINUTES)
+        stations = self.stations
+        for i, j in zip(from_ids.tolist(), to_ids.tolist()):
+            yield (stations[i], stations[j])
+
+    def __len__(self) -> int:
+        if self._size is None:
+            self._size = int(np.count_nonzero(self.minutes != UNKNOWN_MINUTES))
+        return self._size
+
+class SparseTravelGraph(StationGraph):
+    """
+    Station graph that keeps only the direct connections and computes shortest
+    travel times on demand (Dijkstra, transfer_penalty minutes per change of train).
+
+    Memory grows with the number of connections instead of stations², so it suits
+    networks of thousands of stations. Each source's shortest-path row is kept in a
+    bounded LRU cache (cache_size rows) shared by every view of the graph; Dijkstra
+    settles stations in order of distance, so the row comes with its neighbor list
+    already sorted.
+    """
+
+    def __init__(self, stations: Iterable[str], adjacency: List[Dict[int, int]],
+                 transfer_penalty: int = 0, cache_size: int = 512):
+        super().__init__(stations)
+        self.adjacency = adjacency
+        self.transfer_penalty = transfer_penalty
+        self.cache_size = cache_size
+        self.derived = None
+        self._rows: "OrderedDict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+        self._rows_lock = threading.Lock()
+        self._row_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._size = sum(len(edges) for edges in adjacency)
+
+    @classmethod
+    def from_dict(cls, train_times: Dict[Tuple[str, str], int], transfer_penalty: Optional[int] = None,
+                  cache_size: int = 512) -> "SparseTravelGraph":
+        """Intern station names and keep the direct connections of a train_times dict (both directions)."""
+        stations = sorted({city for pair in train_times for city in pair})
+        station_ids = {name: i for i, name in enumerate(stations)}
+        adjacency: List[Dict[int, int]] = [{} for _ in stations]
+
+        for (from_loc, to_loc), travel_minutes in train_times.items():
+            if not 0 <= travel_minutes < UNKNOWN_MINUTES:
+                raise ValueError(f"Travel time out of range for {from_loc} → {to_loc}: {travel_minutes}")
+            from_id, to_id = station_ids[from_loc], station_ids[to_loc]
+            if from_id == to_id:
+                continue  # same-city entries are implicit
+            adjacency[from_id][to_id] = travel_minutes
+            adjacency[to_id].setdefault(from_id, travel_minutes)
+
+        return cls(stations, adjacency, transfer_penalty or 0, cache_size)
+
+    @property
+    def derived_count(self) -> Optional[int]:
+        """Not enumerated: every pair without a direct connection is derived on demand."""
+        return None
+
+    def is_derived(self, from_loc: str, to_loc: str) -> bool:
+        from_id = self.station_id(from_loc)
+        to_id = self.station_id(to_loc)
+        if from_id is None or to_id is None or from_id == to_id:
+            return False
+        return to_id not in self.adjacency[from_id] and self.minutes_between(from_loc, to_loc) is not None
+
+    def _shortest_paths(self, source: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(minutes to every station, station IDs nearest first, their minutes) from source."""
+        penalty = self.transfer_penalty
+        adjacency = self.adjacency
+        best = {source: 0}
+        settled = []
+        heap = [(0, source)]
+        while heap:
+            cost, station = heapq.heappop(heap)
+            if cost > best[station]:
+                continue
+            settled.append(station)
+            for neighbor, minutes in adjacency[station].items():
+                # Every leg pays one penalty, so a path pays one per change plus one
+                new_cost = cost + minutes + penalty
+                if new_cost < best.get(neighbor, new_cost + 1):
+                    best[neighbor] = new_cost
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        order = np.array(settled, dtype=np.int32)
+        sorted_minutes = np.array([best[station] for station in settled], dtype=np.int64)
+        sorted_minutes[1:] -= penalty
+        sorted_minutes = np.minimum(sorted_minutes, UNKNOWN_MINUTES - 1).astype(np.uint16)
+
+        row = np.full(len(self.stations), UNKNOWN_MINUTES, dtype=np.uint16)
+        row[order] = sorted_minutes
+        return row, order, sorted_minutes
+
+    def _cached_paths(self, source: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Hits stay lock-free (single OrderedDict operations are atomic under the GIL)
+        paths = self._rows.get(source)
+        if paths is not None:
+            try:
+                self._rows.move_to_end(source)
+            except KeyError:
+                pass  # evicted by another thread meanwhile; the row we hold is still valid
+            self._row_stats["hits"] += 1  # unlocked, so approximate under concurrency
+            return paths
+
+        paths = self._shortest_paths(source)
+        with self._rows_lock:
+            self._row_stats["misses"] += 1
+            self._rows[source] = paths
+            while len(self._rows) > self.cache_size:
+                self._rows.popitem(last=False)
+                self._row_stats["evictions"] += 1
+        return paths
+
+    def cache_info(self) -> Dict[str, int]:
+        return {**self._row_stats, "size": len(self._rows), "maxsize": self.cache_size}
+
+    def _distance_row(self, station_id: int) -> np.ndarray:
+        return self._cached_paths(station_id)[0]
+
+    def neighbors_of(self, station_id: int, max_minutes: int) -> Tuple[np.ndarray, np.ndarray]:
+        _, order, sorted_minutes = self._cached_paths(station_id)
+        limit = min(max_minutes, UNKNOWN_MINUTES - 1)
+        count = int(np.searchsorted(sorted_minutes, limit, side="right"))
+        return order[:count], sorted_minutes[:count]
+
+    def minutes_by_id(self, from_id: int, to_id: int) -> Optional[int]:
+        if from_id == to_id:
+            return 0
+        # Paths are symmetric: reuse whichever end already has its row cached
+        if to_id in self._rows and from_id not in self._rows:
+            from_id, to_id = to_id, from_id
+        value = self._distance_row(from_id).item(to_id)
+        return None if value == UNKNOWN_MINUTES else value
+
+    def get(self, key, default=None) -> Optional[int]:
+        """Direct connection only, like the CSV-backed dict (same station: 0)."""
+        from_id = self.station_ids.get(key[0])
+        to_id = self.station_ids.get(key[1])
+        if from_id is None or to_id is None:
+            return default
+        if from_id == to_id:
+            return 0
+        return self.adjacency[from_id].get(to_id, default)
+
+    def __iter__(self):
+        stations = self.stations
+        for from_id, edges in enumerate(self.adjacency):
+            for to_id in edges:
+                yield (stations[from_id], stations[to_id])
+
+    def __len__(self) -> int:
+        return self._size
+
+class StationLookup:
+    """
+    Travel minutes for one planning run by station ID: every name the run meets
+    (start, match and hotel stations) is resolved once, after which a lookup is a
+    dict probe per name and one minutes_by_id read. Plain train_times dicts
+    (scripts, benchmarks) keep their by-name lookups.
+
+    Scoped to a run on purpose: request names must not grow a long-lived dict.
+    """
+
+    def __init__(self, train_times):
+        self.train_times = train_times
+        self.graph = train_times if isinstance(train_times, StationGraph) else None
+        self._ids: Dict[str, Optional[int]] = {}
+
+    def station_id(self, name: str) -> Optional[int]:
+        try:
+            return self._ids[name]
+        except KeyError:
+            station_id = self._ids[name] = self.graph.station_id(name)
+            return station_id
+
+    def minutes(self, from_loc: str, to_loc: str, default=float("inf")):
+        """either_way_minutes by station ID: minutes in either direction, or default when unknown."""
+        if self.graph is None:
+            return either_way_minutes(self.train_times, from_loc, to_loc, default)
+        ids = self._ids
+        from_id = ids[from_loc] if from_loc in ids else self.station_id(from_loc)
+        to_id = ids[to_loc] if to_loc in ids else self.station_id(to_loc)
+        if from_id is None or to_id is None:
+            return default
+        minutes = self.graph.minutes_by_id(from_id, to_id)
+        return default if minutes is None else minutes
+
+    def travel_minutes(self, from_loc: str, to_loc: str) -> Optional[int]:
+        """Like minutes() with None for unknown, and 0 for the same location in any letter case."""
+        if from_loc == to_loc or from_loc.lower() == to_loc.lower():
+            return 0
+        return self.minutes(from_loc, to_loc, None)
@@ -1,13 +1,17 @@
 import asyncio
 import functools
-import pandas as pd
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from models import Game
-from data.synonyms import bundesliga_1_stadiums, bundesliga_2_stadiums, third_liga_stadiums
-from typing import Optional, List, Dict
+from team_index import station_for_team
+from typing import Optional, List, Dict, Tuple
 import itertools
-from config import TRAIN_TIMES_FILE, DEFAULT_CITIES
-from common import is_request_cancelled, get_processed_start_date
+from config import DEFAULT_CITIES, TRAVEL_CACHE_SIZE, KICKOFF_BUFFER_MINUTES, MATCH_DURATION_MINUTES
+from data_store import GameDayIndex, get_store, on_store_swap
+from travel_graph import (StationGraph, StationLookup, TravelTimeMatrix, either_way_minutes, neighbors_within,
+                          stations_within)
+from common import is_request_cancelled, get_processed_start_date, team_key, split_suffix, clock_minutes
 import logging
 logger = logging.getLogger("trip-planner")
 
@@ -73,87 +77,147 @@ def generate_trip_signature(trip_key):
     
     return tuple(sorted(match_signature))
 
-def memoize_travel_time(func, maxsize=10000):
-    from collections import OrderedDict
-    cache = OrderedDict()
+class TravelTimeCache:
+    """Thread-safe LRU of travel lookups with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """(found, value) for key, counting the hit or miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+def travel_cache_key(train_times, from_key, to_key) -> Optional[tuple]:
+    """
+    (data version, from, to), unordered since travel times are symmetric; from/to are
+    station IDs for station graphs and names for plain dicts. None for travel times no
+    store has tagged (not cacheable).
+    """
+    version = getattr(train_times, "version", 0)
+    if not version:
+        return None
+    return (version, from_key, to_key) if from_key <= to_key else (version, to_key, from_key)
+
+def memoize_travel_time(func, maxsize=TRAVEL_CACHE_SIZE):
+    cache = TravelTimeCache(maxsize)
     
     @functools.wraps(func)
-    def wrapper(train_times, from_loc, to_loc):
-        key = (from_loc.lower(), to_loc.lower())
-        if key in cache:
-            value = cache.pop(key)
-            cache[key] = value  # Move to end (most recently used)
+    def wrapper(train_times, from_key, to_key):
+        # Keyed on the data version, so answers from one graph never leak into another
+        key = travel_cache_key(train_times, from_key, to_key)
+        if key is None:
+            return func(train_times, from_key, to_key)
+        found, value = cache.get(key)
+        if found:
             return value
-            
-        result = func(train_times, from_loc, to_loc)
-        cache[key] = result
-        
-        # Limit cache size
-        if len(cache) > maxsize:
-            cache.popitem(last=False)  # Remove oldest item
-            
-        return result
+
+        value = func(train_times, from_key, to_key)
+        cache.put(key, value)
+        return value
     
+    wrapper.cache = cache
+    wrapper.cache_clear = cache.clear
+    wrapper.cache_info = cache.info
     return wrapper
 
 @memoize_travel_time
+def cached_travel_minutes(train_times, from_key, to_key) -> Optional[int]:
+    """Memoized lookup behind get_travel_minutes_utils: by station ID on sparse graphs, by name on plain dicts."""
+    if isinstance(train_times, StationGraph):
+        return train_times.minutes_by_id(from_key, to_key)
+
+    # Plain train_times dicts (scripts, benchmarks) only know their own spellings
+    return either_way_minutes(train_times, from_key, to_key, None)
+
 def get_travel_minutes_utils(train_times: Dict, from_loc: str, to_loc: str) -> Optional[int]:
     """Get travel time between locations, handling missing data and same-location"""
     # Return 0 for same location (case-insensitive comparison)
     if from_loc.lower() == to_loc.lower():
         return 0
-    
-    # Try direct lookup and reverse first (most common cases)
-    minutes = train_times.get((from_loc, to_loc))
-    if minutes is not None:
-        return minutes
-    
-    minutes = train_times.get((to_loc, from_loc))
-    if minutes is not None:
-        return minutes
-    
-    # Cache lowercase versions for suffix checking
-    from_loc_lower = from_loc.lower()
-    to_loc_lower = to_loc.lower()
-    
-    # Special suffixes that preclude adding HBF
-    special_suffixes = ["mitte", "bahnhof"]
-    
-    # Check if special suffixes exist
-    from_has_special = any(suffix in from_loc_lower for suffix in special_suffixes)
-    to_has_special = any(suffix in to_loc_lower for suffix in special_suffixes)
-    
-    # Generate variants efficiently
-    variants = []
-    
-    # Add "hbf" variants only when appropriate
-    if not from_has_special:
-        variants.append((from_loc + " hbf", to_loc))
-        if not to_has_special:
-            variants.append((from_loc + " hbf", to_loc + " hbf"))
-    
-    if not to_has_special:
-        variants.append((from_loc, to_loc + " hbf"))
-    
-    # Remove "hbf" if present (only compute cleaned versions when needed)
-    if " hbf" in from_loc or " hbf" in to_loc:
-        from_clean = from_loc.replace(" hbf", "")
-        to_clean = to_loc.replace(" hbf", "")
-        variants.append((from_clean, to_clean))
-    
-    # Try all variants and their reverse
-    for variant in variants:
-        minutes = train_times.get(variant)
-        if minutes is not None:
-            return minutes
-        
-        # Try reverse variant
-        reverse = (variant[1], variant[0])
-        minutes = train_times.get(reverse)
-        if minutes is not None:
-            return minutes
-    
-    return None
+
+    # Dense matrix: one array read is cheaper than any cache probe, so matrix mode is uncached
+    if isinstance(train_times, TravelTimeMatrix):
+        return train_times.minutes_between(from_loc, to_loc)
+
+    if isinstance(train_times, StationGraph):
+        # Resolve each name once and cache by station ID
+        from_id = train_times.station_id(from_loc)
+        to_id = train_times.station_id(to_loc)
+        if from_id is None or to_id is None:
+            return None
+        return cached_travel_minutes(train_times, from_id, to_id)
+
+    return cached_travel_minutes(train_times, from_loc, to_loc)
+
+@on_store_swap
+def clear_data_caches(new_store, old_store):
+    """Drop memoized travel lookups and trip signatures once the travel times are replaced."""
+    if old_store is not None and new_store.train_times is old_store.train_times:
+        return  # schedule-only reload, travel lookups are still valid
+    cached_travel_minutes.cache_clear()
+    generate_trip_signature.cache_clear()
+
+@functools.lru_cache(maxsize=4096)
+def parse_match_label(label: str) -> Tuple[str, str, str]:
+    """(home, away, kickoff) from a "Home vs Away (15:30)" match label, parsed once per label."""
+    teams, sep, kickoff = label.rpartition(" (")
+    if not sep:
+        teams, kickoff = label, ""
+    home, _, away = teams.partition(" vs ")
+    return home.strip(), away.strip(), kickoff.rstrip(")")
+
+def timetable_allows_match(timetable, from_loc: str, match_loc: str, kickoff_minutes: Optional[int],
+                           max_travel_time: int, return_to: Optional[str] = None) -> bool:
+    """
+    Timetable engine check for a match day: a train from from_loc that arrives
+    KICKOFF_BUFFER_MINUTES before kickoff and, if return_to is given, one back
+    after the final whistle. Without a timetable, for TBD kickoffs and for
+    stations the timetable doesn't know, the fastest-time checks stand.
+    """
+    if timetable is None or kickoff_minutes is None:
+        return True
+    if timetable.covers(from_loc, match_loc) and not timetable.reaches_by(
+            from_loc, match_loc, kickoff_minutes - KICKOFF_BUFFER_MINUTES, max_travel_time):
+        return False
+    if return_to and timetable.covers(match_loc, return_to) and not timetable.returns_after(
+            match_loc, return_to, kickoff_minutes + MATCH_DURATION_MINUTES, max_travel_time):
+        return False
+    return True
 
 def convert_to_minutes(time_str: str) -> int:
     """Convert time string formats like '5h 30m', '4h', '45m' to minutes."""
@@ -198,15 +262,44 @@ def convert_to_minutes(time_str: str) -> int:
         except ValueError:
             raise ValueError(f"Invalid time string: '{time_str}'")
 
+def parse_minutes_column(time_strings: "pd.Series") -> "pd.Series":
+    """Vectorized convert_to_minutes for a whole column of time strings.
+
+    Handles the common '5h 30m', '4h', '45m' and bare-number formats in one pass;
+    anything the pattern doesn't recognise falls back to convert_to_minutes so
+    malformed values still raise the same ValueError.
+    """
+    import pandas as pd  # only the CSV parsing paths need pandas, keep it off the import path
+
+    values = time_strings.astype(str).str.strip()
+    parts = values.str.extract(r"^(?:(?P<h>\d*)\s*h)?\s*(?:(?P<m>\d*)\s*m)?$")
+    has_unit = values.str.contains("h") | values.str.contains("m")
+    hours = pd.to_numeric(parts["h"].replace("", "0"), errors="coerce").fillna(0)
+    mins = pd.to_numeric(parts["m"].replace("", "0"), errors="coerce").fillna(0)
+    matched = parts["h"].notna() | parts["m"].notna()
+
+    minutes = (hours * 60 + mins).where(has_unit & matched)
+    bare = pd.to_numeric(values.where(~has_unit), errors="coerce")
+    minutes = minutes.fillna(bare)
+
+    unparsed = minutes.isna()
+    if unparsed.any():
+        minutes.loc[unparsed] = [convert_to_minutes(v) for v in time_strings[unparsed]]
+    return minutes.astype(int)
+
 def load_train_times(file_path: str) -> dict:
     """Load train travel times between locations from CSV file."""
+    import pandas as pd
+
     df = pd.read_csv(file_path)
-    train_times = {}
-    for _, row in df.iterrows():
-        travel_minutes = convert_to_minutes(row["Fastest Train Time"])
-        train_times[(row["From"], row["To"])] = travel_minutes
-        train_times[(row["To"], row["From"])] = travel_minutes
-    return train_times
+    minutes = parse_minutes_column(df["Fastest Train Time"]).tolist()
+    froms = df["From"].tolist()
+    tos = df["To"].tolist()
+
+    # Interleave both directions in row order so later rows win exactly as before
+    keys = itertools.chain.from_iterable(((f, t), (t, f)) for f, t in zip(froms, tos))
+    values = itertools.chain.from_iterable((m, m) for m in minutes)
+    return dict(zip(keys, values))
 
 def add_missing_same_city_travel_times(train_times):
     """Add missing same-city travel times (0 minutes) to the train_times dictionary."""
@@ -224,63 +317,80 @@ def add_missing_same_city_travel_times(train_times):
     return train_times
 
 def load_games(file_path: str) -> tuple:
-    """Load football games from CSV file, separating regular and TBD games."""
-    df = pd.read_csv(file_path, encoding="utf-8", skipinitialspace=True)
+    """Load football games from CSV file, separating regular and TBD games.
+
+    Columns are parsed for the whole file at once: each distinct date string and
+    home team is resolved a single time, invalid rows are masked out, and Game
+    objects are only constructed for the surviving rows.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(file_path, encoding="utf-8", skipinitialspace=True, dtype=str)
     df.columns = df.columns.str.strip()
 
-    games = []
-    tbd_games = []
+    # Rows missing any required value can't become a Game (same as the old per-row parse)
+    required = ["League", "Date", "Time", "Home Team", "Away Team"]
+    valid = df[required].notna().all(axis=1)
 
-    for _, row in df.iterrows():
+    # Parse each distinct date string once
+    date_str = df["Date"].str.strip()
+    parsed_dates = {}
+    for value in date_str[valid].unique():
         try:
-            date_str = row["Date"].strip()
-            # Parse with year already included
-            date_main = datetime.strptime(date_str, "%d %B %Y")
-            
-            # Check for explicit location, fall back to home team's location
-            location = None
-            if "Location" in df.columns:
-                location_value = row["Location"]
-                if pd.notna(location_value) and str(location_value).strip() not in ["", "TBD", "Unknown"]:
-                    location = str(location_value).strip()
-            
-            # If no explicit location or invalid location, use home team's location
-            if not location:
-                if row["Home Team"].strip() == "TBD":
-                    location = "Unknown"
-                else:
-                    location = map_team_to_hbf(row["Home Team"])
-            
-            game = Game(
-                league=row["League"].strip(),
-                date=date_main,
-                time=row["Time"],
-                home_team=row["Home Team"].strip(),
-                away_team=row["Away Team"].strip(),
-                hbf_location=location
-            )
-            
-            if str(row["Time"]).lower() == "tbd":
-                tbd_games.append(game)
-            else:
-                games.append(game)
-                
-        except Exception as e:
-            logger.error(f"Error parsing row {row}: {e}")
-            continue
+            parsed_dates[value] = datetime.strptime(value, "%d %B %Y")
+        except ValueError as e:
+            parsed_dates[value] = None
+            logger.error(f"Error parsing date '{value}': {e}")
+    dates = pd.Series([parsed_dates.get(value) for value in date_str], index=df.index, dtype=object)
+    valid &= dates.notna()
+
+    # Explicit location first, otherwise the home team's station
+    home_raw = df["Home Team"]
+    home = home_raw.str.strip()
+    if "Location" in df.columns:
+        location = df["Location"].str.strip()
+        location = location.where(~location.isin(["", "TBD", "Unknown"]))
+    else:
+        location = pd.Series(pd.NA, index=df.index, dtype=object)
+    needs_team_lookup = location.isna() & valid
+    team_locations = {team: map_team_to_hbf(team) for team in home_raw[needs_team_lookup & (home != "TBD")].unique()}
+    fallback = home_raw.map(team_locations).where(home != "TBD", "Unknown")
+    location = location.fillna(fallback)
 
-    return games, tbd_games
+    is_tbd = df["Time"].str.lower() == "tbd"
 
-train_times = load_train_times(TRAIN_TIMES_FILE)
-train_times = add_missing_same_city_travel_times(train_times)
+    invalid_rows = df.index[~valid]
+    for idx in invalid_rows:
+        logger.error(f"Error parsing row {idx}: {df.loc[idx].to_dict()}")
+
+    games = []
+    tbd_games = []
+    rows = zip(
+        df["League"][valid].str.strip(),
+        dates[valid],
+        df["Time"][valid],
+        home[valid],
+        df["Away Team"][valid].str.strip(),
+        location[valid],
+        is_tbd[valid],
+    )
+    for league, date_main, time, home_team, away_team, hbf_location, tbd in rows:
+        # Columns are already validated, so skip per-row pydantic validation
+        game = Game.model_construct(
+            league=league,
+            date=date_main,
+            time=time,
+            home_team=home_team,
+            away_team=away_team,
+            hbf_location=hbf_location
+        )
+        (tbd_games if tbd else games).append(game)
+
+    return games, tbd_games
 
 def map_team_to_hbf(team_name: str) -> str:
     """Map team name to nearest train station (Hauptbahnhof)."""
-    all_teams = bundesliga_1_stadiums + bundesliga_2_stadiums + third_liga_stadiums
-    for team in all_teams:
-        if team["team"].lower() == team_name.lower():
-            return team["hbf"]["name"]
-    return "Unknown"
+    return station_for_team(team_name)
 
 def identify_similar_trips(sorted_trips: List[Dict]) -> List[Dict]:
     """Group trips by the matches they include, ignoring travel routes."""
@@ -310,6 +420,7 @@ def identify_similar_trips(sorted_trips: List[Dict]) -> List[Dict]:
     
     return trip_groups
 
+@functools.lru_cache(maxsize=4096)
 def format_travel_time(minutes: int) -> str:
     """Convert minutes to 'Xh Ym' format."""
     hours = minutes // 60
@@ -338,10 +449,15 @@ def parse_travel_time(time_str: str) -> int:
     except:
         return 0
 
-def calculate_total_travel_time(trip: Dict, train_times_param: Dict = None, start_location: str = None) -> int:
-    """Calculate the total travel time for a trip based on actual travel segments."""
-    global train_times
-    train_times_to_use = train_times_param if train_times_param is not None else train_times
+def calculate_total_travel_time(trip: Dict, train_times_param: Dict = None, start_location: str = None,
+                                stations: Optional[StationLookup] = None) -> int:
+    """
+    Calculate the total travel time for a trip based on actual travel segments.
+    Planning runs pass their StationLookup so names are resolved once per run.
+    """
+    if stations is None:
+        stations = StationLookup(train_times_param if train_times_param is not None else get_store().train_times)
+    travel_minutes = stations.travel_minutes
 
     total_minutes = 0
 
@@ -392,10 +508,10 @@ def calculate_total_travel_time(trip: Dict, train_times_param: Dict = None, star
 
     if start_location and first_hotel:
         if start_location.lower() != first_hotel.lower():
-            initial_travel_time = get_travel_minutes_utils(train_times_to_use, start_location, first_hotel) or 0
+            initial_travel_time = travel_minutes(start_location, first_hotel) or 0
             total_minutes += initial_travel_time
     elif initial_location and first_hotel and initial_location.lower() != first_hotel.lower():
-        initial_travel_time = get_travel_minutes_utils(train_times_to_use, initial_location, first_hotel) or 0
+        initial_travel_time = travel_minutes(initial_location, first_hotel) or 0
         total_minutes += initial_travel_time
 
     # Second pass: calculate travel time based on daily movements.
@@ -417,92 +533,35 @@ def calculate_total_travel_time(trip: Dict, train_times_param: Dict = None, star
 
         if match_location and previous_hotel and current_hotel != previous_hotel:
             if match_location.lower() == previous_hotel.lower():
-                travel_time = get_travel_minutes_utils(train_times_to_use, match_location, current_hotel) or 0
+                travel_time = travel_minutes(match_location, current_hotel) or 0
                 total_minutes += travel_time
             elif match_location.lower() == current_hotel.lower():
-                travel_time = get_travel_minutes_utils(train_times_to_use, previous_hotel, match_location) or 0
+                travel_time = travel_minutes(previous_hotel, match_location) or 0
                 total_minutes += travel_time
             else:
-                to_match_time = get_travel_minutes_utils(train_times_to_use, previous_hotel, match_location) or 0
-                to_new_hotel_time = get_travel_minutes_utils(train_times_to_use, match_location, current_hotel) or 0
+                to_match_time = travel_minutes(previous_hotel, match_location) or 0
+                to_new_hotel_time = travel_minutes(match_location, current_hotel) or 0
                 total_minutes += to_match_time + to_new_hotel_time
         else:
             if previous_hotel and current_hotel != previous_hotel:
-                hotel_change_time = get_travel_minutes_utils(train_times_to_use, previous_hotel, current_hotel) or 0
+                hotel_change_time = travel_minutes(previous_hotel, current_hotel) or 0
                 total_minutes += hotel_change_time
 
             if match_location and not (previous_hotel and current_hotel != previous_hotel):
                 start_point = previous_hotel if previous_hotel else current_hotel
 
                 if match_location.lower() != start_point.lower():
-                    match_travel_time = get_travel_minutes_utils(train_times_to_use, start_point, match_location) or 0
+                    match_travel_time = travel_minutes(start_point, match_location) or 0
                     total_minutes += match_travel_time
 
                 if match_location.lower() != current_hotel.lower():
-                    return_travel_time = get_travel_minutes_utils(train_times_to_use, match_location, current_hotel) or 0
+                    return_travel_time = travel_minutes(match_location, current_hotel) or 0
                     total_minutes += return_travel_time
 
         previous_hotel = current_hotel
 
     return total_minutes
 
-@functools.lru_cache(maxsize=8192)
-def get_reachable_games_cached(location: str, date_str: str, games_tuple, max_travel_time: int, train_times_dict_id: int):
-    """Cache reachable games from a location on a specific date"""
-    games = list(games_tuple)  # Convert back to list
-    current_date = datetime.strptime(date_str, "%Y-%m-%d")
-    current_date_only = current_date.date()
-    
-    # Get the train_times dictionary from the global reference
-    global train_times
-    train_times_to_use = train_times  # Default
-    
-    todays_games = [game for game in games if hasattr(game, 'date') and game.date.date() == current_date_only]
-    
-    if not todays_games:
-        return ()
-    
-    reachable = []
-    
-    for game in todays_games:
-        if hasattr(game, 'hbf_location'):
-            # Use helper function instead of direct lookup
-            travel_time = get_travel_minutes_utils(train_times_to_use, location, game.hbf_location)
-            if travel_time is not None and travel_time <= max_travel_time:
-                reachable.append((
-                    game,
-                    location,
-                    travel_time
-                ))
-    
-    return tuple(reachable)  # Return immutable tuple for caching
-
-def get_reachable_games(locations: list, games: list, train_times: dict, max_travel_time: int, current_date: datetime) -> list:
-    """Find games reachable within max_travel_time from any of the provided locations."""
-    if not locations or not games:
-        return []
-    
-    date_str = current_date.strftime("%Y-%m-%d")
-    games_tuple = tuple(games)  # Make immutable for caching
-    train_times_dict_id = id(train_times)  # Use ID as reference
-    
-    unique_locations = set(locations)
-    all_reachable = []
-    
-    for loc in unique_locations:
-        # Use the cached function for each location
-        cached_results = get_reachable_games_cached(loc, date_str, games_tuple, max_travel_time, train_times_dict_id)
-        
-        # Convert the immutable tuple results back to dictionaries
-        for game, from_loc, travel_time in cached_results:
-            all_reachable.append({
-                "game": game,
-                "from": from_loc,
-                "travel_time": travel_time
-            })
-    
-    return all_reachable
-
 def is_efficient_route(new_trip: list, new_location: str, trip_locations: list) -> bool:
     """Check if adding this location creates an efficient route."""
     # Avoid backtracking (A → B → A pattern)
@@ -528,7 +587,7 @@ def is_efficient_route(new_trip: list, new_location: str, trip_locations: list)
     
     return True
 
-def filter_pareto_optimal_trips(trips: list, train_times: dict = None) -> list:
+def filter_pareto_optimal_trips(trips: list, train_times: dict = None, stations: Optional[StationLookup] = None) -> list:
     """
     Filter trips to create a Pareto frontier based on travel time and hotel changes.
     """
@@ -536,7 +595,8 @@ def filter_pareto_optimal_trips(trips: list, train_times: dict = None) -> list:
         return []
         
     # Sort trips by total travel time (fastest first)
-    sorted_trips = sorted(trips, key=lambda trip: calculate_total_travel_time(trip, train_times))
+    stations = stations or StationLookup(train_times if train_times is not None else get_store().train_times)
+    sorted_trips = sorted(trips, key=lambda trip: calculate_total_travel_time(trip, stations=stations))
     
     # Always include the fastest option
     pareto_optimal = [sorted_trips[0]]
@@ -569,7 +629,8 @@ def create_hotel_variation(
     start_idx=0,
     preserve_first_day=True,
     train_times=None,
-    max_travel_time=None
+    max_travel_time=None,
+    stations: Optional[StationLookup] = None
 ) -> list:
     """
     Create a trip variation using a specific hotel base, rebuilding travel segments to match.
@@ -588,6 +649,7 @@ def create_hotel_variation(
             variation.append(day)
 
     is_valid = True
+    stations = stations or StationLookup(train_times)
 
     # Ensure first day has a hotel
     if variation and isinstance(variation[0], dict) and not variation[0].get("hotel"):
@@ -613,7 +675,7 @@ def create_hotel_variation(
 
         prev_hotel = variation[i-1].get("hotel")
         match_loc = day.get("location")
-        travel = train_times.get((prev_hotel, match_loc), float("inf"))
+        travel = stations.minutes(prev_hotel, match_loc)
         if travel > max_travel_time:
             is_valid = False
             break
@@ -637,7 +699,7 @@ def create_hotel_variation(
             prev_hotel = prev_day.get("hotel")
             curr_hotel = day.get("hotel")
             if prev_hotel and curr_hotel and prev_hotel != curr_hotel:
-                transition = get_travel_minutes_utils(train_times, prev_hotel, curr_hotel)
+                transition = stations.travel_minutes(prev_hotel, curr_hotel)
                 if transition is None:
                     transition = float("inf")
                 if transition > max_travel_time:
@@ -653,16 +715,22 @@ def optimize_trip_variations(
     base_trip: list,
     train_times: dict,
     max_travel_time: int,
-    start_location: str = None
+    start_location: str = None,
+    timetable=None,
+    stations: Optional[StationLookup] = None
 ) -> list:
     """
     Generate optimized variations of a trip with different hotel strategies,
     ensuring all travel segments are feasible.
     This version replaces the O(n log n) sort+parse in final validation
     with a single O(n) linear scan.
+    With a timetable engine, match days must also work with the actual
+    departures: there before kickoff and back to the hotel after the match.
     """
     # 1) Always include the original
     variations = [base_trip[:]]
+    stations = stations or StationLookup(train_times)
+    minutes = stations.minutes
 
     # 2) Extract match info
     match_locations = []
@@ -678,27 +746,13 @@ def optimize_trip_variations(
     # 3) Filter out any non-day entries for variation building
     filtered_trip = [d for d in base_trip if isinstance(d, dict) and "day" in d]
 
-    # 4) Build set of all cities in train_times
-    all_cities = set(c for pair in train_times.keys() for c in pair)
-
-    # 5) Potential hotel bases = match_locations + any city within max_travel_time of every match
-    potential_bases = set(match_locations)
-    for city in all_cities:
-        if all(
-            train_times.get((city, loc), train_times.get((loc, city), float("inf"))) 
-            <= max_travel_time
-            for loc in match_locations
-        ):
-            potential_bases.add(city)
+    # 4-5) Potential hotel bases = match_locations + any city within max_travel_time of every match
+    potential_bases = set(match_locations) | stations_within(train_times, match_locations, max_travel_time)
 
     # 6) If start_location given, precompute which cities are reachable from it
     reachable_from_start = set()
     if start_location:
-        for city in all_cities:
-            if train_times.get((start_location, city),
-                               train_times.get((city, start_location), float("inf"))
-                              ) <= max_travel_time:
-                reachable_from_start.add(city)
+        reachable_from_start = stations_within(train_times, [start_location], max_travel_time)
         reachable_from_start.add(start_location)
 
     # --- Strategy 1: single-hotel stay variants ---
@@ -714,9 +768,7 @@ def optimize_trip_variations(
             preserve_first = False
             if 0 in match_days:
                 first_loc = match_days[0]["location"]
-                if train_times.get((hotel_base, first_loc),
-                                   train_times.get((first_loc, hotel_base), float("inf"))
-                                  ) > max_travel_time:
+                if minutes(hotel_base, first_loc) > max_travel_time:
                     preserve_first = True
 
         var = create_hotel_variation(
@@ -725,7 +777,8 @@ def optimize_trip_variations(
             start_idx=0,
             preserve_first_day=preserve_first,
             train_times=train_times,
-            max_travel_time=max_travel_time
+            max_travel_time=max_travel_time,
+            stations=stations
         )
         if var:
             variations.append(var)
@@ -742,28 +795,19 @@ def optimize_trip_variations(
             # first-segment matches & bases
             first_locs = [m["location"] for i,m in match_days.items() if i < pivot]
             first_bases = set(first_locs)
-            for city in all_cities:
-                if city in reachable_from_start or not start_location:
-                    if all(
-                        train_times.get((city, loc), train_times.get((loc, city), float("inf")))
-                        <= max_travel_time for loc in first_locs
-                    ):
-                        first_bases.add(city)
+            first_candidates = stations_within(train_times, first_locs, max_travel_time)
+            if start_location:
+                first_candidates &= reachable_from_start
+            first_bases |= first_candidates
 
             # second-segment same
             second_locs = [m["location"] for i,m in match_days.items() if i >= pivot]
-            second_bases = set(second_locs)
-            for city in all_cities:
-                if all(
-                    train_times.get((city, loc), train_times.get((loc, city), float("inf")))
-                    <= max_travel_time for loc in second_locs
-                ):
-                    second_bases.add(city)
+            second_bases = set(second_locs) | stations_within(train_times, second_locs, max_travel_time)
 
             # build each two-hotel variation
             for hb1 in first_bases:
                 v1 = create_hotel_variation(
-                    filtered_trip, hb1, 0, False, train_times, max_travel_time
+                    filtered_trip, hb1, 0, False, train_times, max_travel_time, stations
                 )
                 if not v1:
                     continue
@@ -772,7 +816,7 @@ def optimize_trip_variations(
                     if hb2 == hb1:
                         continue
                     v2 = create_hotel_variation(
-                        v1, hb2, pivot, False, train_times, max_travel_time
+                        v1, hb2, pivot, False, train_times, max_travel_time, stations
                     )
                     if v2:
                         variations.append(v2)
@@ -789,8 +833,7 @@ def optimize_trip_variations(
                 None
             )
             if first_hotel and first_hotel.lower() != start_location.lower():
-                t0 = train_times.get((start_location, first_hotel),
-                                     train_times.get((first_hotel, start_location), float("inf")))
+                t0 = minutes(start_location, first_hotel)
                 if t0 > max_travel_time:
                     continue  # skip this variant
 
@@ -805,8 +848,7 @@ def optimize_trip_variations(
 
                 # hotel→hotel
                 if ph and ch and ph != ch:
-                    th = train_times.get((ph, ch),
-                                         train_times.get((ch, ph), float("inf")))
+                    th = minutes(ph, ch)
                     if th > max_travel_time:
                         ok = False
                         break
@@ -814,19 +856,26 @@ def optimize_trip_variations(
                 # hotel→match and match→hotel
                 if day.get("matches"):
                     ml = day["location"]
-                    t1 = train_times.get((ph, ml),
-                                         train_times.get((ml, ph), float("inf")))
+                    t1 = minutes(ph, ml)
                     if t1 > max_travel_time:
                         ok = False
                         break
 
                     if ch != ml:
-                        t2 = train_times.get((ml, ch),
-                                             train_times.get((ch, ml), float("inf")))
+                        t2 = minutes(ml, ch)
                         if t2 > max_travel_time:
                             ok = False
                             break
 
+                    if timetable is not None and not all(
+                        timetable_allows_match(timetable, ph, ml,
+                                               clock_minutes(parse_match_label(match.get("match", ""))[2]),
+                                               max_travel_time, return_to=ch if ch != ml else None)
+                        for match in day["matches"]
+                    ):
+                        ok = False
+                        break
+
             prev_day = day
 
         if ok:
@@ -834,11 +883,14 @@ def optimize_trip_variations(
 
     return valid
 
-def filter_best_variations_by_hotel_changes(trips: list, train_times: dict = None, max_travel_time: int = None) -> list:
+def filter_best_variations_by_hotel_changes(trips: list, train_times: dict = None, max_travel_time: int = None,
+                                            stations: Optional[StationLookup] = None) -> list:
     """
     For each distinct trip (same matches), show only the fastest route per number of hotel changes,
     and apply Pareto-optimal filtering to give meaningful choices.
     """
+    stations = stations or StationLookup(train_times if train_times is not None else get_store().train_times)
+
     # Group by match combinations
     match_signatures = {}
     
@@ -880,7 +932,7 @@ def filter_best_variations_by_hotel_changes(trips: list, train_times: dict = Non
                 curr_hotel = curr_day.get("hotel")
                 
                 if prev_hotel and curr_hotel and prev_hotel != curr_hotel:
-                    transition_time = get_travel_minutes_utils(train_times, prev_hotel, curr_hotel)
+                    transition_time = stations.travel_minutes(prev_hotel, curr_hotel)
                     if transition_time is None:
                         transition_time = float("inf")
                     if transition_time > max_travel_time:
@@ -900,7 +952,7 @@ def filter_best_variations_by_hotel_changes(trips: list, train_times: dict = Non
             if change_count not in by_change_count:
                 by_change_count[change_count] = []
                 
-            travel_time = calculate_total_travel_time(trip, train_times)
+            travel_time = calculate_total_travel_time(trip, stations=stations)
             by_change_count[change_count].append((travel_time, trip))
         
         # Get the fastest trip per hotel change count
@@ -911,53 +963,54 @@ def filter_best_variations_by_hotel_changes(trips: list, train_times: dict = Non
                 best_by_changes.append(fastest_trip)
         
         # Then apply Pareto-optimal filtering
-        pareto_trips = filter_pareto_optimal_trips(best_by_changes, train_times)
+        pareto_trips = filter_pareto_optimal_trips(best_by_changes, train_times, stations)
         all_filtered_trips.extend(pareto_trips)
     
     return all_filtered_trips
 
-def is_must_team_match(team_name: str, must_teams_set: set) -> bool:
-    """Precisely match team names without catching reserve teams."""
-    if not must_teams_set:
-        return False
-        
-    team_name_lower = team_name.lower()
-    
-    # Check for reserve team indicators
-    is_reserve_team = any(suffix in team_name_lower for suffix in 
-                         [" ii", " 2", " u23", " u21", " u19", " amateure"])
-    
-    for must_team in must_teams_set:
-        # Is the must_team specifically looking for a reserve team?
-        is_must_reserve = any(suffix in must_team for suffix in 
-                            [" ii", " 2", " u23", " u21", " u19", " amateure"])
-        
+def must_team_keys(must_teams) -> Tuple[Tuple[str, bool], ...]:
+    """(team_key, names a reserve/youth team) per must-team, normalized once per request."""
+    if not must_teams:
+        return ()
+    return tuple((key, bool(split_suffix(key)[1])) for key in sorted({team_key(team) for team in must_teams}))
+
+def team_key_matches(team: str, base_team: str, must_keys: Tuple[Tuple[str, bool], ...]) -> bool:
+    """is_must_team_match on an already normalized team (team_key and its base without suffix)."""
+    for must_team, must_is_reserve in must_keys:
         # Exact match
-        if must_team == team_name_lower:
+        if must_team == team:
             return True
             
         # Skip if this is a reserve team but we're not looking for one
-        if not is_must_reserve and is_reserve_team:
-            base_team = team_name_lower
-            for suffix in [" ii", " 2", " u23", " u21", " u19", " amateure"]:
-                base_team = base_team.replace(suffix, "")
-            base_team = base_team.strip()
-            
-            if base_team == must_team:
-                continue
+        if team != base_team and not must_is_reserve and base_team == must_team:
+            continue
         
         # Regular matching
-        if must_team in team_name_lower and (
-            team_name_lower.startswith(must_team) or
-            team_name_lower.endswith(must_team) or
-            f" {must_team} " in f" {team_name_lower} "
+        if must_team in team and (
+            team.startswith(must_team) or
+            team.endswith(must_team) or
+            f" {must_team} " in f" {team} "
         ):
             return True
     
     return False
 
+def game_has_must_team(game: Game, must_keys: Tuple[Tuple[str, bool], ...]) -> bool:
+    """Either side of the game is a must-team (keys precomputed on the game at load time)."""
+    return bool(must_keys) and (team_key_matches(game.home_key, game.home_base, must_keys) or
+                                team_key_matches(game.away_key, game.away_base, must_keys))
+
+def is_must_team_match(team_name: str, must_teams_set: set) -> bool:
+    """Precisely match team names without catching reserve teams."""
+    if not must_teams_set:
+        return False
+        
+    # Normalized keys: case, umlauts and "II"/"U23" spellings no longer matter
+    team = team_key(team_name)
+    return team_key_matches(team, split_suffix(team)[0], must_team_keys(must_teams_set))
+
 def generate_rest_day_options(trip, current_date_str, train_times, max_travel_time, 
-                             valid_games, full_date_range, date_idx):
+                             valid_games, full_date_range, date_idx, game_index=None, leagues=None):
     """
     Generate all possible hotel options for rest days using multiple strategic approaches.
     
@@ -969,6 +1022,7 @@ def generate_rest_day_options(trip, current_date_str, train_times, max_travel_ti
         valid_games: List of all valid games for the trip
         full_date_range: List of datetime objects representing the entire trip range
         date_idx: Index of current date within full_date_range
+        game_index: Optional GameDayIndex of valid_games (with leagues: lowercased league filter)
         
     Returns:
         List of new trip variations with different rest day options
@@ -995,7 +1049,10 @@ def generate_rest_day_options(trip, current_date_str, train_times, max_travel_ti
     
     for future_day in range(1, look_ahead_days + 1):
         future_date = current_date + timedelta(days=future_day)
-        future_games = [g for g in valid_games if g.date.date() == future_date.date()]
+        if game_index is not None:
+            future_games = game_index.on(future_date, leagues)
+        else:
+            future_games = [g for g in valid_games if g.date.date() == future_date.date()]
         for game in future_games:
             if hasattr(game, 'hbf_location'):
                 future_game_locations.add(game.hbf_location)
@@ -1020,25 +1077,10 @@ def generate_rest_day_options(trip, current_date_str, train_times, max_travel_ti
     
     # STRATEGY 3: Consider major hub cities that can reach multiple future games
     if len(future_game_locations) >= 2:
-        # Get all train cities from the train_times dictionary
-        all_train_cities = set()
-        for loc_pair in train_times.keys():
-            all_train_cities.add(loc_pair[0])
-            all_train_cities.add(loc_pair[1])
-        
-        # Find cities that can reach all future game locations
-        potential_hubs = set()
-        for city in all_train_cities:
-            if all(get_travel_minutes_utils(train_times, city, game_loc) is not None and 
-                   get_travel_minutes_utils(train_times, city, game_loc) <= max_travel_time 
-                   for game_loc in future_game_locations):
-                potential_hubs.add(city)
-        
-        # Filter out cities too far from current location
-        for hub in list(potential_hubs):
-            travel_time = get_travel_minutes_utils(train_times, previous_hotel, hub)
-            if travel_time is None or travel_time > max_travel_time:
-                potential_hubs.remove(hub)
+        # Cities that can reach all future game locations and are not too far from the current hotel
+        potential_hubs = stations_within(
+            train_times, list(future_game_locations) + [previous_hotel], max_travel_time
+        )
         
         # Add up to 3 major hub options (to avoid too many variations)
         hub_count = 0
@@ -1055,25 +1097,18 @@ def generate_rest_day_options(trip, current_date_str, train_times, max_travel_ti
                 new_routes.append(new_trip_hub)
                 hub_count += 1
         # STRATEGY 4: Allow moving to any city within max_travel_time (even if not a future game location or hub)
-    all_train_cities = set()
-    for from_loc, to_loc in train_times.keys():
-        all_train_cities.add(from_loc)
-        all_train_cities.add(to_loc)
-    
-    for city in all_train_cities:
+    for city in sorted(stations_within(train_times, [previous_hotel], max_travel_time)):
         if city == previous_hotel:
             continue
-        travel_time = get_travel_minutes_utils(train_times, previous_hotel, city)
-        if travel_time is not None and travel_time <= max_travel_time:
-            new_trip_any_city = trip + [{
-                "day": current_date_str,
-                "location": previous_location,
-                "matches": [],
-                "note": f"Rest Day (Moving to {city})",
-                "hotel": city,
-                "hotel_change": previous_hotel != city
-            }]
-            new_routes.append(new_trip_any_city)
+        new_trip_any_city = trip + [{
+            "day": current_date_str,
+            "location": previous_location,
+            "matches": [],
+            "note": f"Rest Day (Moving to {city})",
+            "hotel": city,
+            "hotel_change": previous_hotel != city
+        }]
+        new_routes.append(new_trip_any_city)
     return new_routes
 
 # ────────────────────────────────
@@ -1090,12 +1125,12 @@ def determine_best_start_location(start_location: str, valid_games: list, start_
         all_hbfs = {g.hbf_location for g in valid_games if hasattr(g, 'hbf_location') and g.hbf_location != "Unknown"}
             
         if all_hbfs:
+            start_day_games = [g for g in valid_games if g.date.date() == start_date.date()]
             reachable_counts = {}
             for city in all_hbfs:
                 # Count reachable games from each city
-                count = sum(1 for g in valid_games 
-                           if g.date.date() == start_date.date() and
-                           train_times.get((city, g.hbf_location), float("inf")) <= max_travel_time)
+                count = sum(1 for g in start_day_games
+                           if either_way_minutes(train_times, city, g.hbf_location) <= max_travel_time)
                 reachable_counts[city] = count
             
             best_start = max(all_hbfs, key=lambda city: reachable_counts.get(city, 0))
@@ -1138,28 +1173,24 @@ def identify_potential_start_cities(games, train_times, trip_duration, max_trave
     candidate_cities.update(major_hubs)
     
     # Strategy 3: Find midpoints between games (cities that can reach multiple games)
-    all_train_cities = set()
-    for loc_pair in train_times.keys():
-        all_train_cities.add(loc_pair[0])
-        all_train_cities.add(loc_pair[1])
-    
     game_locations = [g.hbf_location for g in trip_games if hasattr(g, 'hbf_location')]
     
     # NEW: Find cities that can reach at least 2 game locations within max_travel_time
-    for city in all_train_cities:
-        reachable_count = sum(1 for loc in game_locations if 
-                            train_times.get((city, loc), float('inf')) <= max_travel_time)
-        if reachable_count >= 2:
-            candidate_cities.add(city)
+    # (walk each game location's sorted neighbor list instead of every city × every game)
+    reachable_counts = {}
+    for loc in game_locations:
+        for city, _ in neighbors_within(train_times, loc, max_travel_time):
+            reachable_counts[city] = reachable_counts.get(city, 0) + 1
+        reachable_counts[loc] = reachable_counts.get(loc, 0) + 1
+    candidate_cities.update(city for city, count in reachable_counts.items() if count >= 2)
     
     # NEW: Find strategic midpoints using clustering
     if len(game_locations) >= 3:
         # Find cities that minimize average travel time to game locations
         avg_travel_times = {}
-        for city in all_train_cities:
-            travel_times = [train_times.get((city, loc), float('inf')) for loc in game_locations]
-            if all(t <= max_travel_time for t in travel_times):  # All games must be reachable
-                avg_travel_times[city] = sum(travel_times) / len(travel_times)
+        for city in stations_within(train_times, set(game_locations), max_travel_time):  # All games must be reachable
+            travel_times = [either_way_minutes(train_times, city, loc) for loc in game_locations]
+            avg_travel_times[city] = sum(travel_times) / len(travel_times)
         
         # Add top 5 cities with lowest average travel time
         if avg_travel_times:
@@ -1280,7 +1311,9 @@ async def enhance_trip_planning_for_any_start(request_id: str, **params):
                         preferred_leagues=params.get('preferred_leagues'),
                         start_date=params.get('start_date'),
                         must_teams=params.get('must_teams'),
-                        min_games=min_games
+                        min_games=min_games,
+                        timetable=params.get('timetable'),
+                        game_index=params.get('game_index')
                     ),
                     timeout=30.0  # 30-second timeout per city
                 )
@@ -1406,7 +1439,8 @@ def find_optimal_trip_in_group(trip_group):
 
 def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, games: list, train_times: dict, 
              tbd_games: list = None, preferred_leagues: list = None, start_date: Optional[str] = None, 
-             must_teams: Optional[list] = None, min_games: int = 2, one_city_only: Optional[bool] = False):
+             must_teams: Optional[list] = None, min_games: int = 2, one_city_only: Optional[bool] = False,
+             timetable=None, game_index: Optional[GameDayIndex] = None):
     """
     Main function to plan football trips based on available games.
     
@@ -1421,6 +1455,8 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
         start_date: Optional start date string in format "28 March"
         must_teams: List of teams that must be included in the trip
         min_games: Minimum number of games to include in a trip (default 2)
+        timetable: Optional TimetableEngine; match-day legs must then fit real departures around kickoff
+        game_index: Optional GameDayIndex built at load time (the store's); otherwise built from games
     
     Returns:
         Dictionary containing trip options or error message
@@ -1440,6 +1476,8 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
             (not preferred_leagues_lower or g.league.lower() in preferred_leagues_lower)
         ]
         must_teams_lower = {team.lower() for team in must_teams} if must_teams else None
+        must_keys = must_team_keys(must_teams_lower)
+        day_index = game_index if game_index is not None else GameDayIndex(valid_games, train_times)
         full_date_range = [start_date + timedelta(days=i) for i in range(trip_duration)]
         date_strings = [d.strftime("%d %B %Y") for d in full_date_range]
     
@@ -1447,28 +1485,26 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
         day_options = []
         for date_idx, current_date in enumerate(full_date_range):
             current_date_str = date_strings[date_idx]
+            # There and back within max_travel_time: one way is at most half of it
             day_games = [
-                g for g in valid_games
-                if g.date.date() == current_date.date()
-                and get_travel_minutes_utils(train_times, start_location, g.hbf_location) is not None
-                and get_travel_minutes_utils(train_times, start_location, g.hbf_location) * 2 <= max_travel_time
+                (g, travel_time)
+                for g, travel_time in day_index.reachable_from(start_location, current_date, max_travel_time // 2,
+                                                               preferred_leagues_lower)
+                if timetable_allows_match(timetable, start_location, g.hbf_location, g.kickoff_minutes, max_travel_time,
+                                          return_to=start_location)
             ]
             options = []
-            for game in day_games:
-                travel_time = get_travel_minutes_utils(train_times, start_location, game.hbf_location)
+            for game, travel_time in day_games:
                 options.append({
                     "day": current_date_str,
                     "location": start_location,
                     "matches": [{
-                        "match": f"{game.home_team} vs {game.away_team} ({game.time})",
+                        "match": game.match_label,
                         "location": game.hbf_location,
                         "date": current_date_str,
                         "travel_from": start_location,
                         "travel_time": format_travel_time(travel_time),
-                        "contains_must_team": (
-                            is_must_team_match(game.home_team, must_teams_lower) or
-                            is_must_team_match(game.away_team, must_teams_lower)
-                        ) if must_teams_lower else False
+                        "contains_must_team": game_has_must_team(game, must_keys)
                     }],
                     "note": "",
                     "hotel": start_location
@@ -1511,6 +1547,12 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
         (not preferred_leagues_lower or g.league.lower() in preferred_leagues_lower)
     ]
     
+    # Day buckets: the store's load-time index, or one pass over valid_games
+    day_index = game_index if game_index is not None else GameDayIndex(valid_games, train_times)
+
+    # Station IDs for this run: start, match and hotel names are resolved once
+    stations = StationLookup(train_times)
+    
     # Determine best start location if "Any" is specified
     start_location = determine_best_start_location(
         start_location, valid_games, start_date, train_times, max_travel_time
@@ -1518,6 +1560,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
     
     # Convert must_teams to lowercase set for efficient lookups
     must_teams_lower = {team.lower() for team in must_teams} if must_teams else None
+    must_keys = must_team_keys(must_teams_lower)
     
     # REMOVED: Process TBD games
     
@@ -1525,6 +1568,29 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
     full_date_range = [start_date + timedelta(days=i) for i in range(trip_duration)]
     date_strings = [d.strftime("%d %B %Y") for d in full_date_range]
     
+    # Must-team coverage as bitmasks (bit i = i-th required team). Every route carries the
+    # union of its games' masks in route_masks, and a route is dropped as soon as the
+    # fixtures on the days still ahead (future_cover) can't supply the bits it is missing.
+    required_keys = [(key,) for key in must_keys]
+    full_mask = (1 << len(required_keys)) - 1
+    label_masks = {}
+
+    def game_mask(game) -> int:
+        mask = label_masks.get(game.match_label)
+        if mask is None:
+            mask = label_masks[game.match_label] = sum(
+                1 << i for i, keys in enumerate(required_keys) if game_has_must_team(game, keys)
+            )
+        return mask
+
+    future_cover = [0] * (len(full_date_range) + 1)
+    if full_mask:
+        for idx in range(len(full_date_range) - 1, -1, -1):
+            future_cover[idx] = future_cover[idx + 1]
+            for game in day_index.on(full_date_range[idx], preferred_leagues_lower):
+                future_cover[idx] |= game_mask(game)
+    pruned_routes = 0
+    
     # Initial route with start location
     initial_routes = [[{
         "day": date_strings[0], 
@@ -1533,18 +1599,32 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
         "note": "Start", 
         "hotel": start_location
     }]]
+    route_masks = [0]
+    if future_cover[0] != full_mask:
+        initial_routes, route_masks = [], []  # some must-team has no fixture in the trip window
 
     # Build trip routes day by day
     for date_idx, current_date in enumerate(full_date_range):
         current_date_str = date_strings[date_idx]
         new_routes = []
+        new_masks = []
+        still_coverable = future_cover[date_idx + 1]
+
+        def add_route(route: list, mask: int):
+            """Keep a route only if the days after this one can still cover its missing must-teams."""
+            nonlocal pruned_routes
+            if (mask | still_coverable) == full_mask:
+                new_routes.append(route)
+                new_masks.append(mask)
+            else:
+                pruned_routes += 1
 
         # Filter games for current date
-        current_date_games = [g for g in valid_games if g.date.date() == current_date.date()]
+        current_date_games = list(day_index.on(current_date, preferred_leagues_lower))
         
         # Handle rest days (no games on this date)
         if not current_date_games:
-            for trip in initial_routes:
+            for trip, mask in zip(initial_routes, route_masks):
                 # Generate all rest day options for this trip
                 trip_options = generate_rest_day_options(
                     trip=trip,
@@ -1553,15 +1633,18 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                     max_travel_time=max_travel_time,
                     valid_games=valid_games,
                     full_date_range=full_date_range,
-                    date_idx=date_idx
+                    date_idx=date_idx,
+                    game_index=day_index,
+                    leagues=preferred_leagues_lower
                 )
-                new_routes.extend(trip_options)
+                for option in trip_options:
+                    add_route(option, mask)
             
-            initial_routes = new_routes
+            initial_routes, route_masks = new_routes, new_masks
             continue
 
         # Process each potential trip route
-        for trip in initial_routes:
+        for trip, mask in zip(initial_routes, route_masks):
             try:
                 # Get current locations from trip for route planning
                 if len(trip) == 1:
@@ -1574,28 +1657,20 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                 reachable_by_location = {}
                 
                 for loc in current_locations:
-                    for game in current_date_games:
-                        
-                        # Use get_travel_minutes_utils instead of direct train_times lookup
-                        travel_time = get_travel_minutes_utils(train_times, loc, game.hbf_location)
-                        if travel_time is not None and travel_time <= max_travel_time:
+                    # Nearest-first (station, date) row: the games within max_travel_time are a prefix
+                    for game, travel_time in day_index.reachable_from(loc, current_date, max_travel_time,
+                                                                      preferred_leagues_lower):
+                        if timetable_allows_match(timetable, loc, game.hbf_location, game.kickoff_minutes, max_travel_time):
+                            # Label, team keys and formatted minutes are precomputed / memoized
                             travel_time_str = format_travel_time(travel_time)
-                            match_str = f"{game.home_team} vs {game.away_team} ({game.time})"
-                            
-                            # Check if match contains a must-see team
-                            contains_must_team = False
-                            if must_teams_lower:
-                                contains_must_team = (
-                                    is_must_team_match(game.home_team, must_teams_lower) or
-                                    is_must_team_match(game.away_team, must_teams_lower)
-                                )
+                            contains_must_team = game_mask(game) != 0
                             
                             # Group matches by location
                             if game.hbf_location not in reachable_by_location:
                                 reachable_by_location[game.hbf_location] = []
                                 
                             reachable_by_location[game.hbf_location].append({
-                                "match": match_str,
+                                "match": game.match_label,
                                 "location": game.hbf_location,
                                 "date": current_date_str,
                                 "travel_from": loc,
@@ -1612,7 +1687,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                     "note": "Rest Day (Skipped Match)",
                     "hotel": hotel_location
                 }]
-                new_routes.append(new_trip)
+                add_route(new_trip, mask)
                 
                 # If no reachable games, we've already added the rest day above
                 if not reachable_by_location:
@@ -1621,7 +1696,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                 # Add new routes based on reachable games
                 for location, options in reachable_by_location.items():
                     # Select best option (shortest travel time)
-                    best_option = min(options, key=lambda o: train_times.get((o["travel_from"], o["location"]), float("inf")))
+                    best_option = min(options, key=lambda o: stations.minutes(o["travel_from"], o["location"]))
                     
                     # Get trip locations for route efficiency check
                     trip_locations = [day.get("location") for day in trip if "location" in day]
@@ -1635,7 +1710,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                             "note": "",
                             "hotel": location
                         }]
-                        new_routes.append(new_trip)
+                        add_route(new_trip, mask | label_masks[best_option["match"]])
                     
                     # Add alternate routes from different starting points
                     from_locations = {best_option["travel_from"]}
@@ -1649,7 +1724,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                                 "note": "",
                                 "hotel": location
                             }]
-                            new_routes.append(new_trip)
+                            add_route(new_trip, mask | label_masks[option["match"]])
                 
             except Exception:
                 # Add rest day as fallback if error occurs
@@ -1662,38 +1737,25 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
                         "note": "Rest Day (ERROR)",
                         "hotel": hotel_location
                     }]
-                    new_routes.append(new_trip)
+                    add_route(new_trip, mask)
                 except:
                     continue
 
-        initial_routes = new_routes
+        initial_routes, route_masks = new_routes, new_masks
         
+    if full_mask:
+        logger.debug(f"Must-team pruning dropped {pruned_routes} partial routes from {start_location}")
 
-    all_trips = [trip for trip in initial_routes 
-                if sum(len(day.get("matches", [])) > 0 for day in trip) >= min_games]
-    
-    # Filter trips to include only those with required teams
-    if must_teams_lower and all_trips:
-        all_trips = [
-            trip for trip in all_trips
-            if all(
-                any(
-                    match.get("match", "") and (
-                        is_must_team_match(match.get("match", "").split(" vs ")[0].split(" (")[0], {required_team}) or
-                        is_must_team_match(match.get("match", "").split(" vs ")[1].split(" (")[0], {required_team})
-                    )
-                    for day in trip 
-                    for match in day.get("matches", [])
-                )
-                for required_team in must_teams_lower
-            )
-        ]
-        
+    # Routes that survived pruning cover every must-team (route_masks == full_mask)
+    all_trips = [trip for trip, mask in zip(initial_routes, route_masks)
+                if mask == full_mask and sum(len(day.get("matches", [])) > 0 for day in trip) >= min_games]
+    
     # Optimize trip variations with different hotel strategies
     optimized_trips = []
     for original_trip in all_trips:
         trip_without_stats = [day for day in original_trip if isinstance(day, dict) and "day" in day]
-        variations = optimize_trip_variations(trip_without_stats, train_times, max_travel_time, start_location)
+        variations = optimize_trip_variations(trip_without_stats, train_times, max_travel_time, start_location,
+                                              timetable=timetable, stations=stations)
         optimized_trips.extend(variations)
     
     # Replace with optimized trips
@@ -1803,7 +1865,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
         trip_hotel_stats = {
             "hotel_changes": hotel_changes,
             "unique_hotels": len(hotel_locations),
-            "hotel_locations": list(hotel_locations),
+            "hotel_locations": sorted(hotel_locations),
             "hotel_stays": hotel_stays,
             "hotel_details": hotel_details
         }
@@ -1811,7 +1873,7 @@ def plan_trip(start_location: str, trip_duration: int, max_travel_time: int, gam
         trip.append(trip_hotel_stats)
     
     # Filter to show only best trip per hotel change count
-    all_trips = filter_best_variations_by_hotel_changes(all_trips, train_times, max_travel_time)
+    all_trips = filter_best_variations_by_hotel_changes(all_trips, train_times, max_travel_time, stations)
     
     # Return appropriate response based on results
     if not all_trips:
@@ -1895,7 +1957,9 @@ async def plan_trip_with_cancellation(request_id: str, **planning_params):
             start_date=start_date,
             must_teams=must_teams,
             min_games=min_games,
-            one_city_only=planning_params.get('one_city_only', False)  # <-- ADD THIS
+            one_city_only=planning_params.get('one_city_only', False),  # <-- ADD THIS
+            timetable=planning_params.get('timetable'),
+            game_index=planning_params.get('game_index')
         )
         
         # Monitor for completion or cancellation
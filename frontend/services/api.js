@@ -313,6 +313,25 @@ async function getGamesByDate(date, league = null, includePast = false) {
     return fetchApi(endpoint);
 }
 
+/**
+ * Get all games in a date range, grouped by date and league
+ * @param {string} from - First date in YYYY-MM-DD format
+ * @param {string} to - Last date in YYYY-MM-DD format (inclusive)
+ * @param {string|null} league - Filter by league
+ * @param {boolean} includePast - Whether to include past games
+ * @returns {Promise<object>} Games per date
+ */
+async function getGamesInRange(from, to, league = null, includePast = false) {
+    const queryParams = new URLSearchParams();
+    queryParams.append('from', from);
+    queryParams.append('to', to);
+    
+    if (league) queryParams.append('league', league);
+    if (includePast) queryParams.append('include_past', 'true');
+    
+    return fetchApi(`/games?${queryParams.toString()}`);
+}
+
 /**
  * Get game details for a specific date
  * @param {string} league - League name
@@ -341,14 +360,16 @@ async function checkHealth() {
  * Search for teams, cities, or leagues
  * @param {string} query - Search query (min 2 characters)
  * @param {Array<string>} types - Types to search ["teams", "cities", "leagues"]
+ * @param {number} [limit] - Maximum results per type (ranked best first)
  * @returns {Promise<object>} Search results
  */
-async function search(query, types = ["teams", "cities", "leagues"]) {
+async function search(query, types = ["teams", "cities", "leagues"], limit = null) {
     const queryParams = new URLSearchParams();
     queryParams.append('q', query);
     
     // Add each type as a separate query parameter
     types.forEach(type => queryParams.append('types', type));
+    if (limit) queryParams.append('limit', limit);
     
     return fetchApi(`/search?${queryParams.toString()}`);
 }
@@ -841,6 +862,7 @@ export {
     getAirportInformation,
     getTravelStats,
     getGamesByDate,
+    getGamesInRange,
     checkHealth,
     search,
     refreshData,
@@ -86,6 +86,11 @@ export async function fetchGamesByDate(date) {
     return fetchApi(`/games-by-date/${date}`);
 }
 
+// All games from one date to another (inclusive), grouped by date and league
+export async function fetchGamesInRange(from, to) {
+    return fetchApi(`/games?from=${from}&to=${to}`);
+}
+
 export async function fetchAvailableDates() {
     return fetchApi('/available-dates');
 }
\ No newline at end of file
@@ -1,5 +1,5 @@
 import { applyTeamLogoStyles, preloadLogos, formatTeamOptionWithLogo, formatLeagueOptionWithLogo, getTeamLogoUrl, getLeagueLogoUrl } from './team-logos.js';
-import { fetchAllTeams, fetchLeagues, fetchAvailableDates, fetchGamesByDate, fetchTeamSchedule } from './schedule-service.js';
+import { fetchAllTeams, fetchLeagues, fetchAvailableDates, fetchGamesByDate, fetchGamesInRange, fetchTeamSchedule } from './schedule-service.js';
 import { GERMAN_TEAMS } from './data-loader.js';
 import { formatCityForDisplay, formatCityForBackend } from './city-formatter.js';
 import { TEAM_TICKET_LINKS } from './data-loader.js';
@@ -1641,6 +1641,11 @@ function renderListView(games) {
     monthHeaderRow.appendChild(paginationDivTop);
     monthSection.appendChild(monthHeaderRow);
 
+    // One request for the whole month (not needed when the team filter uses cached team data)
+    const monthGamesRequest = (state.filters.team !== 'all' && window.currentTeamData)
+        ? null
+        : loadMonthGames(monthGames);
+
     // Process each date in this month
     for (const gameDate of monthGames) {
         // ...existing code for creating dateSection, dateHeader, gamesContainer...
@@ -1668,7 +1673,7 @@ function renderListView(games) {
 
         const gamesContainer = document.createElement('div');
         gamesContainer.className = 'games-container';
-        fetchGamesForDate(gameDate.date, gamesContainer);
+        fetchGamesForDate(gameDate.date, gamesContainer, monthGamesRequest);
 
         dateSection.appendChild(gamesContainer);
         monthSection.appendChild(dateSection);
@@ -1712,8 +1717,15 @@ function renderMonthPaginationControls(months) {
     container.appendChild(paginationDiv);
 }
 
-// Fetch and render games for a specific date
-function fetchGamesForDate(dateStr, container) {
+// Fetch a month's games in one /games request, keyed by date (YYYY-MM-DD)
+function loadMonthGames(monthGames) {
+    const dates = monthGames.map(gameDate => gameDate.date);
+    return fetchGamesInRange(dates[0], dates[dates.length - 1])
+        .then(data => Object.fromEntries((data.dates || []).map(day => [day.date, day])));
+}
+
+// Fetch and render games for a specific date (from the month request when given)
+function fetchGamesForDate(dateStr, container, monthGamesRequest = null) {
     // Add enhanced loading indicator
     container.innerHTML = `
         <div class="date-loading">
@@ -1857,7 +1869,10 @@ function fetchGamesForDate(dateStr, container) {
         }
     } else {
         // Fetch games for this date normally if no team filter or no cached data
-        fetchGamesByDate(dateStr)
+        const dateRequest = monthGamesRequest
+            ? monthGamesRequest.then(gamesByDate => gamesByDate[dateStr] || { games_by_league: {} })
+            : fetchGamesByDate(dateStr);
+        dateRequest
             .then(data => { // Remove the response.json() step - data is already parsed
                 // Clear loading indicator
                 container.innerHTML = '';